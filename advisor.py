@@ -0,0 +1,201 @@
+"""
+Operation advisor for the player.
+Scores every player operation in operations.CATALOG against every country in one vectorized pass
+and returns the best (operation, country) pairs. A score is in budget dollars and
+combines, for one attempt:
+    expected influence gain (only the part still short of the control mark counts),
+    expected rival influence removed (rival_influence_loss),
+    expected change in reward income, from winning or losing the lead and from the
+        stability/populism change making the country pay out or stop paying,
+    progress toward the 80%-in-60% domination threshold,
+minus the expected visibility cost (doubled on failure), the risk of exposure and the
+operation's own cost.
+
+Needs NumPy. ArrayWorld games are scored straight from their arrays; plain dict worlds
+keep a CountryArrays mirror that influence.py listeners keep up to date, so only the
+first call pays for a pass over the countries.
+"""
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; without it the UI just hides the advisor
+    np = None
+
+import gamedata
+import operations
+from influence import add_listener
+from leaders import CONTROL_INFLUENCE, MAX_POPULISM_FOR_REWARD, MIN_STABILITY_FOR_REWARD
+
+DEFAULT_TOP = 10
+
+# Share of countries the player must control to win (main.check_global_domination)
+DOMINATION_SHARE = 0.6
+
+# Score weights, in budget dollars
+CAPITAL_VALUE = 5
+INFLUENCE_VALUE = 10
+RIVAL_LOSS_VALUE = 2
+VISIBILITY_COST = 3
+# Turns of reward income an operation is credited with
+REWARD_TURNS = 5
+# Worth of taking one more country when it is the last one needed to win
+DOMINATION_VALUE = 2000
+EXPOSED_COST = 10000
+EXPOSURE_VISIBILITY = 100
+
+def available():
+    return np is not None
+
+class CountryArrays:
+    """
+    Influence matrix (countries x agencies) and stat columns for a plain dict world,
+    updated from influence.py change notifications instead of being rebuilt per call.
+    """
+    FIELDS = ('stability', 'populism_risk', 'budget_reward', 'capital_reward')
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.rebuild()
+        add_listener(game_state, self)
+
+    def rebuild(self):
+        countries = self.game_state['countries']
+        self.names = list(countries)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.agencies = list(gamedata.agency_names())
+        for data in countries.values():
+            for agency in data['influence']:
+                if agency not in self.agencies:
+                    self.agencies.append(agency)
+        self.agency_index = {agency: j for j, agency in enumerate(self.agencies)}
+
+        self.influence = np.zeros((len(self.names), len(self.agencies)), dtype=np.int64)
+        self.columns = {field: np.zeros(len(self.names), dtype=np.int64) for field in self.FIELDS}
+        for i, data in enumerate(countries.values()):
+            row = self.influence[i]
+            for agency, value in data['influence'].items():
+                row[self.agency_index[agency]] = value
+            for field in self.FIELDS:
+                self.columns[field][i] = data.get(field, 0)
+        self.dirty = False
+
+    def current(self):
+        if self.dirty or len(self.names) != len(self.game_state['countries']):
+            self.rebuild()
+        return self
+
+    def influence_changed(self, country, agency, old, new):
+        i = self.index.get(country)
+        j = self.agency_index.get(agency)
+        if i is None or j is None:
+            self.dirty = True
+        else:
+            self.influence[i, j] = new
+
+    def stat_changed(self, country, field, old, new):
+        i = self.index.get(country)
+        if i is None:
+            self.dirty = True
+        elif field in self.columns:
+            self.columns[field][i] = new
+
+def world_arrays(game_state):
+    """The game's countries as arrays: an ArrayWorld itself, or the game's CountryArrays."""
+    if np is None:
+        raise ImportError("The operation advisor requires NumPy (pip install numpy).")
+    countries = game_state['countries']
+    if hasattr(countries, 'leader_indices'):
+        return countries
+    arrays = game_state.get('_country_arrays')
+    if arrays is None:
+        arrays = game_state['_country_arrays'] = CountryArrays(game_state)
+    return arrays.current()
+
+def score_operations(game_state):
+    """
+    Returns (names, operation_names, scores): scores[o, c] is the value of attempting
+    operation o in country c, or -inf where the player can't afford the operation or has
+    no agent left this turn.
+    Each operation is one set of whole-array operations over the countries.
+    """
+    world = world_arrays(game_state)
+    influence = world.influence
+    present = getattr(world, 'influence_present', None)
+    if present is not None:
+        influence = np.where(present, influence, 0)
+    n = len(influence)
+
+    player = world.agency_index.get(game_state['agency'])
+    own = influence[:, player].astype(np.float64) if player is not None else np.zeros(n)
+    # Agency-major copy, so per-country reductions run along contiguous rows
+    rivals = np.ascontiguousarray(influence.T)
+    np.clip(rivals, 0, None, out=rivals)
+    if player is not None:
+        rivals[player] = 0
+    rival_max = rivals.max(axis=0) if len(rivals) else np.zeros(n, dtype=np.int64)
+
+    stability = world.columns['stability']
+    populism = world.columns['populism_risk']
+    reward = world.columns['budget_reward'] + CAPITAL_VALUE * world.columns['capital_reward']
+    pays_now = (own > rival_max) & (populism <= MAX_POPULISM_FOR_REWARD) & (stability >= MIN_STABILITY_FOR_REWARD)
+    short_of_control = np.maximum(CONTROL_INFLUENCE - own, 0)
+    controlled = own >= CONTROL_INFLUENCE
+    needed = max(1, math.ceil(DOMINATION_SHARE * n) - int(controlled.sum()))
+
+    # Several operations share a rival loss or a stat change; compute each only once
+    removed = {0: 0}
+    eligible_after = {}
+
+    table = operations.CATALOG.player
+    names = list(table.by_name)
+    scores = np.full((len(names), n), -np.inf)
+    # Every operation takes a free agent (operations.perform_operation)
+    has_agent = game_state['agents_used'] < game_state['agents']
+    for o, op in enumerate(table):
+        if not has_agent or not op.affordable(game_state['budget'], game_state['political_capital']):
+            continue
+        chance = op.success_chance
+        gain = op.influence_gain
+        loss = op.rival_influence_loss
+        visibility = op.visibility_increase
+
+        if loss not in removed:
+            removed[loss] = np.minimum(rivals, loss).sum(axis=0)
+        stats = (op.populism_change, op.stability_change)
+        if stats not in eligible_after:
+            eligible_after[stats] = ((populism + stats[0] <= MAX_POPULISM_FOR_REWARD)
+                                     & (stability + stats[1] >= MIN_STABILITY_FOR_REWARD))
+        rival_after = np.maximum(rival_max - loss, 0) if loss else rival_max
+        pays_after = (own + gain > rival_after) & eligible_after[stats]
+        newly_controlled = (own + gain >= CONTROL_INFLUENCE) & ~controlled if gain else 0
+
+        on_success = (INFLUENCE_VALUE * np.minimum(short_of_control, gain)
+                      + RIVAL_LOSS_VALUE * removed[loss]
+                      + REWARD_TURNS * (pays_after.astype(np.float64) - pays_now) * reward
+                      + DOMINATION_VALUE / needed * newly_controlled)
+        exposure = (chance * (game_state['visibility'] + visibility >= EXPOSURE_VISIBILITY)
+                    + (1 - chance) * (game_state['visibility'] + 2 * visibility >= EXPOSURE_VISIBILITY))
+        scores[o] = (chance * on_success
+                     - VISIBILITY_COST * visibility * (2 - chance)
+                     - EXPOSED_COST * exposure
+                     - op.budget - CAPITAL_VALUE * op.capital)
+    return world.names, names, scores
+
+def advise(game_state, top=DEFAULT_TOP):
+    """
+    The `top` best affordable moves as (operation, country, score) tuples, best first.
+    Equal scores go to the earlier operation in the catalog, then the earlier country.
+    """
+    countries, names, scores = score_operations(game_state)
+    flat = scores.ravel()
+    top = min(top, int(np.isfinite(flat).sum()))
+    if top <= 0:
+        return []
+    # argpartition splits ties arbitrarily, so take everything tied with the last place
+    # and let a stable sort over ascending (operation, country) positions decide
+    cutoff = flat[np.argpartition(-flat, top - 1)[top - 1]]
+    best = np.flatnonzero(flat >= cutoff)
+    best = best[np.argsort(-flat[best], kind='stable')][:top]
+    n = len(countries)
+    return [(names[k // n], countries[k % n], float(flat[k])) for k in best.tolist()]
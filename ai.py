@@ -1,39 +1,37 @@
-import random
-import json
+from bisect import bisect_right
+from itertools import accumulate
 
-AI_OPERATIONS = {
-    "Political Influence": {"budget": 20, "capital": 3, "success_chance": 0.6, "influence_gain": 5, "visibility_increase": 2},
-    "Covert Ops": {"budget": 50, "capital": 7, "success_chance": 0.55, "influence_gain": 7, "visibility_increase": 3},
-    "Cyber Warfare": {"budget": 40, "capital": 5, "success_chance": 0.5, "influence_gain": 5, "visibility_increase": 3},
-    "Economic Pressure": {"budget": 30, "capital": 4, "success_chance": 0.5, "influence_gain": 4, "visibility_increase": 2},
-    "Propaganda": {"budget": 25, "capital": 3, "success_chance": 0.6, "influence_gain": 3, "visibility_increase": 1}
-}
+import gamedata
+from eventlog import emitter
+from seeding import game_rng
+import operations
+from records import AgencyRecord
+from influence import add_listener
 
-def load_tech_tree():
-    with open('data/tech_tree.json', 'r') as file:
-        return json.load(file)
+# Kept importable from here for older callers
+AI_OPERATIONS = operations.AI_OPERATIONS
 
-TECH_TREE = load_tech_tree()
-
-def rival_turn(game_state, log_callback=None):
+def rival_turn(game_state, log_callback=None, rng=None, planner=None):
     """
     Process each rival agency's turn.
-    If log_callback is provided, it should be a function that accepts a string, e.g., log_callback("some message").
+    log_callback may be an eventlog.EventLog, or a function that accepts a string, e.g., log_callback("some message").
     Otherwise, we default to print statements.
+    rng defaults to the game's own generator (seeding.game_rng).
+    planner, if given, replaces the greedy choice: planner(game_state, rival, ai_data) returns
+    (operation, target_country), or (None, None) to hold (see mcts.planner).
+    Every rival picks and pays for its operation first; then all the orders are resolved
+    together by operations.resolve_orders, and the rivals that acted research afterwards.
     """
-    def log(msg):
-        if log_callback:
-            log_callback(msg)
-        else:
-            print(msg)
-
-    rivals = ["CIA", "Mossad", "MSS", "FSB"]
-    rivals.remove(game_state['agency'])
-
-    for rival in rivals:
-        ai_data = game_state['ai_resources'].get(rival, {
-            "budget": 0, "political_capital": 0, "research_points": 0, "agents": 1, "researched_techs": []
-        })
+    rng = rng or game_rng(game_state)
+    log = emitter(log_callback)
+    table = operations.CATALOG.rival
+
+    orders = []
+    for rival in gamedata.rival_agencies(game_state['agency']):
+        ai_data = game_state['ai_resources'].get(rival)
+        if ai_data is None:
+            ai_data = AgencyRecord(agents=1)
+        game_state['ai_resources'][rival] = ai_data
 
         # Passive visibility increase
         game_state['visibility_tracker'][rival] += 1
@@ -42,72 +40,73 @@ def rival_turn(game_state, log_callback=None):
         ai_data['research_points'] += 3
 
         if game_state['visibility_tracker'][rival] >= 100:
-            log(f"{rival} is frozen due to exposure and can only research or buy agents.")
+            log('rival_frozen', rival)
             ai_research_tech(game_state, rival, ai_data, log)
             ai_buy_agent(game_state, rival, ai_data, log)
-            game_state['ai_resources'][rival] = ai_data
             continue
 
         # Try to buy agents before operations
         ai_buy_agent(game_state, rival, ai_data, log)
 
-        target_country = pick_target_country(game_state, rival)
-        operation = pick_affordable_operation(ai_data)
+        if planner is None:
+            target_country = pick_target_country(game_state, rival, rng)
+            operation = pick_affordable_operation(ai_data)
+        else:
+            operation, target_country = planner(game_state, rival, ai_data)
 
         if operation is None:
-            log(f"{rival} skips a turn due to lack of resources.")
+            log('rival_skip' if planner is None else 'rival_hold', rival)
             ai_research_tech(game_state, rival, ai_data, log)
-            game_state['ai_resources'][rival] = ai_data
             continue
 
-        log(f"{rival} is conducting {operation} in {target_country}...")
+        log('rival_operation', rival, target_country, operation=operation)
 
-        op_data = AI_OPERATIONS[operation]
-        if ai_data['budget'] < op_data['budget'] or ai_data['political_capital'] < op_data['capital']:
-            log(f"{rival} cannot afford {operation} this turn.")
+        op = table[operation]
+        if not op.affordable(ai_data['budget'], ai_data['political_capital']):
+            log('rival_cannot_afford', rival, operation=operation)
             ai_research_tech(game_state, rival, ai_data, log)
-            game_state['ai_resources'][rival] = ai_data
             continue
 
         # Pay for operation
-        ai_data['budget'] -= op_data['budget']
-        ai_data['political_capital'] -= op_data['capital']
+        ai_data['budget'] -= op.budget
+        ai_data['political_capital'] -= op.capital
+        orders.append((rival, operation, target_country))
 
-        success = random.random() < op_data['success_chance']
+    if not orders:
+        return
+    results = operations.resolve_orders(game_state, orders, rng)
+    for (rival, operation, target_country), (success, _) in zip(orders, results):
         if success:
-            log(f"{rival} successfully increases influence in {target_country}.")
-            game_state['countries'][target_country]['influence'][rival] += op_data['influence_gain']
-            visibility_increase = op_data.get('visibility_increase', 2)
+            log('rival_success', rival, target_country, operation=operation, influence=table[operation].influence_gain)
         else:
-            log(f"{rival}'s {operation} failed in {target_country}.")
-            visibility_increase = op_data.get('visibility_increase', 2) * 2
-
-        game_state['visibility_tracker'][rival] += visibility_increase
-
-        ai_research_tech(game_state, rival, ai_data, log)
-        game_state['ai_resources'][rival] = ai_data
+            log('rival_failure', rival, target_country, operation=operation)
+        ai_research_tech(game_state, rival, game_state['ai_resources'][rival], log)
 
 def ai_research_tech(game_state, rival, ai_data, log):
-    if rival in ai_data['researched_techs']:
+    if ai_data.has_tech(rival):
         return
-    available_techs = {name: data for name, data in TECH_TREE.items() if name not in ai_data['researched_techs']}
-
-    if not available_techs:
+    # Nothing is affordable if even the cheapest tech costs too much
+    by_cost = gamedata.techs_by_cost()
+    if not by_cost or ai_data['research_points'] < by_cost[0][1]['cost']:
         return
 
+    # Researched techs are a bitset over tech_tree.json positions (see records.AgencyRecord)
+    researched = ai_data.techs
+    tech_index = gamedata.tech_index()
+
     # Prioritize visibility reduction if high
     if game_state['visibility_tracker'][rival] >= 60:
-        sorted_techs = sorted(available_techs.items(), key=lambda x: -x[1]['visibility_reduction'])
+        sorted_techs = gamedata.techs_by_visibility_reduction()
     else:
-        sorted_techs = list(available_techs.items())
+        sorted_techs = gamedata.tech_tree().items()
 
     for tech_name, tech_data in sorted_techs:
-        if ai_data['research_points'] >= tech_data['cost']:
+        if not researched >> tech_index[tech_name] & 1 and ai_data['research_points'] >= tech_data['cost']:
             ai_data['research_points'] -= tech_data['cost']
-            ai_data['researched_techs'].append(tech_name)
+            ai_data.add_tech(tech_name)
             old_vis = game_state['visibility_tracker'][rival]
             game_state['visibility_tracker'][rival] = max(0, old_vis - tech_data['visibility_reduction'])
-            log(f"{rival} researched {tech_name}, reducing visibility from {old_vis} to {game_state['visibility_tracker'][rival]}.")
+            log('rival_research', rival, tech=tech_name, old=old_vis, new=game_state['visibility_tracker'][rival])
             break
 
 def ai_buy_agent(game_state, rival, ai_data, log):
@@ -115,32 +114,85 @@ def ai_buy_agent(game_state, rival, ai_data, log):
         ai_data['budget'] -= 200
         ai_data['political_capital'] -= 50
         ai_data['agents'] += 1
-        log(f"{rival} recruited a new agent.")
-
-def pick_target_country(game_state, rival):
-    countries = list(game_state['countries'].keys())
-    weighted_countries = []
-    for country in countries:
-        influence = game_state['countries'][country]['influence']
-        rival_influence = influence.get(rival, 0)
-        player_influence = influence.get(game_state['agency'], 0)
+        log('rival_recruit', rival)
 
-        weight = 1
-        if rival_influence > 20:
-            weight += 3
-        if player_influence > 15:
-            weight += 2
+# Influence above these marks makes a country a likelier target
+RIVAL_FOCUS_INFLUENCE = 20
+PLAYER_THREAT_INFLUENCE = 15
 
-        weighted_countries.extend([country] * weight)
+def target_weight(influence, rival, player):
+    weight = 1
+    if influence.get(rival, 0) > RIVAL_FOCUS_INFLUENCE:
+        weight += 3
+    if influence.get(player, 0) > PLAYER_THREAT_INFLUENCE:
+        weight += 2
+    return weight
 
-    return random.choice(weighted_countries)
+class TargetSampler:
+    """
+    Cumulative-weight index over the countries for one rival.
+    A pick is one randrange over the total weight plus a bisect, which gives exactly the
+    picks random.choice would give on the old list with every country repeated `weight`
+    times. The index is only rebuilt after some influence crosses a weight threshold.
+    """
+    def __init__(self, game_state, rival):
+        self.game_state = game_state
+        self.rival = rival
+        self.player = game_state['agency']
+        self.dirty = True
+
+    def rebuild(self):
+        countries = self.game_state['countries']
+        self.names = list(countries)
+        self.cumulative = list(accumulate(
+            target_weight(data['influence'], self.rival, self.player) for data in countries.values()
+        ))
+        self.dirty = False
+
+    def pick(self, rng):
+        if self.dirty or len(self.names) != len(self.game_state['countries']):
+            self.rebuild()
+        index = rng.randrange(self.cumulative[-1])
+        return self.names[bisect_right(self.cumulative, index)]
+
+class TargetSamplers:
+    """
+    Every rival's TargetSampler, behind a single influence listener, so a change only
+    touches the sampler of the agency involved (or all of them when the player's
+    influence crosses its mark) no matter how many agencies there are.
+    """
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.player = game_state['agency']
+        self.samplers = {}
+        add_listener(game_state, self)
+
+    def get(self, rival):
+        sampler = self.samplers.get(rival)
+        if sampler is None:
+            sampler = self.samplers[rival] = TargetSampler(self.game_state, rival)
+        return sampler
+
+    def influence_changed(self, country, agency, old, new):
+        if agency == self.player:
+            if (old > PLAYER_THREAT_INFLUENCE) != (new > PLAYER_THREAT_INFLUENCE):
+                for sampler in self.samplers.values():
+                    sampler.dirty = True
+        elif (old > RIVAL_FOCUS_INFLUENCE) != (new > RIVAL_FOCUS_INFLUENCE):
+            sampler = self.samplers.get(agency)
+            if sampler is not None:
+                sampler.dirty = True
+
+    def stat_changed(self, country, field, old, new):
+        pass
+
+def pick_target_country(game_state, rival, rng=None):
+    samplers = game_state.get('_target_samplers')
+    if samplers is None:
+        samplers = game_state['_target_samplers'] = TargetSamplers(game_state)
+    return samplers.get(rival).pick(rng or game_rng(game_state))
 
 def pick_affordable_operation(ai_resources):
-    affordable_ops = [
-        op for op, data in AI_OPERATIONS.items()
-        if ai_resources['budget'] >= data['budget'] and ai_resources['political_capital'] >= data['capital']
-    ]
-    if not affordable_ops:
-        return None
-    affordable_ops.sort(key=lambda op: AI_OPERATIONS[op]['budget'], reverse=True)
-    return affordable_ops[0]
+    """The most expensive operation the rival can afford (catalog order breaks ties), or None."""
+    op = operations.CATALOG.rival.most_expensive_affordable(ai_resources['budget'], ai_resources['political_capital'])
+    return op.name if op else None
@@ -0,0 +1,186 @@
+"""
+Journaled autosave.
+Instead of dumping the whole game_state on the Tk thread every turn, AutosaveWriter
+hands each turn's changes to a background thread through a bounded queue. The thread
+appends them as one JSON line to a journal and every few turns writes a compacted
+snapshot (temp file + rename, so a crash never leaves a half-written save).
+recover() rebuilds the latest state from the snapshot plus the journal.
+
+The replay record only grows, so each journal line holds just the actions recorded
+since the previous one rather than the whole record.
+
+Only countries changed through influence.py are journaled, so every mutation of
+country data must go through those helpers.
+"""
+import copy
+import json
+import os
+import queue
+import threading
+
+from influence import add_listener
+from records import json_default
+
+SAVE_PATH = os.path.join('save', 'save1.json')
+SNAPSHOT_EVERY = 10
+QUEUE_SIZE = 8
+
+def journal_path(path):
+    return os.path.splitext(path)[0] + '.journal'
+
+def atomic_write_json(path, obj, **dump_kwargs):
+    """
+    Writes obj as JSON to a temp file next to path, then renames it over path.
+    Compact worlds and agency records (records.py) are written in the plain dict layout.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    dump_kwargs.setdefault('default', json_default)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(obj, file, **dump_kwargs)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+def copy_country(data):
+    """Plain-dict copy of one country record (also works on world.ArrayWorld rows)."""
+    return {key: dict(value) if key == 'influence' else value for key, value in data.items()}
+
+def plain_state(game_state):
+    """Deep copy of the saveable part of game_state, with countries as plain dicts."""
+    state = {key: copy.deepcopy(value) for key, value in game_state.items()
+             if key != 'countries' and not key.startswith('_')}
+    state['countries'] = {name: copy_country(data) for name, data in game_state['countries'].items()}
+    return state
+
+class AutosaveWriter:
+    def __init__(self, path=SAVE_PATH, snapshot_every=SNAPSHOT_EVERY, queue_size=QUEUE_SIZE):
+        self.path = path
+        self.journal = journal_path(path)
+        self.snapshot_every = snapshot_every
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dirty = set()
+        # How many of the replay record's actions the writer has been sent
+        self.actions_sent = 0
+        self.thread = None
+        # The writer thread's own copy of the game, used to diff and to write snapshots
+        self.mirror = None
+
+    # --------------------------------------------------
+    # Main-thread side
+    # --------------------------------------------------
+    def start(self, game_state):
+        """Starts the writer thread; the first job is a full snapshot of game_state."""
+        add_listener(game_state, self)
+        self.actions_sent = len(game_state.get('replay', {}).get('actions', ()))
+        self.thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self.thread.start()
+        self.queue.put(('snapshot', plain_state(game_state)))
+
+    def influence_changed(self, country, agency, old, new):
+        self.dirty.add(country)
+
+    def stat_changed(self, country, field, old, new):
+        self.dirty.add(country)
+
+    def submit(self, game_state):
+        """
+        Queues this turn's changes. Only countries touched since the last submit are copied.
+        Blocks if the writer has fallen QUEUE_SIZE turns behind.
+        """
+        countries = game_state['countries']
+        changed = {name: copy_country(countries[name]) for name in self.dirty}
+        self.dirty = set()
+        rest = {key: copy.deepcopy(value) for key, value in game_state.items()
+                if key not in ('countries', 'replay') and not key.startswith('_')}
+        replay = game_state.get('replay', {})
+        head = {key: copy.deepcopy(value) for key, value in replay.items() if key != 'actions'}
+        actions = copy.deepcopy(replay.get('actions', [])[self.actions_sent:])
+        self.actions_sent += len(actions)
+        self.queue.put(('turn', rest, changed, head, actions))
+
+    def close(self):
+        """Flushes everything queued so far and stops the thread."""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    # --------------------------------------------------
+    # Writer thread
+    # --------------------------------------------------
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            try:
+                if job[0] == 'snapshot':
+                    self.mirror = job[1]
+                    self._write_snapshot()
+                else:
+                    self._write_turn(*job[1:])
+            except Exception as e:
+                print(f"Error saving game: {e}")
+
+    def _write_snapshot(self):
+        atomic_write_json(self.path, self.mirror, separators=(',', ':'))
+        # Everything in the journal is now part of the snapshot
+        with open(self.journal, 'w'):
+            pass
+
+    def _write_turn(self, rest, changed, head, actions):
+        entry = {'turn': rest['turn'],
+                 'state': {key: value for key, value in rest.items() if self.mirror.get(key) != value},
+                 'countries': changed}
+        replay = self.mirror.setdefault('replay', {'actions': []})
+        if any(replay.get(key) != value for key, value in head.items()):
+            entry['replay'] = head
+        if actions:
+            entry['actions'] = actions
+        self.mirror.update(rest)
+        self.mirror['countries'].update(changed)
+        replay.update(head)
+        replay['actions'].extend(actions)
+
+        if rest['turn'] % self.snapshot_every == 0:
+            self._write_snapshot()
+            return
+        with open(self.journal, 'a') as file:
+            file.write(json.dumps(entry, separators=(',', ':'), default=json_default) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+def recover(path=SAVE_PATH):
+    """
+    Rebuilds the latest saved state from the snapshot at path plus its journal.
+    Returns None if there is no snapshot. A torn last journal line (crash mid-append) is ignored.
+    """
+    try:
+        with open(path, 'r') as file:
+            state = json.load(file)
+    except FileNotFoundError:
+        return None
+
+    try:
+        with open(journal_path(path), 'r') as file:
+            lines = file.readlines()
+    except FileNotFoundError:
+        lines = []
+
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            break
+        if entry['turn'] <= state['turn']:
+            continue  # already part of the snapshot
+        state.update(entry['state'])
+        state['countries'].update(entry['countries'])
+        if 'replay' in entry or 'actions' in entry:
+            replay = state.setdefault('replay', {'actions': []})
+            replay.update(entry.get('replay', {}))
+            replay['actions'].extend(entry.get('actions', ()))
+    return state
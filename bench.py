@@ -0,0 +1,193 @@
+"""
+Benchmark suite.
+Times the turn pipeline's pieces and a full headless turn on synthetic worlds
+(worldgen.py) at several scales, and reports turns/sec, per-call latency percentiles
+and peak RSS. Each scale runs in a fresh process so its peak RSS is its own.
+
+Usage:
+    python bench.py --scales small,medium --output bench_results.json
+    python bench.py --output new.json --baseline bench_results.json   # exits 1 on regressions
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# name -> (countries, techs)
+SCALES = {
+    'small': (100, 10),
+    'medium': (10_000, 100),
+    'large': (100_000, 1_000),
+    'huge': (1_000_000, 10_000),
+}
+DEFAULT_SCALES = 'small,medium,large'
+
+MIN_TIME = 1.0     # seconds spent per benchmark
+MIN_CALLS = 3
+MAX_CALLS = 500
+TOLERANCE = 0.25   # a p50 this much slower than the baseline counts as a regression
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def measure(func, setup=None, min_time=MIN_TIME, fresh=False):
+    """
+    Calls func(state) repeatedly (state comes from setup()) and returns latency stats in ms.
+    One untimed warm-up call first builds any lazy per-game indexes.
+    With fresh=True every timed call gets its own warmed-up state, for benchmarks whose
+    repeated calls would drift into a state no real turn sees (rivals stop acting once their
+    visibility reaches 100); the untimed setup then counts against min_time.
+    """
+    def warmed_up():
+        state = setup() if setup else None
+        if func(state) == 'reset' and setup:
+            state = setup()
+        return state
+
+    state = warmed_up()
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < MAX_CALLS and (len(timings) < MIN_CALLS or time.perf_counter() - started < min_time):
+        if fresh and timings:
+            state = warmed_up()
+        start = time.perf_counter()
+        result = func(state)
+        timings.append((time.perf_counter() - start) * 1000)
+        if result == 'reset' and setup:
+            state = setup()
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    return {
+        'calls': len(timings),
+        'mean_ms': mean,
+        'p50_ms': percentile(timings, 0.50),
+        'p90_ms': percentile(timings, 0.90),
+        'p99_ms': percentile(timings, 0.99),
+        'per_sec': 1000 / mean if mean else None,
+    }
+
+def run_scale(scale, min_time=MIN_TIME):
+    """Generates the world for one scale and runs every benchmark on it (in the current process)."""
+    import ai
+    import engine
+    import events
+    import eventlog
+    import forking
+    import gamedata
+    import main
+    import simulate
+    import worldgen
+
+    n_countries, n_techs = SCALES[scale]
+    with tempfile.TemporaryDirectory() as tmp:
+        worldgen.write_world(tmp, n_countries, n_techs)
+        gamedata.use_data_dir(tmp)
+        save_path = os.path.join(tmp, 'save.json')
+
+        def new_game():
+            return main.initialize_game('CIA', seed=12345)
+
+        def full_turn(game_state):
+            outcome, _ = engine.play_turn(game_state, simulate.greedy_policy)
+            return 'reset' if outcome else None
+
+        # name -> (function, whether each call needs a fresh game)
+        benchmarks = {
+            'rival_turn': (lambda gs: ai.rival_turn(gs, log_callback=eventlog.NULL_LOG), True),
+            'global_events': (lambda gs: events.global_events(gs, log_callback=eventlog.NULL_LOG), True),
+            'award_country_rewards': (main.award_country_rewards, False),
+            'check_win_conditions': (main.check_win_conditions, False),
+            'save_game': (lambda gs: main.save_game(gs, save_path), False),
+            'full_turn': (full_turn, False),
+        }
+        results = {name: measure(func, new_game, min_time, fresh)
+                   for name, (func, fresh) in benchmarks.items()}
+        # Forking, and the CowCountries layer lookups it adds to a whole-world pass
+        results['fork'] = measure(forking.fork, new_game, min_time)
+        results['award_country_rewards_forked'] = measure(
+            main.award_country_rewards, lambda: forking.fork(new_game()), min_time)
+        gamedata.use_data_dir(gamedata._data_dir())
+
+    return {'countries': n_countries, 'techs': n_techs, 'benchmarks': results, 'peak_rss_mb': peak_rss_mb()}
+
+def run(scales, min_time=MIN_TIME):
+    results = {}
+    for scale in scales:
+        # One fresh process per scale keeps each scale's peak RSS separate
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results[scale] = pool.submit(run_scale, scale, min_time).result()
+    return {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform(),
+                 'time': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'results': results,
+    }
+
+def format_results(report):
+    lines = [f"{'Scale':<8}{'Benchmark':<24}{'Calls':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'per sec':>10}"]
+    for scale, result in report['results'].items():
+        for name, stats in result['benchmarks'].items():
+            lines.append(f"{scale:<8}{name:<24}{stats['calls']:>7}{stats['p50_ms']:>10.3f}"
+                         f"{stats['p90_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['per_sec']:>10.1f}")
+        rss = result['peak_rss_mb']
+        lines.append(f"{scale:<8}{'peak RSS':<24}{'':>7}{(f'{rss:.1f} MB' if rss else '-'):>10}")
+    return "\n".join(lines)
+
+def compare(report, baseline, tolerance=TOLERANCE):
+    """Returns a list of regression messages: benchmarks whose p50 grew by more than tolerance."""
+    regressions = []
+    for scale, result in report['results'].items():
+        base = baseline.get('results', {}).get(scale)
+        if not base:
+            continue
+        for name, stats in result['benchmarks'].items():
+            base_stats = base['benchmarks'].get(name)
+            if base_stats and stats['p50_ms'] > base_stats['p50_ms'] * (1 + tolerance):
+                regressions.append(f"{scale}/{name}: p50 {base_stats['p50_ms']:.3f} ms -> {stats['p50_ms']:.3f} ms")
+    return regressions
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Deep State turn pipeline.")
+    parser.add_argument('--scales', default=DEFAULT_SCALES, help=f"Comma-separated from: {', '.join(SCALES)}")
+    parser.add_argument('--min-time', type=float, default=MIN_TIME, help="Seconds spent per benchmark.")
+    parser.add_argument('--output', help="Write the results as JSON to this file.")
+    parser.add_argument('--baseline', help="Compare against a previous --output file.")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    scales = [scale.strip() for scale in args.scales.split(',') if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"unknown scales: {', '.join(unknown)}")
+
+    report = run(scales, args.min_time)
+    print(format_results(report))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,158 @@
+"""
+Per-turn change sets.
+A ChangeTracker attached to a game with track() is an influence listener, so it hears
+about every country change made through influence.py (which operations, rival moves and
+events all go through). It also compares the game's per-agency resources and top-level
+fields against the values it saw at the previous take(), which only costs time in
+proportion to the number of agencies. take() returns a ChangeSet with the old and new
+values of just what changed since the last take(): a UI refresh, a save or a client
+update can then do work in proportion to the change rather than to the world.
+"""
+from influence import add_listener
+
+# game_state keys that aren't compared as plain fields
+STRUCTURED_KEYS = ('countries', 'ai_resources', 'visibility_tracker', 'replay')
+COUNTRY_STATS = ('stability', 'populism_risk')
+
+_MISSING = object()
+
+def _frozen(value):
+    # Lists (researched_techs) are compared by value, so keep an immutable copy
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+def _thawed(value):
+    return list(value) if isinstance(value, tuple) else value
+
+class ChangeSet:
+    """
+    What changed between two take() calls:
+        countries  country -> {'influence': {agency: (old, new)}, 'stability': (old, new), ...}
+        agencies   agency -> {field: (old, new)}, for ai_resources fields plus 'visibility'
+                   (visibility_tracker)
+        fields     game_state key -> (old, new), e.g. 'budget', 'turn', 'researched_techs'
+    List values come as tuples.
+    """
+    __slots__ = ('countries', 'agencies', 'fields')
+
+    def __init__(self, countries=None, agencies=None, fields=None):
+        self.countries = countries or {}
+        self.agencies = agencies or {}
+        self.fields = fields or {}
+
+    def __bool__(self):
+        return bool(self.countries or self.agencies or self.fields)
+
+    def __repr__(self):
+        return (f"ChangeSet({len(self.countries)} countries, {len(self.agencies)} agencies, "
+                f"fields {sorted(self.fields)})")
+
+    def to_dict(self):
+        """JSON-friendly form: every (old, new) pair as [old, new]."""
+        def pairs(changes):
+            return {key: [_thawed(old), _thawed(new)] for key, (old, new) in changes.items()}
+        countries = {}
+        for country, record in self.countries.items():
+            countries[country] = {field: pairs(value) if field == 'influence' else list(value)
+                                  for field, value in record.items()}
+        return {'countries': countries,
+                'agencies': {agency: pairs(changes) for agency, changes in self.agencies.items()},
+                'fields': pairs(self.fields)}
+
+def apply_changes(state, changes):
+    """
+    Brings a copy of a game up to date with a ChangeSet.to_dict(), e.g. a client's mirror of
+    a server game that was in sync when the changes started.
+    """
+    for country, record in changes['countries'].items():
+        data = state['countries'][country]
+        for agency, (_, new) in record.get('influence', {}).items():
+            data['influence'][agency] = new
+        for field in COUNTRY_STATS:
+            if field in record:
+                data[field] = record[field][1]
+    for agency, fields in changes['agencies'].items():
+        for field, (_, new) in fields.items():
+            if field == 'visibility':
+                state['visibility_tracker'][agency] = new
+            else:
+                state['ai_resources'].setdefault(agency, {})[field] = new
+    for key, (_, new) in changes['fields'].items():
+        state[key] = new
+
+class ChangeTracker:
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.countries = {}
+        self.fields = {}
+        self.agencies = {}
+        self._remember()
+        add_listener(game_state, self)
+
+    def influence_changed(self, country, agency, old, new):
+        influence = self.countries.setdefault(country, {}).setdefault('influence', {})
+        first = influence.get(agency)
+        influence[agency] = (old if first is None else first[0], new)
+
+    def stat_changed(self, country, field, old, new):
+        record = self.countries.setdefault(country, {})
+        first = record.get(field)
+        record[field] = (old if first is None else first[0], new)
+
+    def _agency_values(self):
+        game_state = self.game_state
+        values = {agency: {field: _frozen(value) for field, value in resources.items()}
+                  for agency, resources in game_state['ai_resources'].items()}
+        for agency, visibility in game_state['visibility_tracker'].items():
+            values.setdefault(agency, {})['visibility'] = visibility
+        return values
+
+    def _field_values(self):
+        return {key: _frozen(value) for key, value in self.game_state.items()
+                if key not in STRUCTURED_KEYS and not key.startswith('_')}
+
+    def _remember(self):
+        self.fields = self._field_values()
+        self.agencies = self._agency_values()
+
+    def take(self):
+        """The ChangeSet since the previous take() (or since tracking started)."""
+        countries = {}
+        for country, record in self.countries.items():
+            changed = {field: pair for field, pair in record.items() if field != 'influence' and pair[0] != pair[1]}
+            influence = {agency: pair for agency, pair in record.get('influence', {}).items() if pair[0] != pair[1]}
+            if influence:
+                changed['influence'] = influence
+            if changed:
+                countries[country] = changed
+        self.countries = {}
+
+        fields = {}
+        now = self._field_values()
+        for key, new in now.items():
+            old = self.fields.get(key, _MISSING)
+            if old != new:
+                fields[key] = (None if old is _MISSING else old, new)
+
+        agencies = {}
+        now_agencies = self._agency_values()
+        for agency, values in now_agencies.items():
+            before = self.agencies.get(agency, {})
+            changed = {field: (before.get(field), new) for field, new in values.items()
+                       if before.get(field, _MISSING) != new}
+            if changed:
+                agencies[agency] = changed
+
+        self.fields = now
+        self.agencies = now_agencies
+        return ChangeSet(countries, agencies, fields)
+
+def track(game_state):
+    """The game's ChangeTracker, attached on first use."""
+    tracker = game_state.get('_change_tracker')
+    if tracker is None:
+        tracker = game_state['_change_tracker'] = ChangeTracker(game_state)
+    return tracker
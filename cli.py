@@ -0,0 +1,134 @@
+"""
+Headless command line.
+Plays, saves, loads and replays games without the Tk window. Nothing here imports
+tkinter, and game data is only read when a game first needs it (gamedata.py resolves
+the data files next to the code, so the working directory doesn't matter).
+
+Usage:
+    python cli.py new --agency MSS --seed 7 --save save/cli.json
+    python cli.py play --load save/cli.json --turns 20 --policy greedy --save save/cli.json
+    python cli.py replay save/cli.json --turn 10
+    python cli.py startup        # checks import-to-first-turn time against STARTUP_BUDGET_MS
+"""
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+import engine
+import main
+import simulate
+
+# Wall time for a fresh interpreter to import the engine and finish one turn
+STARTUP_BUDGET_MS = 150
+STARTUP_RUNS = 5
+
+def new_game(args):
+    rival_ai = {'name': 'mcts', 'budget_ms': args.mcts_ms} if args.mcts_ms else None
+    return main.initialize_game(args.agency, seed=args.seed, rival_ai=rival_ai)
+
+def save(game_state, path):
+    if path.endswith('.snap'):
+        main.save_snapshot(game_state, path)
+    else:
+        main.save_game(game_state, path)
+
+def describe(game_state):
+    return (f"Turn {game_state['turn']} | {game_state['agency']} | Budget {game_state['budget']} | "
+            f"Capital {game_state['political_capital']} | Visibility {game_state['visibility']}% | "
+            f"Agents {game_state['agents']}")
+
+def cmd_new(args):
+    game_state = new_game(args)
+    if args.save:
+        save(game_state, args.save)
+    print(describe(game_state))
+
+def cmd_play(args):
+    if args.load:
+        game_state = main.load_game(args.load)
+        if game_state is None:
+            sys.exit(f"No save at {args.load}")
+    else:
+        game_state = new_game(args)
+
+    policy = simulate.POLICIES[args.policy]
+    log = print if args.verbose else None
+    outcome = None
+    for done in range(args.turns):
+        outcome, msg = engine.play_turn(game_state, policy, log_callback=log)
+        if done == 0 and args.timing:
+            print(f"First turn done {(time.perf_counter() - STARTED) * 1000:.1f} ms after start of import")
+        if outcome:
+            print(msg)
+            break
+
+    if args.save and not outcome:
+        save(game_state, args.save)
+    print(describe(game_state))
+
+def cmd_replay(args):
+    import replay
+    replay.main_cli(args.rest)
+
+def startup_times(runs=STARTUP_RUNS):
+    """Wall time (ms) of fresh `cli.py play --turns 1` processes."""
+    command = [sys.executable, os.path.abspath(__file__), 'play', '--turns', '1', '--seed', '0']
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def cmd_startup(args):
+    times = startup_times(args.runs)
+    median = statistics.median(times)
+    print(f"Start-to-first-turn: median {median:.1f} ms, min {min(times):.1f} ms "
+          f"over {len(times)} runs (budget {args.budget_ms} ms)")
+    if median > args.budget_ms:
+        sys.exit(1)
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Play Deep State without the UI.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def game_options(command):
+        command.add_argument('--agency', default="CIA")
+        command.add_argument('--seed', type=int, default=None)
+        command.add_argument('--mcts-ms', type=int, default=None,
+                             help="Give rivals the MCTS AI with this per-rival budget (ms).")
+        command.add_argument('--save', help="Write the game here (.snap for a binary snapshot).")
+
+    new = sub.add_parser('new', help="Start a game.")
+    game_options(new)
+    new.set_defaults(func=cmd_new)
+
+    play = sub.add_parser('play', help="Play scripted turns.")
+    game_options(play)
+    play.add_argument('--load', help="Continue this save instead of starting a new game.")
+    play.add_argument('--turns', type=int, default=1)
+    play.add_argument('--policy', choices=sorted(simulate.POLICIES), default='greedy')
+    play.add_argument('--verbose', action='store_true', help="Print the game log.")
+    play.add_argument('--timing', action='store_true', help="Report time from start of import to the first turn.")
+    play.set_defaults(func=cmd_play)
+
+    replay = sub.add_parser('replay', add_help=False, help="Re-simulate a game (same options as replay.py).")
+    replay.add_argument('rest', nargs=argparse.REMAINDER)
+    replay.set_defaults(func=cmd_replay)
+
+    startup = sub.add_parser('startup', help="Measure start-to-first-turn time of fresh processes.")
+    startup.add_argument('--runs', type=int, default=STARTUP_RUNS)
+    startup.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    startup.set_defaults(func=cmd_startup)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main_cli()
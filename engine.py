@@ -0,0 +1,141 @@
+"""
+UI-free turn engine.
+Runs the same end-of-turn pipeline as the Tkinter window (rival turn, global events,
+rewards, win checks, resource tick, exposure check) so games can be played headlessly.
+"""
+import ai
+import events
+import eventlog
+import main
+import mcts
+import operations
+import profiling
+import seeding
+
+# Resources the player gains at the start of every new turn
+TURN_INCOME = {'budget': 50, 'political_capital': 5, 'research_points': 3}
+TURN_VISIBILITY_INCREASE = 1
+
+# Safety cap so a buggy policy can't loop forever inside one turn
+MAX_ACTIONS_PER_TURN = 20
+
+# Action kind -> length of the action tuple
+ACTION_LENGTHS = {"operation": 3, "research": 2, "buy_agent": 1}
+
+def check_action(game_state, action):
+    """
+    Why `action` isn't a well-formed action for this game, or None if it is.
+    Only the shape and names are checked (affordability is up to the action itself);
+    nothing in game_state is changed.
+    """
+    if not isinstance(action, (tuple, list)) or not action:
+        return "An action must be a non-empty list."
+    kind = action[0]
+    if not isinstance(kind, str) or kind not in ACTION_LENGTHS:
+        return f"Unknown action: {kind}"
+    if len(action) != ACTION_LENGTHS[kind]:
+        return f"{kind} takes {ACTION_LENGTHS[kind] - 1} argument(s)."
+    if not all(isinstance(argument, str) for argument in action[1:]):
+        return f"{kind} arguments must be names."
+    if kind == "operation":
+        if action[1] not in operations.CATALOG.player.by_name:
+            return f"Unknown operation: {action[1]}"
+        if action[2] not in game_state['countries']:
+            return f"Unknown country: {action[2]}"
+    return None
+
+def apply_action(game_state, action, record=True):
+    """
+    Applies one player action and returns (ok, message).
+    Actions are tuples:
+        ("operation", operation_name, country_name)
+        ("research", tech_name)
+        ("buy_agent",)
+    Malformed actions (see check_action) are refused before anything is charged.
+    Every other attempted action is added to the game's replay record unless record=False.
+    """
+    problem = check_action(game_state, action)
+    if problem:
+        return False, problem
+    if record:
+        seeding.record_action(game_state, action)
+    kind = action[0]
+    if kind == "operation":
+        return operations.execute_operation(game_state, action[1], action[2])
+    if kind == "research":
+        available_techs = main.research_technology(game_state)
+        if action[1] not in available_techs:
+            return False, f"{action[1]} is not available."
+        return main.apply_tech_choice(game_state, action[1], available_techs[action[1]])
+    if kind == "buy_agent":
+        return main.buy_agent(game_state)
+
+def end_turn(game_state, log_callback=None):
+    """
+    Runs the end-of-turn pipeline.
+    Returns (outcome, message) where outcome is None while the game goes on,
+    'win' if the player won, or 'exposed' if the player's visibility hit 100%.
+    """
+    profiling.next_turn()
+    with profiling.phase('turn'):
+        return _end_turn(game_state, log_callback)
+
+def _end_turn(game_state, log_callback):
+    # With no log, events are dropped before any text is formatted
+    log = log_callback or eventlog.NULL_LOG
+    rng = seeding.game_rng(game_state)
+
+    with profiling.phase('rival_turn'):
+        ai.rival_turn(game_state, log_callback=log, rng=rng, planner=mcts.planner(game_state))
+    with profiling.phase('global_events'):
+        events.global_events(game_state, log_callback=log, rng=rng)
+    with profiling.phase('rewards'):
+        main.award_country_rewards(game_state)
+
+    with profiling.phase('win_checks'):
+        won, msg = main.check_win_conditions(game_state)
+    if won:
+        return 'win', msg
+
+    # Increase resources
+    with profiling.phase('resource_tick'):
+        game_state['turn'] += 1
+        for key, amount in TURN_INCOME.items():
+            game_state[key] += amount
+        game_state['visibility'] += TURN_VISIBILITY_INCREASE
+
+    if game_state['visibility'] >= 100:
+        return 'exposed', "Your agency has been exposed!"
+
+    # Reset agents
+    game_state['agents_used'] = 0
+    return None, f"End of Turn {game_state['turn'] - 1}. Starting Turn {game_state['turn']}."
+
+def play_turn(game_state, policy, log_callback=None):
+    """Lets the policy act until it returns None, then ends the turn."""
+    log_callback = log_callback or eventlog.NULL_LOG
+    log = eventlog.emitter(log_callback)
+    for _ in range(MAX_ACTIONS_PER_TURN):
+        action = policy(game_state)
+        if action is None:
+            break
+        ok, msg = apply_action(game_state, action)
+        log('message', text=msg)
+        if not ok:
+            break
+    return end_turn(game_state, log_callback=log_callback)
+
+def play_game(game_state, policy, max_turns=200, log_callback=None, on_turn=None):
+    """
+    Plays a game to the end (or max_turns).
+    Returns (outcome, turns, message); outcome is 'timeout' if nobody won in time.
+    on_turn, if given, is called with the game_state after every turn.
+    """
+    while game_state['turn'] <= max_turns:
+        turn = game_state['turn']
+        outcome, msg = play_turn(game_state, policy, log_callback)
+        if on_turn:
+            on_turn(game_state)
+        if outcome:
+            return outcome, turn, msg
+    return 'timeout', max_turns, "Turn limit reached."
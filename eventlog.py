@@ -0,0 +1,101 @@
+"""
+Structured game log.
+Game code emits events (kind, agency, country and the numbers involved) instead of
+pre-formatted strings. Text is only produced when a sink that wants it accepts the
+event, and each sink filters by level, so headless runs with no text sinks pay for
+no formatting at all.
+
+Anything that used to take a log_callback still accepts a plain function of one
+string (messages are formatted for it as before), an EventLog, or None (print).
+"""
+DEBUG = 10
+INFO = 20
+WARNING = 30
+
+# kind -> (level, message template)
+KINDS = {
+    # ai.rival_turn
+    'rival_frozen': (INFO, "{agency} is frozen due to exposure and can only research or buy agents."),
+    'rival_skip': (DEBUG, "{agency} skips a turn due to lack of resources."),
+    'rival_hold': (DEBUG, "{agency} holds its resources this turn."),
+    'rival_operation': (DEBUG, "{agency} is conducting {operation} in {country}..."),
+    'rival_cannot_afford': (DEBUG, "{agency} cannot afford {operation} this turn."),
+    'rival_success': (INFO, "{agency} successfully increases influence in {country}."),
+    'rival_failure': (INFO, "{agency}'s {operation} failed in {country}."),
+    'rival_research': (INFO, "{agency} researched {tech}, reducing visibility from {old} to {new}."),
+    'rival_recruit': (INFO, "{agency} recruited a new agent."),
+    # events.global_events
+    'global_event': (WARNING, "Global Event: {name}"),
+    'player_visibility': (WARNING, "{agency} (You) visibility +{amount}, now {new}%"),
+    'visibility': (INFO, "{agency} visibility +{amount}, now {new}%"),
+    'player_budget_loss': (WARNING, "{agency} (You) lost ${amount} from budget, now ${new}."),
+    'budget_loss': (INFO, "{agency} lost ${amount} from their budget, now ${new}."),
+    'player_capital_gain': (WARNING, "{agency} (You) gained {amount} political capital, now {new}."),
+    'capital_gain': (INFO, "{agency} gained {amount} political capital, now {new}."),
+    # player actions / turn flow (already-formatted text)
+    'message': (INFO, "{text}"),
+}
+
+class Event:
+    __slots__ = ('kind', 'level', 'agency', 'country', 'data')
+
+    def __init__(self, kind, level, agency=None, country=None, data=None):
+        self.kind = kind
+        self.level = level
+        self.agency = agency
+        self.country = country
+        self.data = data or {}
+
+    def format(self):
+        return KINDS[self.kind][1].format(agency=self.agency, country=self.country, **self.data)
+
+    def __repr__(self):
+        return f"Event({self.kind!r}, agency={self.agency!r}, country={self.country!r}, data={self.data!r})"
+
+# --------------------------------------------------
+# Sinks
+# --------------------------------------------------
+class CallbackSink:
+    """Formats each accepted event and passes the text to a function (print, a UI, ...)."""
+    def __init__(self, callback, level=DEBUG):
+        self.callback = callback
+        self.level = level
+
+    def handle(self, event):
+        self.callback(event.format())
+
+class MemorySink:
+    """Keeps the structured events themselves, e.g. for analysis of batch runs."""
+    def __init__(self, level=DEBUG):
+        self.level = level
+        self.events = []
+
+    def handle(self, event):
+        self.events.append(event)
+
+class EventLog:
+    def __init__(self, sinks=()):
+        self.sinks = list(sinks)
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def emit(self, kind, agency=None, country=None, **data):
+        level = KINDS[kind][0]
+        event = None
+        for sink in self.sinks:
+            if level >= sink.level:
+                if event is None:
+                    event = Event(kind, level, agency, country, data)
+                sink.handle(event)
+
+# Drops everything without building a single Event
+NULL_LOG = EventLog()
+
+def emitter(log_callback):
+    """
+    Turns whatever was passed as log_callback into an emit(kind, agency, country, **data) function.
+    """
+    if isinstance(log_callback, EventLog):
+        return log_callback.emit
+    return EventLog([CallbackSink(log_callback or print)]).emit
@@ -1,60 +1,196 @@
-import random
+"""
+Global events, defined in data/events.json.
+Each event has a name, a weight, a target rule and a list of effects:
+    target   "global" (every agency), "random" (a random sample of agencies, sized by
+             one of "counts", default [1, 2]), "player" or "rivals"
+    effects  {"type": "visibility", "amount": n}
+             {"type": "budget_loss", "min": a, "max": b}   (drawn per agency)
+             {"type": "capital", "amount": n}
+When the file is loaded, every event is compiled into one function per effect that
+applies it to all the affected agencies in one pass, and events are picked by weight
+in O(1) with an alias table, however many events there are.
+"""
+import gamedata
+from eventlog import NULL_LOG, emitter
+from seeding import game_rng
 
-def global_events(game_state, log_callback=None):
+DEFAULT_RANDOM_COUNTS = (1, 2)
+
+class WeightedPicker:
     """
-    Triggers global events. If log_callback is provided, we log messages there.
+    Walker alias table: one randrange plus (for uneven weights) one random() per pick.
+    With all weights equal a pick is exactly rng.choice(), so games seeded before events
+    had weights play out the same.
     """
-    def log(msg):
-        if log_callback:
-            log_callback(msg)
-        else:
-            print(msg)
-
-    events = [
-        {"name": "Massive Data Leak", "visibility_increase": 5, "target": "random"},
-        {"name": "International Scandal Exposes Espionage Network", "visibility_increase": 8, "target": "random"},
-        {"name": "Cyber Attack on Global Financial Markets", "budget_loss": True, "target": "global"},
-        {"name": "Whistleblower Exposes Covert Ops", "visibility_increase": 10, "target": "random"},
-        {"name": "Successful Disinformation Campaign", "political_capital_gain": 5, "target": "random"}
-    ]
-    event = random.choice(events)
-    log(f"Global Event: {event['name']}")
-
-    if event['target'] == "global":
-        affected_agencies = ["CIA", "Mossad", "MSS", "FSB"]
-    elif event['target'] == "random":
-        affected_agencies = random.sample(["CIA", "Mossad", "MSS", "FSB"], random.choice([1, 2]))
-
-    for agency in affected_agencies:
-        apply_event_effects(game_state, event, agency, log)
-
-def apply_event_effects(game_state, event, agency, log):
-    is_player = (agency == game_state['agency'])
-
-    if 'visibility_increase' in event:
-        if is_player:
-            game_state['visibility'] += event['visibility_increase']
-            log(f"{agency} (You) visibility +{event['visibility_increase']}, now {game_state['visibility']}%")
-        else:
-            game_state['visibility_tracker'][agency] += event['visibility_increase']
-            log(f"{agency} visibility +{event['visibility_increase']}, now {game_state['visibility_tracker'][agency]}%")
-
-    if 'budget_loss' in event and event['budget_loss']:
-        budget_loss = random.randint(20, 50)
-        if is_player:
-            old_budget = game_state['budget']
-            game_state['budget'] = max(0, old_budget - budget_loss)
-            log(f"{agency} (You) lost ${budget_loss} from budget, now ${game_state['budget']}.")
-        elif agency in game_state['ai_resources']:
-            old_budget = game_state['ai_resources'][agency]['budget']
-            game_state['ai_resources'][agency]['budget'] = max(0, old_budget - budget_loss)
-            log(f"{agency} lost ${budget_loss} from their budget, now ${game_state['ai_resources'][agency]['budget']}.")
-
-    if 'political_capital_gain' in event:
-        if is_player:
-            game_state['political_capital'] += event['political_capital_gain']
-            log(f"{agency} (You) gained {event['political_capital_gain']} political capital, now {game_state['political_capital']}.")
-        elif agency in game_state['ai_resources']:
-            old_pc = game_state['ai_resources'][agency]['political_capital']
-            game_state['ai_resources'][agency]['political_capital'] += event['political_capital_gain']
-            log(f"{agency} gained {event['political_capital_gain']} political capital, now {game_state['ai_resources'][agency]['political_capital']}.")
+    def __init__(self, weights):
+        n = len(weights)
+        if not n or min(weights) < 0 or not sum(weights):
+            raise ValueError("Need at least one event with a positive weight.")
+        self.n = n
+        self.uniform = len(set(weights)) == 1
+        total = sum(weights)
+        scaled = [weight * n / total for weight in weights]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+
+    def pick(self, rng):
+        i = rng.randrange(self.n)
+        if self.uniform or rng.random() < self.prob[i]:
+            return i
+        return self.alias[i]
+
+# --------------------------------------------------
+# Effect compilers: effect data -> function(game_state, agencies, log, rng)
+# --------------------------------------------------
+def _visibility_effect(effect):
+    amount = effect['amount']
+
+    def apply(game_state, agencies, log, rng):
+        player = game_state['agency']
+        tracker = game_state['visibility_tracker']
+        for agency in agencies:
+            if agency == player:
+                game_state['visibility'] += amount
+                log('player_visibility', agency, amount=amount, new=game_state['visibility'])
+            else:
+                tracker[agency] += amount
+                log('visibility', agency, amount=amount, new=tracker[agency])
+    return apply
+
+def _budget_loss_effect(effect):
+    low, high = effect['min'], effect['max']
+
+    def apply(game_state, agencies, log, rng):
+        player = game_state['agency']
+        ai_resources = game_state['ai_resources']
+        for agency in agencies:
+            budget_loss = rng.randint(low, high)
+            if agency == player:
+                game_state['budget'] = max(0, game_state['budget'] - budget_loss)
+                log('player_budget_loss', agency, amount=budget_loss, new=game_state['budget'])
+            elif agency in ai_resources:
+                resources = ai_resources[agency]
+                resources['budget'] = max(0, resources['budget'] - budget_loss)
+                log('budget_loss', agency, amount=budget_loss, new=resources['budget'])
+    return apply
+
+def _capital_effect(effect):
+    amount = effect['amount']
+
+    def apply(game_state, agencies, log, rng):
+        player = game_state['agency']
+        ai_resources = game_state['ai_resources']
+        for agency in agencies:
+            if agency == player:
+                game_state['political_capital'] += amount
+                log('player_capital_gain', agency, amount=amount, new=game_state['political_capital'])
+            elif agency in ai_resources:
+                resources = ai_resources[agency]
+                resources['political_capital'] += amount
+                log('capital_gain', agency, amount=amount, new=resources['political_capital'])
+    return apply
+
+EFFECTS = {
+    'visibility': _visibility_effect,
+    'budget_loss': _budget_loss_effect,
+    'capital': _capital_effect,
+}
+
+TARGETS = ('global', 'random', 'player', 'rivals')
+
+class CompiledEvent:
+    __slots__ = ('name', 'target', 'counts', 'effects', 'rollout')
+
+    def __init__(self, data):
+        self.name = data['name']
+        self.target = data.get('target', 'random')
+        if self.target not in TARGETS:
+            raise ValueError(f"{self.name}: unknown target {self.target!r}")
+        self.counts = tuple(data.get('counts', DEFAULT_RANDOM_COUNTS))
+        try:
+            self.effects = tuple(EFFECTS[effect['type']](effect) for effect in data['effects'])
+        except KeyError as e:
+            raise ValueError(f"{self.name}: bad effect ({e})") from None
+
+        # What the event does to one agency it hits, for AIs that simulate events (see mcts.py):
+        # (visibility, (min, max) budget loss or None, capital)
+        visibility = sum(effect['amount'] for effect in data['effects'] if effect['type'] == 'visibility')
+        capital = sum(effect['amount'] for effect in data['effects'] if effect['type'] == 'capital')
+        losses = [(effect['min'], effect['max']) for effect in data['effects'] if effect['type'] == 'budget_loss']
+        loss = (sum(low for low, _ in losses), sum(high for _, high in losses)) if losses else None
+        self.rollout = (visibility, loss, capital)
+
+    def affected(self, game_state, rng):
+        agencies = gamedata.agency_names()
+        if self.target == 'global':
+            return agencies
+        if self.target == 'random':
+            return rng.sample(agencies, rng.choice(self.counts))
+        if self.target == 'player':
+            return (game_state['agency'],)
+        return gamedata.rival_agencies(game_state['agency'])
+
+class EventTable:
+    """Every event from data/events.json, compiled, plus the weighted picker over them."""
+    def __init__(self, data):
+        self.events = tuple(CompiledEvent(event) for event in data)
+        self.picker = WeightedPicker([event.get('weight', 1) for event in data])
+
+    def pick(self, rng):
+        return self.events[self.picker.pick(rng)]
+
+_compiled = None
+
+def event_table():
+    """The compiled events; recompiled only when gamedata reloads data/events.json."""
+    global _compiled
+    data = gamedata.global_events()
+    if _compiled is None or _compiled[0] is not data:
+        _compiled = (data, EventTable(data))
+    return _compiled[1]
+
+def global_events(game_state, log_callback=None, rng=None):
+    """
+    Triggers global events. If log_callback (an eventlog.EventLog or a function
+    of one string) is provided, we log messages there.
+    rng defaults to the game's own generator (seeding.game_rng).
+    """
+    rng = rng or game_rng(game_state)
+    log = emitter(log_callback)
+
+    event = event_table().pick(rng)
+    log('global_event', name=event.name)
+    apply_event(game_state, event, event.affected(game_state, rng), log, rng)
+
+def apply_event(game_state, event, agencies, log, rng):
+    """Applies each of the event's effects to all the affected agencies."""
+    for effect in event.effects:
+        effect(game_state, agencies, log, rng)
+
+def global_events_batch(game_states, log_callbacks=None):
+    """
+    One turn's global event for many games (each drawing from its own seeding.game_rng).
+    Games that drew the same event have it applied together, one effect at a time.
+    Games without a log callback log nothing, as in engine.play_turn.
+    """
+    table = event_table()
+    groups = {}
+    for i, game_state in enumerate(game_states):
+        rng = game_rng(game_state)
+        log = emitter((log_callbacks[i] if log_callbacks else None) or NULL_LOG)
+        event = table.pick(rng)
+        log('global_event', name=event.name)
+        groups.setdefault(id(event), (event, []))[1].append((game_state, event.affected(game_state, rng), log, rng))
+
+    for event, games in groups.values():
+        for effect in event.effects:
+            for game_state, agencies, log, rng in games:
+                effect(game_state, agencies, log, rng)
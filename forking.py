@@ -0,0 +1,164 @@
+"""
+Copy-on-write game-state forking.
+fork(game_state) returns a child game that plays on independently of its parent (for
+lookahead AIs, what-if previews and undo stacks) without copying the world: both games
+keep their countries in a CowCountries, a private layer of the records that game changed
+over a chain of frozen layers shared with every other fork. A country record is copied
+into the private layer the first time influence.py changes it, so a fork costs the few
+countries it touches, and discarding one is just dropping it.
+
+CompactCountries and ArrayWorld games fork through their own fork(): the child shares the
+parent's arrays until either game changes a country, and that game then copies the
+arrays whole. A fork that is only read costs nothing, but one that plays a turn pays for
+a full copy of the world's columns.
+
+Reads through a CowCountries walk its layers, so whole-world passes over a forked dict
+game (rewards, win checks) are slower than over a plain dict; bench.py times both.
+
+Everything else in the game_state is small (scalars, per-agency tables, the replay
+record) and is copied per fork.
+
+Forking changes the parent in one way: the first fork of a game whose countries are a
+plain dict puts game_state['countries'] behind a CowCountries too (the dict becomes its
+frozen bottom layer), since the parent's later changes must not reach the child. The
+parent plays on exactly as before, but code that kept a reference to the old dict
+instead of going through game_state['countries'] would no longer see its changes.
+"""
+import copy
+from collections.abc import MutableMapping
+
+from records import AgencyRecord
+
+# Forking a game whose chain is deeper than this first merges its layers into one
+MAX_LAYERS = 8
+
+# Runtime caches carried over to the child; the rest ('_target_samplers', search trees,
+# listeners) rebuild themselves the first time the child needs them
+FORKED_RNGS = ('_rng', '_policy_rng')
+
+_DELETED = object()
+
+def copy_country(data):
+    """Private copy of one country record (its influence dict is the only nested value)."""
+    data = dict(data)
+    data['influence'] = dict(data['influence'])
+    return data
+
+def copy_agency(data):
+    """Private copy of one rival's ai_resources record."""
+    if isinstance(data, AgencyRecord):
+        return data.copy()
+    return {key: list(value) if isinstance(value, list) else value for key, value in data.items()}
+
+class CowCountries(MutableMapping):
+    """
+    game_state['countries'] for a forked game. Reads fall through to the shared layers;
+    writable(name) (used by influence.py) copies a record in before it is changed.
+    Records reached through [] must be treated as read-only.
+    """
+    __slots__ = ('_own', '_layers', '_len')
+
+    def __init__(self, countries, layers=(), length=None):
+        self._own = countries
+        self._layers = layers
+        self._len = len(countries) if length is None else length
+
+    def _lookup(self, name):
+        value = self._own.get(name, _DELETED)
+        if value is _DELETED and name not in self._own:
+            for layer in self._layers:
+                value = layer.get(name, _DELETED)
+                if value is not _DELETED or name in layer:
+                    break
+        return value
+
+    def __getitem__(self, name):
+        value = self._lookup(name)
+        if value is _DELETED:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name):
+        return self._lookup(name) is not _DELETED
+
+    def __setitem__(self, name, data):
+        if self._lookup(name) is _DELETED:
+            self._len += 1
+        self._own[name] = data
+
+    def __delitem__(self, name):
+        if self._lookup(name) is _DELETED:
+            raise KeyError(name)
+        self._len -= 1
+        if any(name in layer for layer in self._layers):
+            self._own[name] = _DELETED
+        else:
+            del self._own[name]
+
+    def __iter__(self):
+        # Oldest layer first, so countries keep the order they were loaded in
+        seen = set()
+        for layer in (*reversed(self._layers), self._own):
+            for name in layer:
+                if name not in seen:
+                    seen.add(name)
+                    if self._lookup(name) is not _DELETED:
+                        yield name
+
+    def __len__(self):
+        return self._len
+
+    def writable(self, name):
+        """The record for name, copied into this game's own layer if it is still shared."""
+        data = self._own.get(name)
+        if data is None or data is _DELETED:
+            data = self._own[name] = copy_country(self[name])
+        return data
+
+    def fork(self):
+        """
+        Freezes this game's changes into the shared chain and returns the child's countries.
+        From here on both games copy a record before changing it.
+        """
+        if self._own:
+            self._layers = (self._own, *self._layers)
+            self._own = {}
+        if len(self._layers) > MAX_LAYERS:
+            merged = {}
+            for layer in reversed(self._layers):
+                merged.update(layer)
+            self._layers = ({name: data for name, data in merged.items() if data is not _DELETED},)
+        return CowCountries({}, self._layers, self._len)
+
+    def to_countries(self):
+        """Plain dict of the current records (what save files hold)."""
+        return dict(self.items())
+
+def fork(game_state):
+    """
+    Returns a child of game_state that shares every unchanged country record with it.
+    Fork between actions, not while a turn is half-processed: a record already fetched
+    from the parent must not be changed after the fork.
+    A plain dict of countries in the parent is replaced by a CowCountries over it (see above).
+    """
+    countries = game_state['countries']
+    if not hasattr(countries, 'fork'):
+        countries = game_state['countries'] = CowCountries({}, (countries,), len(countries))
+
+    child = {}
+    for key, value in game_state.items():
+        if key == 'countries':
+            child[key] = countries.fork()
+        elif key == 'ai_resources':
+            child[key] = {agency: copy_agency(data) for agency, data in value.items()}
+        elif key == 'replay':
+            child[key] = dict(value, actions=list(value['actions']))
+        elif key in FORKED_RNGS:
+            child[key] = copy.copy(value)
+        elif not key.startswith('_'):
+            child[key] = value.copy() if isinstance(value, (dict, list)) else value
+
+    tracker = game_state.get('_leader_tracker')
+    if tracker is not None:
+        child['_leader_tracker'] = tracker.fork(child)
+    return child
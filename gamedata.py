@@ -0,0 +1,139 @@
+"""
+Game-data registry.
+Each data file is parsed once and re-read only when its modification time changes.
+Callers get read-only views (types.MappingProxyType) plus precomputed indexes, and
+new games get their own mutable copy of the countries via new_countries().
+"""
+import json
+import os
+import sys
+from types import MappingProxyType
+
+def _data_dir():
+    # Next to the executable in a PyInstaller build, next to this file otherwise
+    if getattr(sys, 'frozen', False):
+        return os.path.join(os.path.dirname(sys.executable), 'data')
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+DATA_DIR = _data_dir()
+
+# file name -> (mtime, {'data': ..., <index name>: ...})
+_cache = {}
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _load(filename, build_indexes):
+    path = os.path.join(DATA_DIR, filename)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _cache.get(filename)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, 'r') as file:
+        raw = json.load(file)
+    entry = build_indexes(raw)
+    entry['data'] = _freeze(raw)
+    _cache[filename] = (mtime, entry)
+    return entry
+
+def clear_cache():
+    """Forgets every loaded file (mostly for tests and tools that rewrite data files)."""
+    _cache.clear()
+
+def use_data_dir(path):
+    """Points the registry at another data directory, e.g. a worldgen.py map."""
+    global DATA_DIR
+    DATA_DIR = path
+    clear_cache()
+
+# --------------------------------------------------
+# Tech tree
+# --------------------------------------------------
+def _tech_indexes(raw):
+    items = [(name, _freeze(data)) for name, data in raw.items()]
+    names = tuple(raw)
+    return {
+        'names': names,
+        'index': MappingProxyType({name: i for i, name in enumerate(names)}),
+        # sorted() is stable, so equal keys keep their tech_tree.json order
+        'by_cost': tuple(sorted(items, key=lambda item: item[1]['cost'])),
+        'by_visibility_reduction': tuple(sorted(items, key=lambda item: -item[1]['visibility_reduction'])),
+    }
+
+def tech_tree():
+    """Read-only {tech name: {'cost', 'visibility_reduction'}} in file order."""
+    return _load('tech_tree.json', _tech_indexes)['data']
+
+def tech_names():
+    """Tech names in tech_tree.json order; position i is the tech's dense index."""
+    return _load('tech_tree.json', _tech_indexes)['names']
+
+def tech_index():
+    """Read-only {tech name: dense integer index} (the bit a tech uses in records.AgencyRecord)."""
+    return _load('tech_tree.json', _tech_indexes)['index']
+
+def techs_by_cost():
+    """(name, data) pairs, cheapest first."""
+    return _load('tech_tree.json', _tech_indexes)['by_cost']
+
+def techs_by_visibility_reduction():
+    """(name, data) pairs, biggest visibility reduction first."""
+    return _load('tech_tree.json', _tech_indexes)['by_visibility_reduction']
+
+# --------------------------------------------------
+# Agencies
+# --------------------------------------------------
+def _agency_indexes(raw):
+    names = tuple(raw)
+    return {
+        'names': names,
+        'rivals': {},  # player agency -> tuple of the others, filled on first use
+    }
+
+def agencies():
+    """Read-only {agency: {'country', 'budget', 'political_capital', 'visibility'}}."""
+    return _load('agencies.json', _agency_indexes)['data']
+
+def agency_names():
+    """Agency names in registry order (the column order of array-backed worlds)."""
+    return _load('agencies.json', _agency_indexes)['names']
+
+def rival_agencies(player):
+    """Every agency except the player's, in registry order."""
+    entry = _load('agencies.json', _agency_indexes)
+    rivals = entry['rivals'].get(player)
+    if rivals is None:
+        rivals = entry['rivals'][player] = tuple(name for name in entry['names'] if name != player)
+    return rivals
+
+# --------------------------------------------------
+# Countries
+# --------------------------------------------------
+def _country_indexes(raw):
+    return {'index': MappingProxyType({name: i for i, name in enumerate(raw)})}
+
+def countries():
+    """Read-only view of data/countries.json."""
+    return _load('countries.json', _country_indexes)['data']
+
+def country_index():
+    """Read-only {country name: position in countries.json}."""
+    return _load('countries.json', _country_indexes)['index']
+
+def new_countries():
+    """A fresh, mutable copy of the countries for a new game."""
+    return {name: {key: dict(value) if isinstance(value, MappingProxyType) else value
+                   for key, value in data.items()}
+            for name, data in countries().items()}
+
+# --------------------------------------------------
+# Global events
+# --------------------------------------------------
+def global_events():
+    """Read-only list of the global events in data/events.json (events.py compiles them)."""
+    return _load('events.json', lambda raw: {})['data']
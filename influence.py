@@ -0,0 +1,52 @@
+"""
+Single place where country influence gets changed.
+Anything that keeps a derived index over influence (e.g. ai.TargetSampler) registers
+itself as a listener on the game_state and is told about every change, so it can
+update itself instead of rescanning every country.
+"""
+
+def add_listener(game_state, listener):
+    """
+    Registers an object with influence_changed(country, agency, old, new) and
+    stat_changed(country, field, old, new) methods.
+    """
+    game_state.setdefault('_influence_listeners', []).append(listener)
+
+def remove_listener(game_state, listener):
+    listeners = game_state.get('_influence_listeners', [])
+    if listener in listeners:
+        listeners.remove(listener)
+
+def writable(game_state, country):
+    """A country record that may be changed (forked games copy shared records first, see forking.py)."""
+    countries = game_state['countries']
+    if hasattr(countries, 'writable'):
+        return countries.writable(country)
+    return countries[country]
+
+def set_influence(game_state, country, agency, value):
+    """
+    Sets one agency's influence in a country and notifies listeners.
+    Agencies missing from a country's influence dict count as 0.
+    """
+    old = game_state['countries'][country]['influence'].get(agency, 0)
+    if old == value:
+        return
+    writable(game_state, country)['influence'][agency] = value
+    for listener in game_state.get('_influence_listeners', ()):
+        listener.influence_changed(country, agency, old, value)
+
+def add_influence(game_state, country, agency, amount):
+    """Adds amount (may be negative) to one agency's influence in a country."""
+    current = game_state['countries'][country]['influence'].get(agency, 0)
+    set_influence(game_state, country, agency, current + amount)
+
+def add_country_stat(game_state, country, field, amount):
+    """Adds amount to a country's 'stability' or 'populism_risk' and notifies listeners."""
+    if not amount:
+        return
+    data = writable(game_state, country)
+    old = data[field]
+    data[field] = old + amount
+    for listener in game_state.get('_influence_listeners', ()):
+        listener.stat_changed(country, field, old, old + amount)
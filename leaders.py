@@ -0,0 +1,136 @@
+"""
+Incremental leader and win-condition tracking.
+LeaderTracker listens to influence/stat changes (see influence.py) and keeps each
+country's leading agency, each agency's per-turn reward totals and the number of
+countries the player controls, so rewards and the domination check don't rescan the world.
+
+Set DEEP_STATE_DEBUG_TRACKER=1 to cross-check the tracker against a full rescan on every use.
+"""
+import os
+
+from influence import add_listener
+from records import AgencyRecord
+
+DEBUG = os.environ.get('DEEP_STATE_DEBUG_TRACKER') == '1'
+
+# Same thresholds main.award_country_rewards / main.check_global_domination use
+MAX_POPULISM_FOR_REWARD = 50
+MIN_STABILITY_FOR_REWARD = 50
+CONTROL_INFLUENCE = 80
+
+def leading_agency(influence):
+    """The agency with the most influence (ties go to the first one, like max())."""
+    return max(influence, key=influence.get)
+
+def pays_rewards(data):
+    return data['populism_risk'] <= MAX_POPULISM_FOR_REWARD and data['stability'] >= MIN_STABILITY_FOR_REWARD
+
+class LeaderTracker:
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.rebuild()
+        add_listener(game_state, self)
+
+    def rebuild(self):
+        """Full rescan of the world; also used by verify() as the reference."""
+        self.player = self.game_state['agency']
+        self.leaders = {}
+        self.eligible = set()
+        # agency -> [countries led that pay out, budget total, capital total]
+        self.rewards = {}
+        self.controlled = 0
+        for country, data in self.game_state['countries'].items():
+            self.leaders[country] = leading_agency(data['influence'])
+            if pays_rewards(data):
+                self.eligible.add(country)
+                self._add_reward(country, 1)
+            if data['influence'].get(self.player, 0) >= CONTROL_INFLUENCE:
+                self.controlled += 1
+
+    def fork(self, game_state):
+        """Copy of this tracker for a forked game (see forking.fork), without a rescan."""
+        child = object.__new__(LeaderTracker)
+        child.game_state = game_state
+        child.player = self.player
+        child.leaders = dict(self.leaders)
+        child.eligible = set(self.eligible)
+        child.rewards = {agency: list(totals) for agency, totals in self.rewards.items()}
+        child.controlled = self.controlled
+        add_listener(game_state, child)
+        return child
+
+    def _add_reward(self, country, sign):
+        data = self.game_state['countries'][country]
+        totals = self.rewards.setdefault(self.leaders[country], [0, 0, 0])
+        totals[0] += sign
+        totals[1] += sign * data.get('budget_reward', 0)
+        totals[2] += sign * data.get('capital_reward', 0)
+
+    # --------------------------------------------------
+    # Listener hooks
+    # --------------------------------------------------
+    def influence_changed(self, country, agency, old, new):
+        if agency == self.player and (old >= CONTROL_INFLUENCE) != (new >= CONTROL_INFLUENCE):
+            self.controlled += 1 if new >= CONTROL_INFLUENCE else -1
+
+        leader = self.leaders[country]
+        if agency == leader and new >= old:
+            return  # the leader only got stronger
+        new_leader = leading_agency(self.game_state['countries'][country]['influence'])
+        if new_leader == leader:
+            return
+        eligible = country in self.eligible
+        if eligible:
+            self._add_reward(country, -1)
+        self.leaders[country] = new_leader
+        if eligible:
+            self._add_reward(country, 1)
+
+    def stat_changed(self, country, field, old, new):
+        now_eligible = pays_rewards(self.game_state['countries'][country])
+        if now_eligible == (country in self.eligible):
+            return
+        if now_eligible:
+            self.eligible.add(country)
+            self._add_reward(country, 1)
+        else:
+            self.eligible.discard(country)
+            self._add_reward(country, -1)
+
+    # --------------------------------------------------
+    # Queries
+    # --------------------------------------------------
+    def award(self):
+        """Applies this turn's country rewards (same effect as the full per-country loop)."""
+        game_state = self.game_state
+        for agency, (count, budget, capital) in self.rewards.items():
+            if not count:
+                continue
+            if agency == game_state['agency']:
+                game_state['budget'] += budget
+                game_state['political_capital'] += capital
+            else:
+                if agency not in game_state['ai_resources']:
+                    game_state['ai_resources'][agency] = AgencyRecord()
+                game_state['ai_resources'][agency]['budget'] += budget
+                game_state['ai_resources'][agency]['political_capital'] += capital
+
+    def verify(self):
+        """Cross-checks the incremental state against a full rescan; raises AssertionError on drift."""
+        expected = (dict(self.leaders), set(self.eligible),
+                    {agency: list(totals) for agency, totals in self.rewards.items() if totals[0]},
+                    self.controlled)
+        self.rebuild()
+        actual = (self.leaders, self.eligible,
+                  {agency: totals for agency, totals in self.rewards.items() if totals[0]},
+                  self.controlled)
+        assert expected == actual, "LeaderTracker drifted from the game state"
+
+def get_tracker(game_state):
+    """Returns the game's tracker, building it on first use."""
+    tracker = game_state.get('_leader_tracker')
+    if tracker is None:
+        tracker = game_state['_leader_tracker'] = LeaderTracker(game_state)
+    elif DEBUG:
+        tracker.verify()
+    return tracker
@@ -1,48 +1,79 @@
 import json
+import os
+import autosave
+import gamedata
+import leaders
+import records
+import seeding
+import snapshot
 from operations import perform_operation, view_agency_visibility, view_global_influence
 from ai import rival_turn
 from events import global_events
 
 def load_countries():
     try:
-        with open('data/countries.json', 'r') as file:
-            # print("Countries data loaded successfully.")
-            return json.load(file)
+        return gamedata.new_countries()
     except Exception as e:
         print(f"Error loading countries data: {e}")
         exit()
 
-def save_game(state):
+def save_game(state, path=autosave.SAVE_PATH):
+    """Writes the full game state (atomically, via a temp file and rename)."""
     try:
-        with open('save/save1.json', 'w') as file:
-            json.dump(state, file, indent=4)
+        # Keys starting with '_' are runtime caches (samplers, listeners), not game data
+        state = {key: value for key, value in state.items() if not key.startswith('_')}
+        autosave.atomic_write_json(path, state, indent=4, default=_json_default)
         # print("Game saved.")
     except Exception as e:
         print(f"Error saving game: {e}")
 
+def load_game(path=autosave.SAVE_PATH, array_world=False, compact=False):
+    """
+    Loads a saved game. Binary snapshots (see snapshot.py) are read through mmap;
+    JSON saves are rebuilt from the snapshot plus any autosave journal.
+    array_world / compact pick the countries' layout, as in initialize_game.
+    Returns None if there is no save at path.
+    """
+    if not os.path.exists(path):
+        return None
+    if snapshot.is_snapshot(path):
+        return snapshot.load_snapshot(path, array_world=array_world, compact=compact)
+
+    game_state = autosave.recover(path)
+    game_state['ai_resources'] = records.agency_records(game_state['ai_resources'])
+    if array_world:
+        import world
+        game_state['countries'] = world.ArrayWorld.from_countries(game_state['countries'])
+    elif compact:
+        game_state['countries'] = records.CompactCountries.from_countries(game_state['countries'])
+    return game_state
+
+def save_snapshot(state, path):
+    """Writes the game as a compact binary snapshot instead of JSON."""
+    try:
+        snapshot.save_snapshot(state, path)
+    except Exception as e:
+        print(f"Error saving game: {e}")
+
+# Lets array-backed worlds and records (world.ArrayWorld, records.py) be saved in the plain dict layout
+_json_default = records.json_default
+
 def get_starting_resources(agency):
-    starting_resources = {
-        'CIA': {'budget': 200, 'political_capital': 50},
-        'Mossad': {'budget': 150, 'political_capital': 40},
-        'MSS': {'budget': 250, 'political_capital': 60},
-        'FSB': {'budget': 180, 'political_capital': 45}
-    }
-    return starting_resources.get(agency, {'budget': 100, 'political_capital': 10})
+    data = gamedata.agencies().get(agency)
+    if data is None:
+        return {'budget': 100, 'political_capital': 10}
+    return {'budget': data['budget'], 'political_capital': data['political_capital']}
 
 def initialize_ai_resources(player_agency):
-    rivals = ['CIA', 'Mossad', 'MSS', 'FSB']
-    rivals.remove(player_agency)
-
     ai_resources = {}
-    for rival in rivals:
+    for rival in gamedata.rival_agencies(player_agency):
         resources = get_starting_resources(rival)
-        ai_resources[rival] = {
-            "budget": resources['budget'],
-            "political_capital": resources['political_capital'],
-            "research_points": 0,
-            "agents": 1,
-            "researched_techs": []
-        }
+        ai_resources[rival] = records.AgencyRecord(
+            budget=resources['budget'],
+            political_capital=resources['political_capital'],
+            research_points=0,
+            agents=1,
+        )
 
     return ai_resources
 
@@ -51,21 +82,13 @@ def award_country_rewards(game_state):
     Gives budget/capital rewards to the agency leading in each country,
     as long as that country is stable and not too populist.
     """
-    for country, data in game_state['countries'].items():
-        if data['populism_risk'] > 50 or data['stability'] < 50:
-            continue
-
-        leading_agency = max(data['influence'], key=data['influence'].get)
+    if hasattr(game_state['countries'], 'award_rewards'):
+        # Array-backed world: one vectorized pass instead of a per-country walk
+        game_state['countries'].award_rewards(game_state)
+        return
 
-        if leading_agency == game_state['agency']:
-            game_state['budget'] += data.get('budget_reward', 0)
-            game_state['political_capital'] += data.get('capital_reward', 0)
-        else:
-            if leading_agency not in game_state['ai_resources']:
-                game_state['ai_resources'][leading_agency] = {'budget': 0, 'political_capital': 0}
-
-            game_state['ai_resources'][leading_agency]['budget'] += data.get('budget_reward', 0)
-            game_state['ai_resources'][leading_agency]['political_capital'] += data.get('capital_reward', 0)
+    # Leaders and reward totals are kept up to date as influence changes
+    leaders.get_tracker(game_state).award()
 
 def display_resource_summary(game_state):
     """
@@ -88,10 +111,8 @@ def research_technology(game_state):
     Now it only returns a list of available techs or attempts to research a given tech name.
     You can integrate it with your Tkinter UI to pick which tech to research.
     """
-    with open('data/tech_tree.json', 'r') as file:
-        tech_tree = json.load(file)
-
-    available_techs = {name: data for name, data in tech_tree.items() if name not in game_state['researched_techs']}
+    researched = set(game_state['researched_techs'])
+    available_techs = {name: data for name, data in gamedata.tech_tree().items() if name not in researched}
     return available_techs  # The UI can display these and let the user pick.
 
 def apply_tech_choice(game_state, tech_name, tech_data):
@@ -133,13 +154,11 @@ def check_win_conditions(game_state):
 
 def check_global_domination(game_state):
     """Win if player has 80%+ influence in 60% of countries."""
-    controlled_countries = 0
     total_countries = len(game_state['countries'])
+    if hasattr(game_state['countries'], 'controlled_count'):
+        return (game_state['countries'].controlled_count(game_state['agency']) / total_countries) >= 0.6
 
-    for country, data in game_state['countries'].items():
-        if game_state['agency'] in data['influence'] and data['influence'][game_state['agency']] >= 80:
-            controlled_countries += 1
-
+    controlled_countries = leaders.get_tracker(game_state).controlled
     return (controlled_countries / total_countries) >= 0.6
 
 def check_shadow_victory(game_state):
@@ -152,24 +171,34 @@ def check_shadow_victory(game_state):
 def select_agency_cli():
     """Old console-based agency selection for fallback or debug."""
     print("Select your Agency:")
-    print("1. CIA (USA)")
-    print("2. Mossad (Israel)")
-    print("3. MSS (China)")
-    print("4. FSB (Russia)")
+    agencies = gamedata.agencies()
+    names = list(agencies)
+    for number, name in enumerate(names, start=1):
+        print(f"{number}. {name} ({agencies[name]['country']})")
 
     choice = input("> ").strip()
-    return ["CIA", "Mossad", "MSS", "FSB"][int(choice) - 1] if choice in ["1", "2", "3", "4"] else "CIA"
+    return names[int(choice) - 1] if choice.isdigit() and 1 <= int(choice) <= len(names) else names[0]
 
-def initialize_game(agency=None):
+def initialize_game(agency=None, array_world=False, seed=None, rival_ai=None, compact=False):
     """
     If agency is None, defaults to CIA.
-    Otherwise use the given agency string (CIA, Mossad, MSS, FSB).
+    Otherwise use the given agency name from data/agencies.json.
+    With array_world=True the countries are held in a NumPy-backed world.ArrayWorld;
+    with compact=True in int32 arrays (records.CompactCountries), for very big maps.
+    seed fixes the game's random stream (a fresh one is drawn if None).
+    rival_ai picks the rivals' AI, e.g. {'name': 'mcts', 'budget_ms': 20} (see mcts.planner);
+    None keeps the greedy one.
     Returns a fresh game_state dictionary.
     """
     if not agency:
         agency = "CIA"
 
     countries = load_countries()
+    if array_world:
+        import world
+        countries = world.ArrayWorld.from_countries(countries, agencies=list(gamedata.agency_names()))
+    elif compact:
+        countries = records.CompactCountries.from_countries(countries, agencies=list(gamedata.agency_names()))
     resources = get_starting_resources(agency)
 
     game_state = {
@@ -182,15 +211,14 @@ def initialize_game(agency=None):
         'visibility': 5,
         'agents': 1,
         'agents_used': 0,
-        'visibility_tracker': {
-            'CIA': 20,
-            'Mossad': 10,
-            'MSS': 5,
-            'FSB': 10
-        },
+        'visibility_tracker': {name: data['visibility'] for name, data in gamedata.agencies().items()},
         'ai_resources': initialize_ai_resources(agency),
-        'researched_techs': []
+        'researched_techs': [],
+        'replay': seeding.new_replay(agency, seed)
     }
+    if rival_ai:
+        game_state['rival_ai'] = dict(rival_ai)
+        game_state['replay']['rival_ai'] = dict(rival_ai)
     return game_state
 
 # We remove the console-based main loop here to let tkinter (or any other UI) drive the flow.
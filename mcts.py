@@ -0,0 +1,332 @@
+"""
+Monte Carlo tree search rival AI.
+Instead of the greedy "most expensive affordable op in a random country", each rival
+searches over its next few turns: which operation to run where (or whether to hold its
+resources), simulated with the same operation costs, success chances and visibility
+rules as ai.rival_turn and the same global events as events.global_events.
+
+The search is bounded by a per-rival time budget in milliseconds (or a fixed number of
+iterations, which keeps games reproducible). Its cost does not grow with the map: each
+turn a rival looks at a small set of candidate countries drawn from its TargetSampler,
+and rollouts run on a few local numbers per candidate rather than on a copy of the
+game_state. The tree is open-loop (nodes are action sequences), so the subtree under
+the action actually played becomes the next turn's root. With workers > 1, extra
+independent searches run in worker processes and their root statistics are merged in.
+
+Turn it on per game with main.initialize_game(..., rival_ai={'name': 'mcts', 'budget_ms': 20}).
+"""
+import math
+import os
+import random
+import time
+
+import ai
+import events
+import gamedata
+import leaders
+import operations
+import seeding
+
+DEFAULT_BUDGET_MS = 20
+
+# Turns simulated by each rollout
+HORIZON = 5
+# Countries considered per rival per turn
+CANDIDATES = 12
+EXPLORATION = 1.0
+
+# Rollout scoring, in budget dollars
+CAPITAL_VALUE = 5
+INFLUENCE_VALUE = 3
+VISIBILITY_COST = 4
+FROZEN_COST = 600
+# Unspent resources at the end of a rollout still count for something
+SAVINGS_VALUE = 0.25
+
+# Same rules as ai.ai_buy_agent
+AGENT_BUDGET = 200
+AGENT_CAPITAL = 50
+
+# Extra time a rival waits for worker results after its own budget runs out
+WORKER_GRACE = 0.002
+
+HOLD = None
+
+class Problem:
+    """
+    Everything a rollout needs, copied out of the game_state once per decision:
+    the rival's resources, income and, for each candidate country, its current influence,
+    the strongest competitor's influence and the reward it would start paying if taken.
+    Small and picklable, so it can be shipped to worker processes.
+    """
+    def __init__(self, game_state, rival, ai_data, names):
+        self.names = names
+        self.ops = [(op.name, op.budget, op.capital, op.success_chance, op.influence_gain, op.visibility_increase)
+                    for op in operations.CATALOG.rival]
+        self.own = []
+        self.best_other = []
+        self.reward_budget = []
+        self.reward_capital = []
+        for name in names:
+            data = game_state['countries'][name]
+            influence = data['influence']
+            own = influence.get(rival, 0)
+            best_other = max((value for agency, value in influence.items() if agency != rival), default=0)
+            self.own.append(own)
+            self.best_other.append(best_other)
+            pays = leaders.pays_rewards(data) and own <= best_other
+            self.reward_budget.append(data.get('budget_reward', 0) if pays else 0)
+            self.reward_capital.append(data.get('capital_reward', 0) if pays else 0)
+
+        self.budget = ai_data['budget']
+        self.capital = ai_data['political_capital']
+        self.visibility = game_state['visibility_tracker'][rival]
+        self.income_budget, self.income_capital = rival_income(game_state, rival)
+
+        table = events.event_table()
+        n_agencies = max(1, len(gamedata.agency_names()))
+        self.event_picker = table.picker
+        self.events = [(hit_chance(event, n_agencies), *event.rollout) for event in table.events]
+
+        # Tree keys use names rather than indices, so trees survive new candidate lists
+        self.keys = {HOLD: HOLD}
+        for op_index, op in enumerate(self.ops):
+            for index, name in enumerate(names):
+                self.keys[(op_index, index)] = (op[0], name)
+        self._legal = {}
+
+    def actions(self, budget, capital):
+        """Legal actions for these resources: HOLD plus (operation, country) for each affordable op."""
+        mask = 0
+        for op_index, (_, cost, capital_cost, *_) in enumerate(self.ops):
+            if budget >= cost and capital >= capital_cost:
+                mask |= 1 << op_index
+        legal = self._legal.get(mask)
+        if legal is None:
+            legal = self._legal[mask] = [HOLD] + [(op_index, index) for op_index in range(len(self.ops))
+                                                  if mask >> op_index & 1 for index in range(len(self.names))]
+        return legal
+
+    def key(self, action):
+        return self.keys[action]
+
+def hit_chance(event, n_agencies):
+    """Chance that a global event lands on a given rival."""
+    if event.target == 'random':
+        # sample(agencies, choice(counts))
+        return min(1.0, sum(event.counts) / len(event.counts) / n_agencies)
+    return 0.0 if event.target == 'player' else 1.0
+
+def rival_income(game_state, rival):
+    """The rival's current per-turn (budget, capital) from the countries it leads."""
+    if hasattr(game_state['countries'], 'award_rewards'):
+        return 0, 0  # array-backed worlds don't keep per-agency totals
+    totals = leaders.get_tracker(game_state).rewards.get(rival)
+    return (totals[1], totals[2]) if totals else (0, 0)
+
+class Node:
+    def __init__(self):
+        self.visits = 0
+        self.total = 0.0
+        self.children = {}
+
+def iterate(root, problem, rng):
+    """
+    One selection / expansion / rollout / backup pass. The rollout state is a handful of
+    locals plus a dict of influence gained per candidate, rebuilt each time.
+    """
+    budget, capital, visibility = problem.budget, problem.capital, problem.visibility
+    income_budget, income_capital = problem.income_budget, problem.income_capital
+    gained = {}
+    value = 0.0
+    node = root
+    path = [root]
+    in_tree = True
+
+    for turn in range(HORIZON):
+        if turn:
+            # Start of a later turn: passive exposure and agent recruitment, as in rival_turn
+            visibility += 1
+            if visibility >= 100:
+                value -= FROZEN_COST
+                break
+            if budget >= AGENT_BUDGET and capital >= AGENT_CAPITAL:
+                budget -= AGENT_BUDGET
+                capital -= AGENT_CAPITAL
+
+        legal = problem.actions(budget, capital)
+        if in_tree:
+            untried = [action for action in legal if problem.key(action) not in node.children]
+            if untried:
+                action = rng.choice(untried)
+                child = node.children[problem.key(action)] = Node()
+                node = child
+                in_tree = False
+            else:
+                action = select(node, problem, legal)
+                node = node.children[problem.key(action)]
+            path.append(node)
+        else:
+            action = rollout_action(problem, legal, rng)
+
+        if action is not HOLD:
+            _, cost, capital_cost, chance, gain, op_visibility = problem.ops[action[0]]
+            budget -= cost
+            capital -= capital_cost
+            if rng.random() < chance:
+                index = action[1]
+                before = problem.own[index] + gained.get(index, 0)
+                gained[index] = gained.get(index, 0) + gain
+                value += INFLUENCE_VALUE * gain
+                if before <= problem.best_other[index] < before + gain:
+                    income_budget += problem.reward_budget[index]
+                    income_capital += problem.reward_capital[index]
+                visibility += op_visibility
+                value -= VISIBILITY_COST * op_visibility
+            else:
+                visibility += op_visibility * 2
+                value -= VISIBILITY_COST * op_visibility * 2
+
+        hit, event_visibility, budget_loss, capital_gain = problem.events[problem.event_picker.pick(rng)]
+        if hit >= 1 or rng.random() < hit:
+            visibility += event_visibility
+            capital += capital_gain
+            if budget_loss:
+                budget = max(0, budget - rng.randint(*budget_loss))
+
+        budget += income_budget
+        capital += income_capital
+        value += (income_budget - problem.income_budget) + CAPITAL_VALUE * (income_capital - problem.income_capital)
+    else:
+        value += SAVINGS_VALUE * (budget + CAPITAL_VALUE * capital)
+
+    for node in path:
+        node.visits += 1
+        node.total += value
+
+def select(node, problem, legal):
+    """UCB1 over the children that are legal in this rollout's state."""
+    children = [(action, node.children[problem.key(action)]) for action in legal]
+    low = min(child.total / child.visits for _, child in children)
+    high = max(child.total / child.visits for _, child in children)
+    spread = (high - low) or 1.0
+    log_visits = math.log(node.visits or 1)
+    return max(children, key=lambda pair: (pair[1].total / pair[1].visits - low) / spread
+               + EXPLORATION * math.sqrt(log_visits / pair[1].visits))[0]
+
+def rollout_action(problem, legal, rng):
+    """Default policy: the greedy rival's choice (priciest affordable op) in a random candidate."""
+    if len(legal) == 1:
+        return HOLD
+    best = max(legal[1:], key=lambda action: problem.ops[action[0]][1])[0]
+    return (best, rng.randrange(len(problem.names)))
+
+def search(root, problem, rng, deadline=None, iterations=None):
+    """Runs iterations until the deadline (time.perf_counter() value) or the iteration count."""
+    done = 0
+    while (iterations is None or done < iterations) and (deadline is None or time.perf_counter() < deadline):
+        iterate(root, problem, rng)
+        done += 1
+    return done
+
+def search_worker(problem, seconds, iterations, seed):
+    """Root-parallel search in a worker process; returns the root's {action: (visits, total)}."""
+    root = Node()
+    deadline = None if seconds is None else time.perf_counter() + seconds
+    search(root, problem, random.Random(seed), deadline, iterations)
+    return {action: (child.visits, child.total) for action, child in root.children.items()}
+
+_pool = None
+_pool_workers = 0
+
+def worker_pool(workers):
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        # Imported here: concurrent.futures.process is slow to import and most games never need it
+        from concurrent.futures import ProcessPoolExecutor
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+class RivalSearch:
+    """One rival's search tree and random stream, kept between turns."""
+    def __init__(self, game_state, rival):
+        self.rival = rival
+        self.root = Node()
+        self.rng = random.Random(seeding.derive_seed(game_state['replay']['seed'], f"mcts:{rival}"))
+
+    def candidates(self, game_state):
+        """Countries from last turn's tree that still exist, topped up from the rival's TargetSampler."""
+        countries = game_state['countries']
+        names = []
+        seen = set()
+        for key in self.root.children:
+            if key is not HOLD and key[1] not in seen and key[1] in countries:
+                seen.add(key[1])
+                names.append(key[1])
+        for _ in range(CANDIDATES * 3):
+            if len(names) >= CANDIDATES:
+                break
+            name = ai.pick_target_country(game_state, self.rival, self.rng)
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+        return names
+
+    def choose(self, game_state, ai_data, budget_ms=DEFAULT_BUDGET_MS, iterations=None, workers=1):
+        problem = Problem(game_state, self.rival, ai_data, self.candidates(game_state))
+        legal = problem.actions(problem.budget, problem.capital)
+        if len(legal) == 1:
+            self.root = Node()
+            return HOLD, None
+
+        seconds = None if iterations else budget_ms / 1000
+        deadline = None if seconds is None else time.perf_counter() + seconds
+        futures = []
+        if workers > 1:
+            pool = worker_pool(workers - 1)
+            futures = [pool.submit(search_worker, problem, seconds, iterations, self.rng.getrandbits(63))
+                       for _ in range(workers - 1)]
+
+        search(self.root, problem, self.rng, deadline, iterations)
+        visits = {key: child.visits for key, child in self.root.children.items()}
+        if futures:
+            from concurrent.futures import wait
+            done, _ = wait(futures, timeout=None if deadline is None else
+                           max(0.0, deadline - time.perf_counter()) + WORKER_GRACE)
+            for future in futures:
+                if future in done:
+                    for key, (count, _) in future.result().items():
+                        visits[key] = visits.get(key, 0) + count
+
+        best = max(legal, key=lambda action: visits.get(problem.key(action), 0))
+        key = problem.key(best)
+        self.root = self.root.children.get(key) or Node()
+        if best is HOLD:
+            return HOLD, None
+        return key
+
+def planner(game_state):
+    """
+    The rival planner ai.rival_turn should use for this game: None for the default greedy AI,
+    or a function choosing each rival's move by MCTS when game_state['rival_ai'] asks for it.
+    Settings: budget_ms per rival per turn, iterations (fixed count instead of a time budget,
+    for reproducible games) and workers (processes searching in parallel; None for every core).
+    """
+    settings = game_state.get('rival_ai')
+    if not settings or settings.get('name') != 'mcts':
+        return None
+    budget_ms = settings.get('budget_ms', DEFAULT_BUDGET_MS)
+    iterations = settings.get('iterations')
+    # More processes than cores would only steal time from the rival's own search
+    workers = min(settings.get('workers', 1) or os.cpu_count() or 1, os.cpu_count() or 1)
+    searches = game_state.setdefault('_rival_search', {})
+
+    def choose(game_state, rival, ai_data):
+        rival_search = searches.get(rival)
+        if rival_search is None:
+            rival_search = searches[rival] = RivalSearch(game_state, rival)
+        return rival_search.choose(game_state, ai_data, budget_ms, iterations, workers)
+    return choose
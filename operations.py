@@ -1,4 +1,9 @@
-import random
+import sys
+from array import array
+
+import gamedata
+from influence import add_country_stat, set_influence
+from seeding import game_rng
 
 # Define operations with costs and benefits
 OPERATIONS = {
@@ -11,6 +16,147 @@ OPERATIONS = {
     "Frame Rivals": {"budget": 10, "capital": 15, "success_chance": 0.5, "influence_gain": 0, "rival_influence_loss": 40, "populism_change": 0, "stability_change": 0, "visibility_increase": 5}
 }
 
+# The rival agencies' operations (ai.rival_turn). They only add influence.
+AI_OPERATIONS = {
+    "Political Influence": {"budget": 20, "capital": 3, "success_chance": 0.6, "influence_gain": 5, "visibility_increase": 2},
+    "Covert Ops": {"budget": 50, "capital": 7, "success_chance": 0.55, "influence_gain": 7, "visibility_increase": 3},
+    "Cyber Warfare": {"budget": 40, "capital": 5, "success_chance": 0.5, "influence_gain": 5, "visibility_increase": 3},
+    "Economic Pressure": {"budget": 30, "capital": 4, "success_chance": 0.5, "influence_gain": 4, "visibility_increase": 2},
+    "Propaganda": {"budget": 25, "capital": 3, "success_chance": 0.6, "influence_gain": 3, "visibility_increase": 1}
+}
+
+class Operation:
+    """One operation, with every effect filled in (effects missing from the data are 0)."""
+    __slots__ = ('name', 'budget', 'capital', 'success_chance', 'influence_gain',
+                 'rival_influence_loss', 'populism_change', 'stability_change', 'visibility_increase')
+
+    def __init__(self, name, data):
+        self.name = name
+        self.budget = data['budget']
+        self.capital = data['capital']
+        self.success_chance = data['success_chance']
+        self.influence_gain = data.get('influence_gain', 0)
+        self.rival_influence_loss = data.get('rival_influence_loss', 0)
+        self.populism_change = data.get('populism_change', 0)
+        self.stability_change = data.get('stability_change', 0)
+        self.visibility_increase = data.get('visibility_increase', 2)
+
+    def affordable(self, budget, capital):
+        return budget >= self.budget and capital >= self.capital
+
+class OperationTable:
+    """One side's operations, by name and by cost (most expensive first, ties in table order)."""
+    def __init__(self, operations):
+        self.by_name = {name: Operation(name, data) for name, data in operations.items()}
+        self.by_cost = tuple(sorted(self.by_name.values(), key=lambda op: op.budget, reverse=True))
+
+    def __getitem__(self, name):
+        return self.by_name[name]
+
+    def __iter__(self):
+        return iter(self.by_name.values())
+
+    def affordable(self, budget, capital):
+        return [op for op in self.by_name.values() if op.affordable(budget, capital)]
+
+    def most_expensive_affordable(self, budget, capital):
+        for op in self.by_cost:
+            if op.affordable(budget, capital):
+                return op
+        return None
+
+class Catalog:
+    """Every operation in the game: the player's (OPERATIONS) and the rivals' (AI_OPERATIONS)."""
+    def __init__(self, player_operations, rival_operations):
+        self.player = OperationTable(player_operations)
+        self.rival = OperationTable(rival_operations)
+
+    def table(self, game_state, agency):
+        return self.player if agency == game_state['agency'] else self.rival
+
+CATALOG = Catalog(OPERATIONS, AI_OPERATIONS)
+
+def rebuild_catalog():
+    """Re-indexes the catalog; call after editing OPERATIONS or AI_OPERATIONS."""
+    global CATALOG
+    CATALOG = Catalog(OPERATIONS, AI_OPERATIONS)
+    return CATALOG
+
+def draw_rolls(rng, n):
+    """
+    n success rolls in [0, 1) from one rng.getrandbits() call. random() builds each float
+    from two 32-bit outputs (27 + 26 bits), and getrandbits(64 * n) returns 2n outputs
+    lowest word first, so these are exactly the floats n rng.random() calls would give,
+    leaving the generator in the same state.
+    """
+    if not n:
+        return []
+    words = array('I', rng.getrandbits(64 * n).to_bytes(8 * n, 'little'))
+    if sys.byteorder == 'big':
+        words.byteswap()
+    return [((a >> 5) * 67108864.0 + (b >> 6)) * (1.0 / 9007199254740992.0)
+            for a, b in zip(words[::2], words[1::2])]
+
+def resolve_orders(game_state, orders, rng=None):
+    """
+    Resolves operations that have already been paid for.
+    orders are (agency, operation name, country) tuples, resolved in order: the player's
+    names are looked up in OPERATIONS and everyone else's in AI_OPERATIONS. All success
+    rolls are drawn up front; then influence changes are worked out on a copy of each
+    target country's influence and written back once per changed agency, country stats
+    once per country, and visibility once per agency.
+    Returns one (success, visibility_increase) pair per order.
+    rng defaults to the game's own generator (seeding.game_rng).
+    """
+    rng = rng or game_rng(game_state)
+    rolls = draw_rolls(rng, len(orders))
+    catalog = CATALOG
+    player = game_state['agency']
+    countries = game_state['countries']
+
+    influence = {}   # country -> influence after the orders so far
+    stats = {}       # (country, field) -> total change
+    visibility = {}  # agency -> total increase
+    results = []
+    for (agency, name, country), roll in zip(orders, rolls):
+        op = catalog.table(game_state, agency)[name]
+        success = roll < op.success_chance
+        if success:
+            working = influence.get(country)
+            if working is None:
+                working = influence[country] = dict(countries[country]['influence'])
+            if op.influence_gain:
+                working[agency] = working.get(agency, 0) + op.influence_gain
+            for field, change in (('populism_risk', op.populism_change), ('stability', op.stability_change)):
+                if change:
+                    stats[country, field] = stats.get((country, field), 0) + change
+            loss = op.rival_influence_loss
+            if loss:
+                # Only agencies present in the country can lose anything
+                for other, current in working.items():
+                    if other != agency and current > 0:
+                        working[other] = max(0, current - loss)
+            increase = op.visibility_increase
+        else:
+            increase = op.visibility_increase * 2
+        visibility[agency] = visibility.get(agency, 0) + increase
+        results.append((success, increase))
+
+    for country, working in influence.items():
+        current = countries[country]['influence']
+        changed = [(agency, value) for agency, value in working.items() if current.get(agency, 0) != value]
+        for agency, value in changed:
+            set_influence(game_state, country, agency, value)
+    for (country, field), change in stats.items():
+        add_country_stat(game_state, country, field, change)
+    tracker = game_state['visibility_tracker']
+    for agency, increase in visibility.items():
+        if agency == player:
+            game_state['visibility'] += increase
+        else:
+            tracker[agency] += increase
+    return results
+
 def perform_operation(game_state):
     """Select and perform an operation directly (no mini-menu)."""
     operation = select_operation(game_state)
@@ -21,42 +167,52 @@ def perform_operation(game_state):
     if not target_country:
         return
 
-    op_data = OPERATIONS[operation]
-
-    if game_state['budget'] < op_data['budget'] or game_state['political_capital'] < op_data['capital']:
+    op = CATALOG.player[operation]
+    if not op.affordable(game_state['budget'], game_state['political_capital']):
         print("Not enough budget or political capital for this operation.")
         return
 
     # Deduct costs
-    game_state['budget'] -= op_data['budget']
-    game_state['political_capital'] -= op_data['capital']
+    game_state['budget'] -= op.budget
+    game_state['political_capital'] -= op.capital
 
     print(f"\nPerforming {operation} in {target_country}...")
 
-    # Operation success check
-    success = random.random() < op_data['success_chance']
-
+    [(success, visibility_increase)] = resolve_orders(game_state, [(game_state['agency'], operation, target_country)])
     if success:
         print(f"The {operation} in {target_country} was successful!")
-        game_state['countries'][target_country]['influence'][game_state['agency']] += op_data['influence_gain']
-
-        game_state['countries'][target_country]['populism_risk'] += op_data.get('populism_change', 0)
-        game_state['countries'][target_country]['stability'] += op_data.get('stability_change', 0)
-
-        reduce_rival_influence(game_state, target_country, op_data['rival_influence_loss'])
     else:
         print(f"The {operation} in {target_country} failed.")
         print(f"The failed operation drew extra attention.")
+        print(f"Visibility increased by {visibility_increase}% due to the failed operation.")
+    print(f"Current Visibility: {game_state['visibility']}%")
+
+def execute_operation(game_state, operation, target_country, rng=None):
+    """
+    Performs an operation without any prompts or prints, using one of the player's agents.
+    Returns (performed, message) so any UI (or the headless engine) can report it.
+    """
+    if game_state['agents_used'] >= game_state['agents']:
+        return False, "All agents used this turn."
+
+    op = CATALOG.player[operation]
+    if not op.affordable(game_state['budget'], game_state['political_capital']):
+        return False, "Not enough budget or political capital."
 
-    # Apply visibility increase (doubled on failure)
+    game_state['budget'] -= op.budget
+    game_state['political_capital'] -= op.capital
+
+    msg = f"Performing {operation} in {target_country}... "
+    [(success, visibility_increase)] = resolve_orders(
+        game_state, [(game_state['agency'], operation, target_country)], rng)
     if success:
-        visibility_increase = op_data.get('visibility_increase', 2)
+        msg += "Success! "
     else:
-        visibility_increase = op_data.get('visibility_increase', 2) * 2
-        print(f"Visibility increased by {visibility_increase}% due to the failed operation.")
+        msg += "Failed! Extra attention drawn. "
 
-    game_state['visibility'] += visibility_increase
-    print(f"Current Visibility: {game_state['visibility']}%")
+    game_state['agents_used'] += 1
+    msg += f"Visibility +{visibility_increase}, now {game_state['visibility']}%."
+    return True, msg
 
 def select_operation(game_state):
     """Prompts player to select an operation, showing costs and benefits."""
@@ -95,11 +251,13 @@ def select_target_country(game_state):
 
 def reduce_rival_influence(game_state, country, amount):
     """Reduces rival agencies' influence in a target country."""
-    for rival in ["CIA", "Mossad", "MSS", "FSB"]:
-        if rival != game_state['agency']:
-            game_state['countries'][country]['influence'][rival] = max(
-                0, game_state['countries'][country]['influence'][rival] - amount
-            )
+    if not amount:
+        return
+    # Only agencies present in this country can lose anything
+    influence = game_state['countries'][country]['influence']
+    for rival, current in list(influence.items()):
+        if rival != game_state['agency'] and current > 0:
+            set_influence(game_state, country, rival, max(0, current - amount))
 
 def view_agency_visibility(game_state):
     """Shows visibility levels for all agencies."""
@@ -115,7 +273,8 @@ def view_global_influence(game_state):
     """Displays global influence for all countries and agencies, plus populism risk and stability."""
     print("\n--- Global Influence Report ---")
     # Add two new columns: Populism Risk (Pop Risk) and Stability (Stability)
-    print(f"{'Country':<15} {'CIA':<8} {'Mossad':<8} {'MSS':<8} {'FSB':<8} {'Pop Risk':<9} {'Stability':<9}")
+    agencies = gamedata.agency_names()
+    print(f"{'Country':<15} " + "".join(f"{agency:<8} " for agency in agencies) + f"{'Pop Risk':<9} {'Stability':<9}")
 
     for country, data in game_state['countries'].items():
         influences = data['influence']
@@ -124,9 +283,6 @@ def view_global_influence(game_state):
 
         # Print each row including the new columns
         print(f"{country:<15} "
-              f"{influences['CIA']:<8} "
-              f"{influences['Mossad']:<8} "
-              f"{influences['MSS']:<8} "
-              f"{influences['FSB']:<8} "
-              f"{pop_risk:<9} "
+              + "".join(f"{influences.get(agency, 0):<8} " for agency in agencies)
+              + f"{pop_risk:<9} "
               f"{stability:<9}")
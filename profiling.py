@@ -0,0 +1,279 @@
+"""
+Opt-in profiling of the turn pipeline.
+engine.end_turn marks its phases (rival turn, global events, rewards, win checks,
+resource tick) and the Tk window marks its autosave with phase(name). While profiling
+is off, phase() hands back one shared no-op context manager and nothing is wrapped,
+so the cost is a function call per phase per turn.
+
+enable() starts a Profiler and also wraps the inner hot spots (HOT_SPOTS) in their
+modules. For every section it records calls, wall time (inclusive and self) and the
+net number of memory blocks allocated (sys.getallocatedblocks), keyed by call stack.
+Results come out as:
+    summary()      a live table, per phase
+    folded()       folded stacks ("turn;rival_turn;pick_target_country 1234", self time
+                   in microseconds) for flamegraph.pl / speedscope / inferno
+    histogram()    per-turn time of each phase, in power-of-two millisecond buckets
+
+Set DEEP_STATE_PROFILE=1 to profile from startup and print the summary every
+PRINT_EVERY turns, or run `python profiling.py --turns 200 --folded turns.folded`.
+"""
+import contextlib
+import functools
+import importlib
+import os
+import sys
+import threading
+import time
+
+# module -> functions wrapped while profiling is on
+HOT_SPOTS = {
+    'ai': ('pick_target_country', 'ai_research_tech', 'pick_affordable_operation'),
+    'events': ('apply_event',),
+    'operations': ('resolve_orders',),
+}
+
+# DEEP_STATE_PROFILE=1 profiles from startup and prints the summary every PRINT_EVERY turns
+FROM_ENV = os.environ.get('DEEP_STATE_PROFILE') == '1'
+PRINT_EVERY = 50
+HISTOGRAM_BUCKETS = 16  # the last bucket holds everything >= 2**(HISTOGRAM_BUCKETS - 4) ms
+HISTOGRAM_WIDTH = 40
+
+_NULL = contextlib.nullcontext()
+_profiler = None
+_originals = {}
+
+class Section:
+    __slots__ = ('profiler', 'name')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.push(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.pop()
+        return False
+
+class Profiler:
+    """
+    Section timings keyed by call stack. Each thread keeps its own stack (turns may run
+    on the Tk worker thread or in server threads); totals are merged under a lock.
+    Per-turn totals are kept per thread too, so time spent on other threads (the Tk
+    thread, other sessions) never lands in a turn; next_turn() closes the calling
+    thread's turn.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        # stack tuple -> [calls, inclusive seconds, self seconds, net allocated blocks]
+        self.stacks = {}
+        # per finished turn: {phase name: seconds}, all from the thread that ran the turn
+        self.turns = []
+
+    def section(self, name):
+        return Section(self, name)
+
+    def push(self, name):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        # [name, start, blocks at start, time spent in child sections]
+        stack.append([name, time.perf_counter(), sys.getallocatedblocks(), 0.0])
+
+    def pop(self):
+        now = time.perf_counter()
+        blocks = sys.getallocatedblocks()
+        stack = self.local.stack
+        path = tuple(frame[0] for frame in stack)
+        name, start, start_blocks, child_time = stack.pop()
+        elapsed = now - start
+        if stack:
+            stack[-1][3] += elapsed
+        with self.lock:
+            totals = self.stacks.get(path)
+            if totals is None:
+                totals = self.stacks[path] = [0, 0.0, 0.0, 0]
+            totals[0] += 1
+            totals[1] += elapsed
+            totals[2] += elapsed - child_time
+            totals[3] += blocks - start_blocks
+        if name not in path[:-1]:  # recursion would count the time twice
+            turn = getattr(self.local, 'turn', None)
+            if turn is None:
+                turn = self.local.turn = {}
+            turn[name] = turn.get(name, 0.0) + elapsed
+
+    def next_turn(self):
+        """Closes this thread's current turn's per-phase totals (for histogram())."""
+        turn = getattr(self.local, 'turn', None)
+        if turn:
+            self.local.turn = {}
+            with self.lock:
+                self.turns.append(turn)
+
+    # --------------------------------------------------
+    # Reports
+    # --------------------------------------------------
+    def by_name(self):
+        """name -> [calls, inclusive seconds, self seconds, net blocks], recursion counted once."""
+        with self.lock:
+            items = list(self.stacks.items())
+        result = {}
+        for path, (calls, inclusive, self_time, blocks) in items:
+            totals = result.setdefault(path[-1], [0, 0.0, 0.0, 0])
+            totals[0] += calls
+            totals[2] += self_time
+            if path[-1] not in path[:-1]:
+                totals[1] += inclusive
+                totals[3] += blocks
+        return result
+
+    def summary(self):
+        rows = sorted(self.by_name().items(), key=lambda item: -item[1][1])
+        lines = [f"{'Phase':<28}{'Calls':>9}{'Total ms':>11}{'Self ms':>10}{'Mean us':>10}{'Blocks':>10}"]
+        for name, (calls, inclusive, self_time, blocks) in rows:
+            lines.append(f"{name:<28}{calls:>9}{inclusive * 1000:>11.2f}{self_time * 1000:>10.2f}"
+                         f"{inclusive / calls * 1e6:>10.1f}{blocks:>10}")
+        lines.append(f"{len(self.turns)} turns profiled")
+        return "\n".join(lines)
+
+    def folded(self):
+        """Folded stacks, one per line, weighted by self time in microseconds."""
+        with self.lock:
+            items = sorted(self.stacks.items())
+        return "\n".join(f"{';'.join(path)} {round(self_time * 1e6)}"
+                         for path, (_, _, self_time, _) in items if self_time > 0) + "\n"
+
+    def histogram(self, phases=None):
+        """Text histogram of each phase's time per turn."""
+        with self.lock:
+            turns = list(self.turns)
+        phases = phases or sorted({name for turn in turns for name in turn})
+        lines = []
+        for name in phases:
+            counts = [0] * HISTOGRAM_BUCKETS
+            for turn in turns:
+                if name in turn:
+                    counts[bucket(turn[name] * 1000)] += 1
+            if not any(counts):
+                continue
+            lines.append(f"{name} ({sum(counts)} turns)")
+            first = next(i for i, count in enumerate(counts) if count)
+            last = max(i for i, count in enumerate(counts) if count)
+            peak = max(counts)
+            for i in range(first, last + 1):
+                bar = '#' * round(counts[i] * HISTOGRAM_WIDTH / peak)
+                lines.append(f"  {bucket_label(i):>12} {counts[i]:>6} {bar}")
+        return "\n".join(lines)
+
+def bucket(ms):
+    """Bucket i holds times in [2**(i-4), 2**(i-3)) ms; bucket 0 everything below 1/8 ms."""
+    i = 0
+    limit = 0.125
+    while ms >= limit and i < HISTOGRAM_BUCKETS - 1:
+        i += 1
+        limit *= 2
+    return i
+
+def bucket_label(i):
+    if i == 0:
+        return "< 0.125 ms"
+    if i == HISTOGRAM_BUCKETS - 1:
+        return f">= {2 ** (i - 4):g} ms"
+    return f"< {2 ** (i - 3):g} ms"
+
+# --------------------------------------------------
+# Switching on and off
+# --------------------------------------------------
+def enabled():
+    return _profiler is not None
+
+def phase(name):
+    """Context manager timing one pipeline phase; a shared no-op while profiling is off."""
+    profiler = _profiler
+    return _NULL if profiler is None else Section(profiler, name)
+
+def next_turn():
+    profiler = _profiler
+    if profiler is None:
+        return
+    profiler.next_turn()
+    if FROM_ENV and len(profiler.turns) % PRINT_EVERY == 0:
+        print(profiler.summary(), file=sys.stderr)
+
+def _timed(name, function):
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        profiler = _profiler
+        if profiler is None:
+            return function(*args, **kwargs)
+        profiler.push(name)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.pop()
+    return timed
+
+def enable():
+    """Starts profiling (with a fresh Profiler) and wraps the HOT_SPOTS. Returns the Profiler."""
+    global _profiler
+    if _profiler is None:
+        for module_name, names in HOT_SPOTS.items():
+            module = importlib.import_module(module_name)
+            for name in names:
+                original = getattr(module, name)
+                _originals[module_name, name] = original
+                setattr(module, name, _timed(name, original))
+    _profiler = Profiler()
+    return _profiler
+
+def disable():
+    """Stops profiling, unwraps the hot spots and returns the Profiler with the results."""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    for (module_name, name), original in _originals.items():
+        setattr(importlib.import_module(module_name), name, original)
+    _originals.clear()
+    return profiler
+
+if FROM_ENV:
+    enable()
+
+def main_cli(argv=None):
+    import argparse
+    import engine
+    import main
+    import simulate
+
+    parser = argparse.ArgumentParser(description="Profile headless Deep State turns.")
+    parser.add_argument('--turns', type=int, default=200)
+    parser.add_argument('--policy', choices=sorted(simulate.POLICIES), default='greedy')
+    parser.add_argument('--agency', default="CIA")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--folded', help="Write folded stacks (for flamegraph tools) to this file.")
+    args = parser.parse_args(argv)
+
+    profiler = enable()
+    policy = simulate.POLICIES[args.policy]
+    game_state = main.initialize_game(args.agency, seed=args.seed)
+    for _ in range(args.turns):
+        outcome, _ = engine.play_turn(game_state, policy)
+        if outcome:
+            game_state = main.initialize_game(args.agency, seed=args.seed + len(profiler.turns))
+    profiler.next_turn()
+    disable()
+
+    print(profiler.summary())
+    print()
+    print(profiler.histogram())
+    if args.folded:
+        with open(args.folded, 'w') as file:
+            file.write(profiler.folded())
+
+if __name__ == "__main__":
+    # Run through the importable module, so engine's phase() calls see the same profiler
+    import profiling
+    profiling.main_cli()
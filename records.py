@@ -0,0 +1,391 @@
+"""
+Compact country and agency records.
+A plain game keeps every country as a dict with a nested influence dict, and every rival's
+ai_resources entry as a dict with a growing researched_techs list. Python objects cost far
+more than the numbers in them, so on big maps that overhead is most of the memory.
+
+CompactCountries holds the countries in stdlib int32 arrays instead (one per field, plus
+a flat countries x agencies influence matrix, with snapshot.ABSENT for missing entries)
+and hands out small __slots__ views, so game_state['countries']['USA']['influence']['CIA']
+keeps working everywhere. It needs no NumPy, unlike world.ArrayWorld; it trades some
+speed per access for the memory. The matrix is dense, so it pays off when most agencies
+have influence in most countries (as on the built-in map), not on worldgen.py maps with
+hundreds of agencies and a few per country.
+
+AgencyRecord is a __slots__ ai_resources entry. Researched techs are a bitset over the
+tech's position in tech_tree.json (gamedata.tech_index()); record['researched_techs']
+reads them back as a tuple of names, in tech tree order.
+
+Run `python records.py` for bytes per country with each layout.
+"""
+import argparse
+from array import array
+from collections.abc import Mapping, MutableMapping
+
+import gamedata
+from snapshot import ABSENT, COUNTRY_FIELDS, DEFAULT_KEY_ORDER
+
+AGENCY_NUMBERS = ('budget', 'political_capital', 'research_points', 'agents')
+AGENCY_FIELDS = AGENCY_NUMBERS + ('researched_techs',)
+
+def _int32(value, what):
+    if type(value) is not int or not ABSENT < value < 2**31:
+        raise ValueError(f"{what}={value!r} doesn't fit an int32 column")
+    return value
+
+# --------------------------------------------------
+# Countries
+# --------------------------------------------------
+class CompactCountries(MutableMapping):
+    _shared = False  # True while the arrays may still be shared with a fork
+
+    def __init__(self, names, agencies, influence, columns, key_order=None, extras=None):
+        self.names = list(names)
+        self.agencies = list(agencies)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.agency_index = {agency: j for j, agency in enumerate(self.agencies)}
+        self.influence = influence  # array('i'), row-major, ABSENT where a country has no entry
+        self.columns = columns      # field -> array('i'), ABSENT where the field is missing
+        self.key_order = tuple(key_order or DEFAULT_KEY_ORDER)
+        self.extras = extras or {}  # name -> (key order, non-numeric fields), for irregular countries
+
+    @classmethod
+    def from_countries(cls, countries, agencies=None):
+        """Builds CompactCountries from a game_state['countries'] style dict."""
+        names = list(countries)
+        if agencies is None:
+            agencies = []
+            for data in countries.values():
+                for agency in data['influence']:
+                    if agency not in agencies:
+                        agencies.append(agency)
+        agency_index = {agency: j for j, agency in enumerate(agencies)}
+        m = len(agencies)
+
+        influence = array('i', [ABSENT]) * (len(names) * m)
+        columns = {field: array('i') for field in COUNTRY_FIELDS}
+        key_order = tuple(next(iter(countries.values()))) if countries else DEFAULT_KEY_ORDER
+        extras = {}
+
+        for i, data in enumerate(countries.values()):
+            base = i * m
+            for agency, value in data['influence'].items():
+                influence[base + agency_index[agency]] = _int32(value, f"{names[i]}: influence {agency}")
+            for field in COUNTRY_FIELDS:
+                columns[field].append(_int32(data[field], f"{names[i]}: {field}") if field in data else ABSENT)
+            extra = {key: value for key, value in data.items()
+                     if key != 'influence' and key not in COUNTRY_FIELDS}
+            if extra or tuple(data) != key_order:
+                extras[names[i]] = (tuple(data), extra)
+
+        return cls(names, agencies, influence, columns, key_order, extras)
+
+    def country_dict(self, i):
+        """Returns country i in the plain dict layout."""
+        key_order, extra = self.extras.get(self.names[i], (self.key_order, {}))
+        m = len(self.agencies)
+        row = self.influence[i * m:(i + 1) * m]
+        data = {}
+        for key in key_order:
+            if key == 'influence':
+                data['influence'] = {agency: value for agency, value in zip(self.agencies, row) if value != ABSENT}
+            elif key in self.columns:
+                value = self.columns[key][i]
+                if value != ABSENT:
+                    data[key] = value
+            else:
+                data[key] = extra[key]
+        return data
+
+    def to_countries(self):
+        """Converts back to the game_state['countries'] dict layout (what save files hold)."""
+        return {name: self.country_dict(i) for i, name in enumerate(self.names)}
+
+    def fork(self):
+        """
+        Copy for a forked game (see forking.py). Names and indexes are shared for good, the
+        arrays until either game first changes a country: that game then copies all of them
+        (see _writable), so copy-on-write here is per world, not per country as in CowCountries.
+        """
+        self._shared = True
+        child = object.__new__(CompactCountries)
+        child.__dict__.update(self.__dict__)
+        return child
+
+    def _writable(self):
+        """Returns self after giving it its own arrays if they are still shared with a fork."""
+        if self._shared:
+            self.influence = array('i', self.influence)
+            self.columns = {field: array('i', column) for field, column in self.columns.items()}
+            self._shared = False
+        return self
+
+    def __getitem__(self, name):
+        return CountryRecord(self, self.index[name])
+
+    def __setitem__(self, name, data):
+        i = self.index[name]  # the set of countries is fixed once the world is built
+        record = CountryRecord(self, i)
+        for key, value in data.items():
+            record[key] = value
+
+    def __delitem__(self, name):
+        raise TypeError("Countries cannot be removed from CompactCountries.")
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+class CountryRecord(MutableMapping):
+    """Dict-like view of one CompactCountries country, e.g. countries['USA']['stability'] += 5."""
+    __slots__ = ('_world', '_i')
+
+    def __init__(self, world, i):
+        self._world = world
+        self._i = i
+
+    def _keys(self):
+        world = self._world
+        key_order = world.extras.get(world.names[self._i], (world.key_order, {}))[0]
+        return [key for key in key_order
+                if key not in world.columns or world.columns[key][self._i] != ABSENT]
+
+    def __getitem__(self, key):
+        world = self._world
+        if key == 'influence':
+            return InfluenceRecord(world, self._i * len(world.agencies))
+        column = world.columns.get(key)
+        if column is not None:
+            value = column[self._i]
+            if value == ABSENT:
+                raise KeyError(key)
+            return value
+        return world.extras.get(world.names[self._i], ((), {}))[1][key]
+
+    def __setitem__(self, key, value):
+        world = self._world
+        if key == 'influence':
+            record = InfluenceRecord(world, self._i * len(world.agencies))
+            for agency, amount in value.items():
+                record[agency] = amount
+        elif key in world.columns:
+            world._writable().columns[key][self._i] = _int32(value, key)
+        else:
+            raise KeyError(f"CompactCountries countries have no '{key}' field.")
+
+    def __delitem__(self, key):
+        raise TypeError("Fields cannot be removed from a CompactCountries country.")
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+class InfluenceRecord(MutableMapping):
+    """Dict-like view of one country's influence row (agency -> influence)."""
+    __slots__ = ('_world', '_base')
+
+    def __init__(self, world, base):
+        self._world = world
+        self._base = base
+
+    def get(self, agency, default=None):
+        # set_influence and the target samplers read through get(), so skip the KeyError
+        j = self._world.agency_index.get(agency)
+        if j is None:
+            return default
+        value = self._world.influence[self._base + j]
+        return default if value == ABSENT else value
+
+    def __getitem__(self, agency):
+        value = self.get(agency, ABSENT)
+        if value == ABSENT:
+            raise KeyError(agency)
+        return value
+
+    def __setitem__(self, agency, value):
+        world = self._world
+        world._writable().influence[self._base + world.agency_index[agency]] = _int32(value, agency)
+
+    def __delitem__(self, agency):
+        self[agency]  # KeyError if there's no entry
+        world = self._world
+        world._writable().influence[self._base + world.agency_index[agency]] = ABSENT
+
+    def __iter__(self):
+        influence, base = self._world.influence, self._base
+        return (agency for j, agency in enumerate(self._world.agencies) if influence[base + j] != ABSENT)
+
+    def __len__(self):
+        influence, base = self._world.influence, self._base
+        return sum(1 for j in range(len(self._world.agencies)) if influence[base + j] != ABSENT)
+
+# --------------------------------------------------
+# Agencies
+# --------------------------------------------------
+def tech_bits(names):
+    """Bitset of the given tech names (bit i = tech i of tech_tree.json)."""
+    index = gamedata.tech_index()
+    bits = 0
+    for name in names:
+        j = index.get(name)
+        if j is None:
+            raise ValueError(f"Unknown tech {name!r} (not in tech_tree.json)")
+        bits |= 1 << j
+    return bits
+
+def tech_names(bits):
+    """The tech names in a bitset, in tech_tree.json order."""
+    names = gamedata.tech_names()
+    result = []
+    while bits:
+        low = bits & -bits
+        result.append(names[low.bit_length() - 1])
+        bits ^= low
+    return tuple(result)
+
+class AgencyRecord(MutableMapping):
+    """
+    One rival's ai_resources entry. Reads and writes like the old dict
+    ({'budget', 'political_capital', 'research_points', 'agents', 'researched_techs'});
+    `techs` is the researched-techs bitset.
+    """
+    __slots__ = AGENCY_NUMBERS + ('techs',)
+
+    def __init__(self, budget=0, political_capital=0, research_points=0, agents=0, techs=0):
+        self.budget = budget
+        self.political_capital = political_capital
+        self.research_points = research_points
+        self.agents = agents
+        self.techs = techs
+
+    @classmethod
+    def from_dict(cls, data):
+        """An AgencyRecord from the dict layout (missing fields are 0)."""
+        return cls(*(data.get(field, 0) for field in AGENCY_NUMBERS),
+                   techs=tech_bits(data.get('researched_techs', ())))
+
+    def to_dict(self):
+        """The dict layout, as save files hold it."""
+        data = {field: getattr(self, field) for field in AGENCY_NUMBERS}
+        data['researched_techs'] = list(tech_names(self.techs))
+        return data
+
+    def copy(self):
+        return AgencyRecord(self.budget, self.political_capital, self.research_points, self.agents, self.techs)
+
+    def has_tech(self, name):
+        j = gamedata.tech_index().get(name)
+        return j is not None and bool(self.techs >> j & 1)
+
+    def add_tech(self, name):
+        self.techs |= 1 << gamedata.tech_index()[name]
+
+    def __getitem__(self, key):
+        if key in AGENCY_NUMBERS:
+            return getattr(self, key)
+        if key == 'researched_techs':
+            return tech_names(self.techs)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in AGENCY_NUMBERS:
+            setattr(self, key, value)
+        elif key == 'researched_techs':
+            self.techs = tech_bits(value)
+        else:
+            raise KeyError(f"Agency records have no '{key}' field.")
+
+    def __delitem__(self, key):
+        raise TypeError("Fields cannot be removed from an agency record.")
+
+    def __iter__(self):
+        return iter(AGENCY_FIELDS)
+
+    def __len__(self):
+        return len(AGENCY_FIELDS)
+
+    def __eq__(self, other):
+        if isinstance(other, AgencyRecord):
+            return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+        if isinstance(other, Mapping):
+            return self.to_dict() == {key: list(value) if key == 'researched_techs' else value
+                                      for key, value in other.items()}
+        return NotImplemented
+
+    def __repr__(self):
+        return f"AgencyRecord({self.to_dict()})"
+
+def agency_records(ai_resources):
+    """game_state['ai_resources'] with every entry as an AgencyRecord (e.g. after loading a save)."""
+    return {agency: data if isinstance(data, AgencyRecord) else AgencyRecord.from_dict(data)
+            for agency, data in ai_resources.items()}
+
+def json_default(obj):
+    """json.dump default= for game states: compact worlds and records go back to the dict layout."""
+    if hasattr(obj, 'to_countries'):
+        return obj.to_countries()
+    if isinstance(obj, AgencyRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+# --------------------------------------------------
+# Memory report
+# --------------------------------------------------
+def _allocated(build):
+    import gc
+    import tracemalloc
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+def report(n_countries=100_000, n_agencies=4):
+    """Prints bytes per country (and per agency record) for each world layout."""
+    import worldgen
+
+    agencies = list(worldgen.generate_agencies(n_agencies))
+    source = worldgen.generate_countries(n_countries, agencies)
+    # Each layout is measured building from JSON-like data, like a real game's countries
+    countries, dict_bytes = _allocated(lambda: {name: {key: dict(value) if key == 'influence' else value
+                                                        for key, value in data.items()}
+                                                 for name, data in source.items()})
+    del countries
+    rows = [('dict', dict_bytes)]
+    _, compact_bytes = _allocated(lambda: CompactCountries.from_countries(source, agencies))
+    rows.append(('CompactCountries', compact_bytes))
+    try:
+        import world
+        _, array_bytes = _allocated(lambda: world.ArrayWorld.from_countries(source, agencies))
+        rows.append(('ArrayWorld', array_bytes))
+    except ImportError:
+        pass
+
+    print(f"{n_countries} countries, {n_agencies} agencies")
+    print(f"{'Layout':<20}{'MB':>10}{'Bytes/country':>16}")
+    for name, size in rows:
+        print(f"{name:<20}{size / 1e6:>10.2f}{size / n_countries:>16.0f}")
+
+    techs = list(gamedata.tech_names())
+    plain = {field: 0 for field in AGENCY_NUMBERS}
+    plain['researched_techs'] = techs[:len(techs) // 2]
+    _, dict_agency = _allocated(lambda: [dict(plain, researched_techs=list(plain['researched_techs']))
+                                         for _ in range(1000)])
+    _, record_agency = _allocated(lambda: [AgencyRecord.from_dict(plain) for _ in range(1000)])
+    print(f"ai_resources entry with {len(plain['researched_techs'])} techs: "
+          f"dict {dict_agency / 1000:.0f} bytes, AgencyRecord {record_agency / 1000:.0f} bytes")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bytes per country for each world layout.")
+    parser.add_argument('--countries', type=int, default=100_000)
+    parser.add_argument('--agencies', type=int, default=4)
+    args = parser.parse_args()
+    report(args.countries, args.agencies)
@@ -0,0 +1,103 @@
+"""
+Deterministic replay.
+A game's replay record (game_state['replay']: agency, seed and every player action
+tagged with its turn) is enough to re-simulate it without the UI. Batch games can
+also be reproduced from just their seed and policy, since policies are deterministic
+given the game's random stream.
+
+Usage:
+    python replay.py save/save1.json --turn 30
+    python replay.py --seed 123456789 --agency MSS --policy greedy --turn 30
+"""
+import argparse
+import json
+
+import engine
+import eventlog
+import main
+import seeding
+import snapshot
+
+def replay(record, until_turn=None, log_callback=None):
+    """
+    Re-simulates a recorded game up to the start of until_turn (or to its last recorded turn).
+    Returns (game_state, outcome); outcome is None if the game was still running.
+    Raises ValueError for records made by a game version that played differently
+    (see seeding.REPLAY_VERSION).
+    """
+    version = record.get('version', 1)
+    if version != seeding.REPLAY_VERSION:
+        raise ValueError(f"Replay format {version} can't be re-simulated by this version of the game "
+                         f"(it replays format {seeding.REPLAY_VERSION}).")
+    game_state = main.initialize_game(record['agency'], seed=record['seed'], rival_ai=record.get('rival_ai'))
+    actions_by_turn = {}
+    for turn, *action in record['actions']:
+        actions_by_turn.setdefault(turn, []).append(tuple(action))
+    if until_turn is None:
+        until_turn = max(actions_by_turn, default=1) + 1
+
+    log_callback = log_callback or eventlog.NULL_LOG
+    log = eventlog.emitter(log_callback)
+    while game_state['turn'] < until_turn:
+        for action in actions_by_turn.get(game_state['turn'], ()):
+            ok, msg = engine.apply_action(game_state, action)
+            log('message', text=msg)
+        outcome, msg = engine.end_turn(game_state, log_callback=log_callback)
+        log('message', text=msg)
+        if outcome:
+            return game_state, outcome
+    return game_state, None
+
+def load_record(path):
+    """
+    (replay record, turn) from a save, read through main.load_game so autosave journals and
+    binary snapshots count, or (record, None) from a bare replay record file.
+    """
+    if not snapshot.is_snapshot(path):
+        with open(path, 'r') as file:
+            data = json.load(file)
+        if 'replay' not in data:
+            return data, None
+    game_state = main.load_game(path)
+    return game_state['replay'], game_state['turn']
+
+def replay_policy(agency, seed, policy, until_turn, log_callback=None):
+    """Re-plays a scripted (batch) game from its seed and policy up to the start of until_turn."""
+    game_state = main.initialize_game(agency, seed=seed)
+    while game_state['turn'] < until_turn:
+        outcome, msg = engine.play_turn(game_state, policy, log_callback)
+        if outcome:
+            return game_state, outcome
+    return game_state, None
+
+def main_cli(argv=None):
+    import simulate
+
+    parser = argparse.ArgumentParser(description="Re-simulate a recorded Deep State game.")
+    parser.add_argument('save', nargs='?', help="Save file (or replay record JSON) to replay.")
+    parser.add_argument('--turn', type=int, default=None, help="Stop at the start of this turn.")
+    parser.add_argument('--seed', type=int, help="Replay a batch game from its seed instead of a save.")
+    parser.add_argument('--agency', default="CIA")
+    parser.add_argument('--policy', choices=sorted(simulate.POLICIES), default='greedy')
+    parser.add_argument('--verbose', action='store_true', help="Print the game log while replaying.")
+    args = parser.parse_args(argv)
+
+    log = print if args.verbose else None
+    if args.save:
+        try:
+            record, turn = load_record(args.save)
+            # A save holds the state at the start of its turn, so that's where to stop by default
+            game_state, outcome = replay(record, args.turn or turn, log)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    elif args.seed is not None:
+        game_state, outcome = replay_policy(args.agency, args.seed, simulate.POLICIES[args.policy],
+                                            args.turn or 1000, log)
+    else:
+        parser.error("give a save file or --seed")
+
+    print(main.display_resource_summary(game_state))
+    print(f"Turn: {game_state['turn']}, Visibility: {game_state['visibility']}%, Outcome: {outcome or 'in progress'}")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,296 @@
+"""
+Columnar results store for simulation runs.
+A ResultsWriter streams per-game and per-turn records into a shard file as typed column
+chunks: every `chunk_rows` rows of a table, or sooner once the chunk holds `chunk_values`
+values (vector columns count every element), each of its columns is written as one block
+(int64 and float64 as raw little-endian arrays, strings as a JSON list). Numbers are
+buffered in typed arrays, so a writer holds about 8 * chunk_values bytes per table
+whatever the world size. On close it appends an index of the blocks.
+
+A results directory holds any number of shards (one per worker task) and is read as one
+dataset; merge() moves shards between directories without rewriting them. ResultsReader
+reads only the blocks of the columns asked for, seeking past everything else.
+
+Tables:
+    games  one row per finished game (GAME_COLUMNS)
+    turns  one row per sampled turn (TURN_COLUMNS); `influence` is the player's
+           influence in every country, in countries order (a fixed-width vector column)
+
+Usage: python resultstore.py results/ --table games --column outcome
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import uuid
+from array import array
+from collections import Counter
+
+SHARD_SUFFIX = '.cols'
+DEFAULT_CHUNK_ROWS = 4096
+# Values buffered per table before a chunk is written: 8 MB of int64s
+DEFAULT_CHUNK_VALUES = 1 << 20
+
+FILE_MAGIC = b'DSCOLS1\n'
+BLOCK_MAGIC = b'BLK1'
+INDEX_MAGIC = b'DSCIDX1\n'
+# magic, table name length, column name length, type code, width, rows, payload bytes
+BLOCK_HEADER = struct.Struct('<4sHHcIIQ')
+# index offset, magic
+FOOTER = struct.Struct('<Q8s')
+
+# Column type codes: 'q' int64, 'd' float64, 's' string
+GAME_COLUMNS = (
+    ('seed', 'q'), ('agency', 's'), ('policy', 's'), ('outcome', 's'), ('turns', 'q'),
+    ('budget', 'q'), ('political_capital', 'q'), ('visibility', 'q'),
+)
+TURN_COLUMNS = (
+    ('seed', 'q'), ('turn', 'q'), ('budget', 'q'), ('political_capital', 'q'),
+    ('visibility', 'q'), ('agents', 'q'), ('influence', 'q'),
+)
+TABLES = {'games': GAME_COLUMNS, 'turns': TURN_COLUMNS}
+
+def _encode(code, values):
+    if code == 's':
+        return json.dumps(values).encode()
+    data = values if isinstance(values, array) else array(code, values)
+    if sys.byteorder == 'big':
+        data = array(code, data)
+        data.byteswap()
+    return data.tobytes()
+
+def _decode(code, payload):
+    if code == 's':
+        return json.loads(payload)
+    data = array(code)
+    data.frombytes(payload)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data
+
+def _buffer(code):
+    return [] if code == 's' else array(code)
+
+class ResultsWriter:
+    """Appends rows to one shard file, a chunk of rows per table at a time."""
+    def __init__(self, path, chunk_rows=DEFAULT_CHUNK_ROWS, chunk_values=DEFAULT_CHUNK_VALUES):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.chunk_values = chunk_values
+        self.file = open(path, 'wb')
+        self.file.write(FILE_MAGIC)
+        # table -> {column: array of values (vector columns: flattened), or a list of strings}
+        self.buffers = {table: {name: _buffer(code) for name, code in columns} for table, columns in TABLES.items()}
+        self.rows = dict.fromkeys(TABLES, 0)
+        self.values = dict.fromkeys(TABLES, 0)  # values buffered per table, counting vector elements
+        self.widths = {}  # (table, column) -> values per row, for vector columns in the current chunk
+        self.index = []
+
+    @classmethod
+    def in_directory(cls, directory, chunk_rows=DEFAULT_CHUNK_ROWS, chunk_values=DEFAULT_CHUNK_VALUES):
+        """A writer on a new, uniquely named shard in `directory`."""
+        os.makedirs(directory, exist_ok=True)
+        return cls(os.path.join(directory, uuid.uuid4().hex + SHARD_SUFFIX), chunk_rows, chunk_values)
+
+    def add_game(self, result, game_state=None):
+        """One finished game: a simulate.run_game result, plus final resources if game_state is given."""
+        state = game_state or {}
+        self._append('games', {
+            'seed': result['seed'], 'agency': result['agency'], 'policy': result['policy'],
+            'outcome': result['outcome'], 'turns': result['turns'],
+            'budget': state.get('budget', 0), 'political_capital': state.get('political_capital', 0),
+            'visibility': state.get('visibility', 0),
+        })
+
+    def add_turn(self, game_state):
+        """A sample of the game as it stands (call after engine.end_turn)."""
+        self._append('turns', {
+            'seed': game_state['replay']['seed'], 'turn': game_state['turn'],
+            'budget': game_state['budget'], 'political_capital': game_state['political_capital'],
+            'visibility': game_state['visibility'], 'agents': game_state['agents'],
+            'influence': player_influence(game_state),
+        })
+
+    def _append(self, table, row):
+        size = 0
+        new_width = False
+        for name, value in row.items():
+            if isinstance(value, (list, tuple)):
+                width = self.widths.get((table, name))
+                # A different world size starts a new chunk, so every chunk has one width
+                new_width = new_width or (width is not None and width != len(value))
+                size += len(value)
+            else:
+                size += 1
+        if new_width or (self.rows[table] and self.values[table] + size > self.chunk_values):
+            self.flush(table)
+
+        buffers = self.buffers[table]
+        for name, value in row.items():
+            if isinstance(value, (list, tuple)):
+                self.widths[table, name] = len(value)
+                buffers[name].extend(value)
+            else:
+                buffers[name].append(value)
+        self.rows[table] += 1
+        self.values[table] += size
+        if self.rows[table] >= self.chunk_rows or self.values[table] >= self.chunk_values:
+            self.flush(table)
+
+    def flush(self, table):
+        rows = self.rows[table]
+        if not rows:
+            return
+        table_name = table.encode()
+        for name, code in TABLES[table]:
+            width = self.widths.pop((table, name), 1)
+            payload = _encode(code, self.buffers[table][name])
+            column_name = name.encode()
+            offset = self.file.tell()
+            self.file.write(BLOCK_HEADER.pack(BLOCK_MAGIC, len(table_name), len(column_name), code.encode(),
+                                              width, rows, len(payload)))
+            self.file.write(table_name + column_name)
+            self.file.write(payload)
+            self.index.append((table, name, code, width, rows,
+                               offset + BLOCK_HEADER.size + len(table_name) + len(column_name), len(payload)))
+            self.buffers[table][name] = _buffer(code)
+        self.rows[table] = 0
+        self.values[table] = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+        for table in TABLES:
+            self.flush(table)
+        offset = self.file.tell()
+        self.file.write(json.dumps(self.index).encode())
+        self.file.write(FOOTER.pack(offset, INDEX_MAGIC))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+def player_influence(game_state):
+    """The player's influence in every country, in countries order."""
+    countries = game_state['countries']
+    agency = game_state['agency']
+    if hasattr(countries, 'leader_indices'):
+        j = countries.agency_index.get(agency)
+        if j is not None:
+            column = countries.influence[:, j]
+            if countries.influence_present is not None:
+                column = column * countries.influence_present[:, j]
+            return column.tolist()
+    return [data['influence'].get(agency, 0) for data in countries.values()]
+
+# --------------------------------------------------
+# Reading
+# --------------------------------------------------
+def read_index(path):
+    """
+    [(table, column, code, width, rows, offset, size)] for every block of one shard.
+    Shards that were never closed (a worker died) have no index and are scanned block by block.
+    """
+    with open(path, 'rb') as file:
+        if file.read(len(FILE_MAGIC)) != FILE_MAGIC:
+            raise ValueError(f"{path} is not a results shard")
+        end = file.seek(0, os.SEEK_END)
+        if end >= len(FILE_MAGIC) + FOOTER.size:
+            file.seek(end - FOOTER.size)
+            offset, magic = FOOTER.unpack(file.read(FOOTER.size))
+            if magic == INDEX_MAGIC:
+                file.seek(offset)
+                return [tuple(entry) for entry in json.loads(file.read(end - FOOTER.size - offset))]
+
+        index = []
+        position = len(FILE_MAGIC)
+        file.seek(position)
+        while position + BLOCK_HEADER.size <= end:
+            magic, table_length, column_length, code, width, rows, size = BLOCK_HEADER.unpack(
+                file.read(BLOCK_HEADER.size))
+            if magic != BLOCK_MAGIC:
+                break
+            names = file.read(table_length + column_length)
+            offset = position + BLOCK_HEADER.size + table_length + column_length
+            if offset + size > end:
+                break  # cut off mid-block
+            index.append((names[:table_length].decode(), names[table_length:].decode(), code.decode(),
+                          width, rows, offset, size))
+            position = file.seek(offset + size)
+        return index
+
+def shard_paths(path):
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(SHARD_SUFFIX))
+    return [path]
+
+class ResultsReader:
+    """A shard file, or a directory of shards read as one dataset."""
+    def __init__(self, path):
+        self.indexes = {shard: read_index(shard) for shard in shard_paths(path)}
+
+    def columns(self, table):
+        return [name for name, _ in TABLES[table]]
+
+    def rows(self, table):
+        column = TABLES[table][0][0]
+        return sum(rows for index in self.indexes.values()
+                   for t, name, _, _, rows, _, _ in index if t == table and name == column)
+
+    def chunks(self, table, column):
+        """Yields (values, width) per block of one column: an array (or a list of strings) of rows * width values."""
+        for shard, index in self.indexes.items():
+            blocks = [entry for entry in index if entry[0] == table and entry[1] == column]
+            if not blocks:
+                continue
+            with open(shard, 'rb') as file:
+                for _, _, code, width, _, offset, size in blocks:
+                    file.seek(offset)
+                    yield _decode(code, file.read(size)), width
+
+    def column(self, table, column):
+        """The whole column: an array (flattened, for vector columns) or a list of strings."""
+        code = dict(TABLES[table])[column]
+        values = [] if code == 's' else array(code)
+        for chunk, _ in self.chunks(table, column):
+            values.extend(chunk)
+        return values
+
+def merge(sources, target):
+    """Moves the shards of every source directory into `target` (files are renamed, not rewritten)."""
+    os.makedirs(target, exist_ok=True)
+    moved = 0
+    for source in sources:
+        for shard in shard_paths(source):
+            destination = os.path.join(target, os.path.basename(shard))
+            if os.path.exists(destination):
+                destination = os.path.join(target, uuid.uuid4().hex + SHARD_SUFFIX)
+            os.replace(shard, destination)
+            moved += 1
+    return moved
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize one column of a results directory or shard.")
+    parser.add_argument('path')
+    parser.add_argument('--table', choices=sorted(TABLES), default='games')
+    parser.add_argument('--column', default='outcome')
+    args = parser.parse_args(argv)
+
+    reader = ResultsReader(args.path)
+    if args.column not in reader.columns(args.table):
+        parser.error(f"{args.table} has no column {args.column!r} (columns: {', '.join(reader.columns(args.table))})")
+    values = reader.column(args.table, args.column)
+    print(f"{args.table}.{args.column}: {len(values)} values from {len(reader.indexes)} shards")
+    if isinstance(values, list):
+        for value, count in Counter(values).most_common():
+            print(f"  {value:<12}{count:>10}")
+    elif values:
+        print(f"  min {min(values)}  max {max(values)}  mean {sum(values) / len(values):.2f}")
+
+if __name__ == "__main__":
+    main_cli()
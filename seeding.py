@@ -0,0 +1,58 @@
+"""
+Per-game random number streams.
+Every game owns a random.Random seeded from game_state['replay']['seed'], so the same
+seed and the same player actions always play out the same way, and parallel games
+never share (or collide on) a generator.
+"""
+import hashlib
+import random
+
+# Bumped whenever the same seed and actions stop playing out the same way, so replay.py
+# refuses records it can't reproduce. Records without a version are version 1; version 2
+# resolves all the rivals' operations together, drawing their rolls after every rival has
+# picked (operations.resolve_orders).
+REPLAY_VERSION = 2
+
+def new_seed():
+    """A fresh 63-bit seed from the OS entropy pool."""
+    return random.SystemRandom().getrandbits(63)
+
+def derive_seed(base_seed, index):
+    """
+    Seed for game `index` of a batch started from base_seed.
+    Hashing (rather than base_seed + index) keeps neighbouring batches from overlapping.
+    """
+    digest = hashlib.blake2b(f"{base_seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') >> 1
+
+def new_replay(agency, seed=None):
+    """The compact replay record stored in game_state['replay']: seed plus player actions."""
+    return {'version': REPLAY_VERSION, 'agency': agency, 'seed': new_seed() if seed is None else seed, 'actions': []}
+
+def game_rng(game_state):
+    """
+    The game's generator, created from its seed on first use.
+    A game loaded from disk restarts its stream from the seed; replay.py is what
+    reproduces a game exactly, by re-simulating it from the start.
+    """
+    rng = game_state.get('_rng')
+    if rng is None:
+        replay = game_state.setdefault('replay', new_replay(game_state['agency']))
+        rng = game_state['_rng'] = random.Random(replay['seed'])
+    return rng
+
+def policy_rng(game_state):
+    """
+    Separate generator for scripted player policies. Keeping policy draws off the game's
+    own stream means replaying the recorded actions reproduces the game exactly.
+    """
+    rng = game_state.get('_policy_rng')
+    if rng is None:
+        replay = game_state.setdefault('replay', new_replay(game_state['agency']))
+        rng = game_state['_policy_rng'] = random.Random(derive_seed(replay['seed'], 'policy'))
+    return rng
+
+def record_action(game_state, action):
+    """Appends a player action, tagged with the current turn, to the replay record."""
+    replay = game_state.setdefault('replay', new_replay(game_state['agency']))
+    replay['actions'].append([game_state['turn'], *action])
@@ -0,0 +1,417 @@
+"""
+Multi-session game server.
+One asyncio process hosts many concurrent games over a line-based JSON protocol.
+Every session has its own lock, so requests for one game run one at a time while
+other games carry on. End-of-turn processing (rival AI, events, rewards) runs in a
+thread pool so the event loop keeps answering cheap requests while turns are computed.
+
+At most max_live games are kept in memory. The least recently used idle game is
+evicted to a binary snapshot (see snapshot.py) and loaded back on its next request,
+random streams and MCTS rivals' search trees included, so eviction doesn't change how a
+game plays out. (An MCTS rival searching to a time budget rather than a fixed number of
+iterations isn't reproducible in the first place, evicted or not.)
+
+Protocol: one JSON object per line each way.
+    {"op": "new", "agency": "CIA", "seed": 1}             -> {"ok": true, "session": "..."}
+    {"op": "action", "session": "...", "action": [...]}    -> {"ok": ..., "message": "...", "changes": {...}}
+    {"op": "end_turn", "session": "..."}                   -> {"ok": true, "outcome": ..., "message": "...", "changes": {...}}
+    {"op": "state", "session": "..."}                      -> {"ok": true, "state": {...}}
+    {"op": "close", "session": "..."}                      -> {"ok": true}
+Errors come back as {"ok": false, "error": "..."}. "changes" is what the request changed
+(changes.ChangeSet.to_dict()), so a client can keep its copy of the game current with
+changes.apply_changes instead of asking for the state again. "new" may pass
+"rival_ai": {"name": "mcts", "budget_ms": 20}, within the MAX_RIVAL_* limits.
+
+Usage:
+    python server.py serve --port 8765 --max-live 500
+    python server.py load --sessions 2000 --turns 5      (in-process server plus stand-in clients)
+"""
+import argparse
+import asyncio
+import json
+import os
+import pickle
+import random
+import statistics
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import changes
+import engine
+import gamedata
+import main
+import operations
+import snapshot
+
+HOST = '127.0.0.1'
+PORT = 8765
+SESSION_DIR = os.path.join('save', 'sessions')
+MAX_LIVE_SESSIONS = 500
+TURN_WORKERS = 4
+
+# Client lines longer than this are rejected instead of buffered
+MAX_LINE = 64 * 1024
+
+# Most search a client may ask of the MCTS rival AI (see mcts.planner); every session
+# shares the server's cores, so searches stay short and in-process
+MAX_RIVAL_BUDGET_MS = 50
+MAX_RIVAL_ITERATIONS = 2000
+MAX_RIVAL_WORKERS = 1
+RIVAL_AI_NAMES = ('greedy', 'mcts')
+
+# Random streams saved with an evicted game (game_state keys, see seeding.py)
+RNG_KEYS = ('_rng', '_policy_rng')
+# MCTS rivals' trees and random streams (see mcts.planner), saved next to the snapshot
+SEARCH_KEY = '_rival_search'
+
+STATE_KEYS = ('turn', 'budget', 'political_capital', 'research_points', 'visibility', 'agents', 'agents_used')
+
+class SessionError(Exception):
+    pass
+
+def check_rival_ai(rival_ai):
+    """A client's rival_ai settings, refused if they ask for more search than the server allows."""
+    if rival_ai is None:
+        return None
+    if not isinstance(rival_ai, dict) or rival_ai.get('name') not in RIVAL_AI_NAMES:
+        raise SessionError(f"rival_ai must be an object with a name in {RIVAL_AI_NAMES}")
+    limits = {'budget_ms': MAX_RIVAL_BUDGET_MS, 'iterations': MAX_RIVAL_ITERATIONS, 'workers': MAX_RIVAL_WORKERS}
+    for key, value in rival_ai.items():
+        if key == 'name':
+            continue
+        if key not in limits:
+            raise SessionError(f"Unknown rival_ai setting: {key}")
+        if type(value) is not int or not 1 <= value <= limits[key]:
+            raise SessionError(f"rival_ai {key} must be an integer from 1 to {limits[key]}")
+    return dict(rival_ai)
+
+class SessionManager:
+    """
+    Owns every session: the live game_states in LRU order, the ids of evicted ones
+    and one asyncio.Lock per session. All public methods are coroutines.
+    """
+    def __init__(self, directory=SESSION_DIR, max_live=MAX_LIVE_SESSIONS, workers=TURN_WORKERS):
+        self.directory = directory
+        self.max_live = max_live
+        self.live = OrderedDict()
+        self.evicted = set()
+        self.locks = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="turns")
+        self.evictions = 0
+        self.loads = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, session_id):
+        return os.path.join(self.directory, f"{session_id}.snap")
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    # --------------------------------------------------
+    # Session lifecycle
+    # --------------------------------------------------
+    async def new(self, agency=None, seed=None, rival_ai=None):
+        if agency is not None and agency not in gamedata.agencies():
+            raise SessionError(f"Unknown agency: {agency}")
+        rival_ai = check_rival_ai(rival_ai)
+        session_id = uuid.uuid4().hex
+        self.locks[session_id] = asyncio.Lock()
+        async with self.locks[session_id]:
+            self.live[session_id] = main.initialize_game(agency, seed=seed, rival_ai=rival_ai)
+        await self._evict_idle()
+        return session_id
+
+    async def close(self, session_id):
+        # Taking the lock out of self.locks first makes a second close (or any later request) an
+        # unknown session; requests already waiting on the lock still finish before the cleanup.
+        lock = self.locks.pop(session_id, None)
+        if lock is None:
+            raise SessionError(f"Unknown session: {session_id}")
+        async with lock:
+            self.live.pop(session_id, None)
+            if session_id in self.evicted:
+                self.evicted.discard(session_id)
+                os.remove(self.path(session_id))
+                if os.path.exists(search_path(self.path(session_id))):
+                    os.remove(search_path(self.path(session_id)))
+
+    def _lock(self, session_id):
+        lock = self.locks.get(session_id)
+        if lock is None:
+            raise SessionError(f"Unknown session: {session_id}")
+        return lock
+
+    async def _game(self, session_id):
+        """The session's game_state, loaded back from disk if it was evicted. Call with its lock held."""
+        game_state = self.live.get(session_id)
+        if game_state is not None:
+            self.live.move_to_end(session_id)
+            return game_state
+        if session_id not in self.evicted:
+            raise SessionError(f"Unknown session: {session_id}")
+        game_state = await self._run(load_session, self.path(session_id))
+        self.evicted.discard(session_id)
+        self.live[session_id] = game_state
+        self.loads += 1
+        return game_state
+
+    async def _evict_idle(self):
+        """Writes the least recently used idle games to disk until at most max_live remain."""
+        while len(self.live) > self.max_live:
+            victim = next((session_id for session_id in self.live
+                           if session_id in self.locks and not self.locks[session_id].locked()), None)
+            if victim is None:
+                return  # every live game is busy or closing; try again after the next request
+            async with self.locks[victim]:
+                game_state = self.live.pop(victim, None)
+                if game_state is None:
+                    continue
+                await self._run(save_session, game_state, self.path(victim))
+                self.evicted.add(victim)
+                self.evictions += 1
+
+    # --------------------------------------------------
+    # Game requests
+    # --------------------------------------------------
+    async def action(self, session_id, action):
+        """Returns (ok, message, changes): changes is the action's changes.ChangeSet.to_dict()."""
+        async with self._lock(session_id):
+            game_state = await self._game(session_id)
+            tracker = changes.track(game_state)
+            ok, msg = engine.apply_action(game_state, tuple(action) if isinstance(action, list) else action)
+            changed = tracker.take().to_dict()
+        await self._evict_idle()
+        return ok, msg, changed
+
+    async def end_turn(self, session_id):
+        """Returns (outcome, message, changes), like action()."""
+        async with self._lock(session_id):
+            game_state = await self._game(session_id)
+            tracker = changes.track(game_state)
+            outcome, msg = await self._run(engine.end_turn, game_state)
+            changed = tracker.take().to_dict()
+        await self._evict_idle()
+        return outcome, msg, changed
+
+    async def state(self, session_id):
+        async with self._lock(session_id):
+            game_state = await self._game(session_id)
+            values = {key: game_state[key] for key in STATE_KEYS}
+        await self._evict_idle()
+        return values
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+def search_path(path):
+    return os.path.splitext(path)[0] + '.search'
+
+def save_session(game_state, path):
+    """
+    Snapshot of an evicted game, with its random streams' positions stored in the meta.
+    MCTS rivals' searches (trees and random streams) are pickled to search_path(path).
+    """
+    state = dict(game_state)
+    state['rng_state'] = {key: list_state(game_state[key].getstate()) for key in RNG_KEYS if key in game_state}
+    if game_state.get(SEARCH_KEY):
+        with open(search_path(path), 'wb') as file:
+            pickle.dump(game_state[SEARCH_KEY], file, protocol=pickle.HIGHEST_PROTOCOL)
+    snapshot.save_snapshot(state, path)
+
+def load_session(path):
+    game_state = snapshot.load_snapshot(path)
+    for key, rng_state in game_state.pop('rng_state', {}).items():
+        rng = game_state[key] = random.Random()
+        rng.setstate((rng_state[0], tuple(rng_state[1]), rng_state[2]))
+    os.remove(path)
+    if os.path.exists(search_path(path)):
+        # Written by save_session on this server, never by a client
+        with open(search_path(path), 'rb') as file:
+            game_state[SEARCH_KEY] = pickle.load(file)
+        os.remove(search_path(path))
+    return game_state
+
+def list_state(rng_state):
+    version, internal, gauss = rng_state
+    return [version, list(internal), gauss]
+
+# --------------------------------------------------
+# Protocol
+# --------------------------------------------------
+async def handle_request(manager, request):
+    op = request.get('op')
+    if op == 'new':
+        session_id = await manager.new(request.get('agency'), request.get('seed'), request.get('rival_ai'))
+        return {'ok': True, 'session': session_id}
+    if op == 'action':
+        ok, msg, changed = await manager.action(request['session'], request['action'])
+        return {'ok': ok, 'message': msg, 'changes': changed}
+    if op == 'end_turn':
+        outcome, msg, changed = await manager.end_turn(request['session'])
+        return {'ok': True, 'outcome': outcome, 'message': msg, 'changes': changed}
+    if op == 'state':
+        return {'ok': True, 'state': await manager.state(request['session'])}
+    if op == 'close':
+        await manager.close(request['session'])
+        return {'ok': True}
+    raise SessionError(f"Unknown op: {op}")
+
+async def handle_client(manager, reader, writer):
+    """Serves one connection; its requests are answered in order."""
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                break  # line longer than MAX_LINE
+            if not line:
+                break
+            try:
+                response = await handle_request(manager, json.loads(line))
+            except SessionError as e:
+                response = {'ok': False, 'error': str(e)}
+            except Exception as e:
+                # A malformed request gets an error reply; it never takes the connection down
+                response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+            writer.write(json.dumps(response, separators=(',', ':')).encode() + b'\n')
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def start_server(manager, host=HOST, port=PORT):
+    return await asyncio.start_server(lambda reader, writer: handle_client(manager, reader, writer),
+                                      host, port, limit=MAX_LINE)
+
+# --------------------------------------------------
+# Stand-in client and load test
+# --------------------------------------------------
+class Client:
+    """Minimal client for one connection; requests on it are sent one at a time."""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.lock = asyncio.Lock()
+        self.latencies = []
+
+    @classmethod
+    async def connect(cls, host=HOST, port=PORT):
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+        return cls(reader, writer)
+
+    async def request(self, **request):
+        async with self.lock:
+            start = time.perf_counter()
+            self.writer.write(json.dumps(request).encode() + b'\n')
+            await self.writer.drain()
+            response = json.loads(await self.reader.readline())
+            self.latencies.append((request['op'], time.perf_counter() - start))
+        return response
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+async def play_session(client, rng, turns, agency):
+    """Plays `turns` turns of one game: a random affordable operation per agent, then end turn."""
+    session = (await client.request(op='new', agency=agency, seed=rng.getrandbits(32)))['session']
+    countries = list(gamedata.countries())
+    # Kept current from each response's changes rather than re-requested
+    state = (await client.request(op='state', session=session))['state']
+    for _ in range(turns):
+        for _ in range(state['agents'] - state['agents_used']):
+            affordable = [op.name for op in operations.CATALOG.player.affordable(state['budget'], state['political_capital'])]
+            if not affordable:
+                break
+            response = await client.request(op='action', session=session,
+                                            action=['operation', rng.choice(affordable), rng.choice(countries)])
+            sync(state, response['changes'])
+        response = await client.request(op='end_turn', session=session)
+        if response['outcome']:
+            break
+        sync(state, response['changes'])
+    await client.request(op='close', session=session)
+
+def sync(state, changed):
+    """Applies a response's changes to a client's STATE_KEYS copy."""
+    for key, (_, new) in changed['fields'].items():
+        if key in state:
+            state[key] = new
+
+async def load_test(sessions=1000, turns=5, connections=50, max_live=MAX_LIVE_SESSIONS,
+                    workers=TURN_WORKERS, seed=0, directory=SESSION_DIR):
+    """Runs an in-process server and plays `sessions` games against it; returns latency stats (ms)."""
+    manager = SessionManager(directory, max_live, workers)
+    server = await start_server(manager, port=0)
+    port = server.sockets[0].getsockname()[1]
+    clients = [await Client.connect(port=port) for _ in range(connections)]
+    agencies = gamedata.agency_names()
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(play_session(clients[i % connections], random.Random(rng.getrandbits(63)),
+                                            turns, agencies[i % len(agencies)])
+                               for i in range(sessions)))
+    finally:
+        for client in clients:
+            await client.close()
+        server.close()
+        await server.wait_closed()
+        manager.shutdown()
+    elapsed = time.perf_counter() - start
+
+    by_op = {}
+    for client in clients:
+        for op, seconds in client.latencies:
+            by_op.setdefault(op, []).append(seconds * 1000)
+    report = {'sessions': sessions, 'seconds': elapsed, 'evictions': manager.evictions, 'loads': manager.loads}
+    for op, values in sorted(by_op.items()):
+        values.sort()
+        report[op] = {'count': len(values), 'p50_ms': statistics.median(values),
+                      'p99_ms': values[min(len(values) - 1, int(len(values) * 0.99))]}
+    return report
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Host many Deep State games over a JSON-lines socket.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help="Run the server.")
+    serve.add_argument('--host', default=HOST)
+    serve.add_argument('--port', type=int, default=PORT)
+    load = sub.add_parser('load', help="Play many games against an in-process server and report latency.")
+    load.add_argument('--sessions', type=int, default=1000)
+    load.add_argument('--turns', type=int, default=5)
+    load.add_argument('--connections', type=int, default=50)
+    load.add_argument('--seed', type=int, default=0)
+    for command in (serve, load):
+        command.add_argument('--max-live', type=int, default=MAX_LIVE_SESSIONS, help="Games kept in memory.")
+        command.add_argument('--workers', type=int, default=TURN_WORKERS, help="Threads computing turns.")
+        command.add_argument('--dir', default=SESSION_DIR, help="Where evicted games are written.")
+    args = parser.parse_args(argv)
+
+    if args.command == 'load':
+        report = asyncio.run(load_test(args.sessions, args.turns, args.connections, args.max_live,
+                                       args.workers, args.seed, args.dir))
+        print(f"{report['sessions']} sessions in {report['seconds']:.1f}s, "
+              f"{report['evictions']} evictions, {report['loads']} loads")
+        for op in ('new', 'state', 'action', 'end_turn'):
+            if op in report:
+                stats = report[op]
+                print(f"{op:<10}{stats['count']:>8}  p50 {stats['p50_ms']:7.2f} ms  p99 {stats['p99_ms']:7.2f} ms")
+        return
+
+    async def serve_forever():
+        manager = SessionManager(args.dir, args.max_live, args.workers)
+        server = await start_server(manager, args.host, args.port)
+        print(f"Serving on {args.host}:{args.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            manager.shutdown()
+    asyncio.run(serve_forever())
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,200 @@
+"""
+Monte Carlo batch runner.
+Plays many complete headless games with a scripted player policy, spread across
+worker processes, and reports win/loss/exposure rates and turns-to-outcome.
+
+Usage: python simulate.py --games 1000 --policy greedy --workers 4
+"""
+import argparse
+import statistics
+
+import engine
+import gamedata
+import main
+import operations
+import seeding
+
+OUTCOMES = ['win', 'exposed', 'timeout']
+
+# --------------------------------------------------
+# Scripted player policies
+# Each policy looks at the game_state and returns the next action, or None to end the turn.
+# --------------------------------------------------
+# Greedy policy stops operating once a failed op could take visibility past this
+SAFE_VISIBILITY = 70
+
+def idle_policy(game_state):
+    """Never acts; only useful as a baseline."""
+    return None
+
+def random_policy(game_state):
+    """Spends every agent on a random affordable operation in a random country."""
+    if game_state['agents_used'] >= game_state['agents']:
+        return None
+    affordable_ops = operations.CATALOG.player.affordable(game_state['budget'], game_state['political_capital'])
+    if not affordable_ops:
+        return None
+    rng = seeding.policy_rng(game_state)
+    return ("operation", rng.choice(affordable_ops).name, rng.choice(list(game_state['countries'])))
+
+def greedy_policy(game_state):
+    """
+    Researches stealth when exposure gets high, recruits agents when rich,
+    then pushes the affordable operation with the best influence gain into the
+    country closest to the 80% control mark, as long as a failure wouldn't
+    push visibility past the safety margin.
+    """
+    if game_state['visibility'] >= 60:
+        available_techs = main.research_technology(game_state)
+        affordable = [(data['visibility_reduction'], name) for name, data in available_techs.items()
+                      if data['cost'] <= game_state['research_points']]
+        if affordable:
+            return ("research", max(affordable)[1])
+
+    if game_state['budget'] >= 400 and game_state['political_capital'] >= 80:
+        return ("buy_agent",)
+
+    if game_state['agents_used'] >= game_state['agents']:
+        return None
+
+    affordable_ops = [
+        (op.influence_gain, op.name) for op in operations.CATALOG.player
+        if op.influence_gain > 0
+        and game_state['visibility'] + op.visibility_increase * 2 < SAFE_VISIBILITY
+        and op.affordable(game_state['budget'], game_state['political_capital'])
+    ]
+    if not affordable_ops:
+        return None
+
+    agency = game_state['agency']
+    candidates = [(data['influence'].get(agency, 0), country)
+                  for country, data in game_state['countries'].items()
+                  if data['influence'].get(agency, 0) < 80]
+    if not candidates:
+        return None
+    return ("operation", max(affordable_ops)[1], max(candidates)[1])
+
+POLICIES = {
+    'idle': idle_policy,
+    'random': random_policy,
+    'greedy': greedy_policy,
+}
+
+# --------------------------------------------------
+# Batch running
+# --------------------------------------------------
+def run_game(job, writer=None, sample_every=0):
+    """
+    Plays one game. job is (agency, policy_name, max_turns, seed, array_world); returns a result dict.
+    With a resultstore.ResultsWriter the game is recorded there, plus every sample_every-th turn.
+    """
+    agency, policy_name, max_turns, seed, array_world = job
+    game_state = main.initialize_game(agency, array_world=array_world, seed=seed)
+    on_turn = None
+    if writer and sample_every:
+        def on_turn(game_state):
+            if game_state['turn'] % sample_every == 0:
+                writer.add_turn(game_state)
+    outcome, turns, msg = engine.play_game(game_state, POLICIES[policy_name], max_turns=max_turns,
+                                           on_turn=on_turn)
+    result = {'agency': agency, 'policy': policy_name, 'seed': seed,
+              'outcome': outcome, 'turns': turns, 'message': msg}
+    if writer:
+        writer.add_game(result, game_state)
+    return result
+
+def run_recorded(task):
+    """Plays a list of jobs into one new shard of a results directory. task is (jobs, directory, sample_every)."""
+    import resultstore
+    jobs, directory, sample_every = task
+    with resultstore.ResultsWriter.in_directory(directory) as writer:
+        return [run_game(job, writer, sample_every) for job in jobs]
+
+def run_batch(games, policy='greedy', agencies=None, max_turns=200, workers=None, seed=0,
+              array_world=False, results_dir=None, sample_every=0):
+    """
+    Plays `games` games across a process pool and returns their result dicts.
+    Agencies are rotated through `agencies` (every registered agency by default); game i gets
+    seeding.derive_seed(seed, i), which its result records so it can be replayed.
+    With results_dir, every game (and every sample_every-th turn) is also written there as
+    resultstore shards, one per chunk of games.
+    """
+    agencies = agencies or gamedata.agency_names()
+    jobs = [(agencies[i % len(agencies)], policy, max_turns, seeding.derive_seed(seed, i), array_world)
+            for i in range(games)]
+    if workers == 1:
+        if results_dir:
+            return run_recorded((jobs, results_dir, sample_every))
+        return [run_game(job) for job in jobs]
+
+    # Imported here: concurrent.futures.process is slow to import and single-process runs never need it
+    from concurrent.futures import ProcessPoolExecutor
+    chunksize = max(1, games // ((workers or 1) * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if results_dir:
+            tasks = [(jobs[i:i + chunksize], results_dir, sample_every) for i in range(0, games, chunksize)]
+            return [result for results in pool.map(run_recorded, tasks) for result in results]
+        return list(pool.map(run_game, jobs, chunksize=chunksize))
+
+def summarize(results):
+    """Aggregates results into outcome rates and turns-to-outcome stats (overall and per agency)."""
+    def stats(rows):
+        summary = {'games': len(rows)}
+        for outcome in OUTCOMES:
+            turns = [r['turns'] for r in rows if r['outcome'] == outcome]
+            summary[outcome] = {
+                'rate': len(turns) / len(rows) if rows else 0.0,
+                'mean_turns': statistics.mean(turns) if turns else None,
+                'median_turns': statistics.median(turns) if turns else None,
+            }
+        # Anything that isn't a win counts as a loss
+        summary['loss_rate'] = 1.0 - summary['win']['rate']
+        return summary
+
+    by_agency = {}
+    for r in results:
+        by_agency.setdefault(r['agency'], []).append(r)
+    return {'overall': stats(results),
+            'by_agency': {agency: stats(rows) for agency, rows in by_agency.items()}}
+
+def format_summary(summary):
+    """Returns the summary as a printable table."""
+    lines = [f"{'Agency':<10}{'Games':>7}{'Win%':>8}{'Exposed%':>10}{'Timeout%':>10}{'Loss%':>8}"
+             f"{'WinTurns':>10}{'ExpTurns':>10}"]
+
+    def row(name, s):
+        def turns(outcome):
+            value = s[outcome]['mean_turns']
+            return f"{value:.1f}" if value is not None else "-"
+        return (f"{name:<10}{s['games']:>7}"
+                f"{s['win']['rate'] * 100:>8.1f}{s['exposed']['rate'] * 100:>10.1f}"
+                f"{s['timeout']['rate'] * 100:>10.1f}{s['loss_rate'] * 100:>8.1f}"
+                f"{turns('win'):>10}{turns('exposed'):>10}")
+
+    for agency, s in sorted(summary['by_agency'].items()):
+        lines.append(row(agency, s))
+    lines.append(row("ALL", summary['overall']))
+    return "\n".join(lines)
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Run many headless Deep State games.")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='greedy')
+    parser.add_argument('--agency', action='append',
+                        help="Agency to play (repeatable). Defaults to rotating through all of them.")
+    parser.add_argument('--max-turns', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--arrays', action='store_true', help="Use the NumPy array-backed world.")
+    parser.add_argument('--results', help="Also write every game to this directory as columnar shards (see resultstore.py).")
+    parser.add_argument('--sample-every', type=int, default=0,
+                        help="With --results, also record every Nth turn of every game.")
+    args = parser.parse_args(argv)
+
+    results = run_batch(args.games, policy=args.policy, agencies=args.agency,
+                        max_turns=args.max_turns, workers=args.workers, seed=args.seed,
+                        array_world=args.arrays, results_dir=args.results, sample_every=args.sample_every)
+    print(format_summary(summarize(results)))
+
+if __name__ == "__main__":
+    main_cli()
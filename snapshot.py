@@ -0,0 +1,341 @@
+"""
+Compact binary save snapshots.
+
+Layout (little-endian):
+    header      magic, version, counts and section offsets (HEADER)
+    columns     one int32 column per COUNTRY_FIELDS entry, n_countries values each
+    influence   int32 matrix, n_countries x n_agencies, row-major
+    strings     uint32 offsets (n_strings + 1) followed by a UTF-8 blob; country names then agency names
+    meta        JSON with everything that isn't per-country numbers (turn, budgets, ai_resources, ...)
+
+Missing fields/influence entries are stored as ABSENT, so loading gives back exactly the
+dicts that were saved. SnapshotView maps the file with mmap and reads columns, rows and
+names on demand without parsing the rest of the file.
+
+Run `python snapshot.py` for a size / load-time comparison against JSON saves.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b'DSSNAP\x00\x01'
+VERSION = 1
+HEADER = struct.Struct('<8sIIIIQQQQ')
+HEADER_SIZE = 64  # HEADER padded so the int32 columns start aligned
+COUNTRY_FIELDS = ('stability', 'populism_risk', 'budget_reward', 'capital_reward')
+ABSENT = -2**31
+DEFAULT_KEY_ORDER = ('stability', 'influence') + COUNTRY_FIELDS[1:]
+
+def is_snapshot(path):
+    with open(path, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+def _int32s(values):
+    column = array('i', values)
+    if sys.byteorder != 'little':
+        column.byteswap()
+    return column
+
+def _string_table(strings):
+    blobs = [s.encode('utf-8') for s in strings]
+    offsets = array('I', [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+    return offsets.tobytes() + b''.join(blobs)
+
+def save_snapshot(game_state, path):
+    """Writes game_state as a binary snapshot (temp file + rename)."""
+    countries = game_state['countries']
+    names = list(countries)
+    agencies = list(getattr(countries, 'agencies', ()))
+    for data in countries.values():
+        for agency in data['influence']:
+            if agency not in agencies:
+                agencies.append(agency)
+    agency_index = {agency: j for j, agency in enumerate(agencies)}
+
+    columns = {field: [] for field in COUNTRY_FIELDS}
+    influence = [ABSENT] * (len(names) * len(agencies))
+    irregular = {}
+    key_order = tuple(next(iter(countries.values()))) if names else DEFAULT_KEY_ORDER
+    for i, data in enumerate(countries.values()):
+        for field in COUNTRY_FIELDS:
+            if field not in data:
+                columns[field].append(ABSENT)
+                continue
+            value = data[field]
+            # ABSENT itself is reserved for missing fields
+            if type(value) is not int or not ABSENT < value < 2**31:
+                raise ValueError(f"{names[i]}: {field}={value!r} doesn't fit an int32 column")
+            columns[field].append(value)
+        base = i * len(agencies)
+        for agency, value in data['influence'].items():
+            if type(value) is not int or not ABSENT < value < 2**31:
+                raise ValueError(f"{names[i]}: influence {agency}={value!r} doesn't fit an int32 column")
+            influence[base + agency_index[agency]] = value
+        extra = {key: value for key, value in data.items() if key != 'influence' and key not in COUNTRY_FIELDS}
+        if extra or tuple(data) != key_order:
+            irregular[names[i]] = [list(data), extra]
+
+    from records import json_default
+    meta = {key: value for key, value in game_state.items() if key != 'countries' and not key.startswith('_')}
+    meta_blob = json.dumps({'state': meta, 'key_order': list(key_order), 'irregular': irregular},
+                           separators=(',', ':'), default=json_default).encode('utf-8')
+    column_blob = b''.join(_int32s(columns[field]).tobytes() for field in COUNTRY_FIELDS)
+    influence_blob = _int32s(influence).tobytes()
+    strings_blob = _string_table(names + agencies)
+
+    strings_offset = HEADER_SIZE + len(column_blob) + len(influence_blob)
+    meta_offset = strings_offset + len(strings_blob)
+    header = HEADER.pack(MAGIC, VERSION, len(names), len(agencies), len(COUNTRY_FIELDS),
+                         strings_offset, len(strings_blob), meta_offset, len(meta_blob))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(header.ljust(HEADER_SIZE, b'\0'))
+        file.write(column_blob)
+        file.write(influence_blob)
+        file.write(strings_blob)
+        file.write(meta_blob)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+class SnapshotView:
+    """Read-only, lazily decoded view of a snapshot file backed by mmap."""
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        (magic, version, self.n_countries, self.n_agencies, n_columns,
+         self._strings_offset, self._strings_len, self._meta_offset, self._meta_len) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} snapshot")
+        self._meta = None
+        self._agencies = None
+        n_strings = self.n_countries + self.n_agencies
+        self._offsets = self._ints(self._strings_offset, n_strings + 1, 'I')
+        self._blob_start = self._strings_offset + 4 * (n_strings + 1)
+
+    def _ints(self, offset, count, typecode='i'):
+        view = self._buffer[offset:offset + 4 * count].cast(typecode)
+        if sys.byteorder != 'little':
+            swapped = array(typecode, view)
+            swapped.byteswap()
+            return swapped
+        return view
+
+    def close(self):
+        self._offsets = None
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --------------------------------------------------
+    # Lazy accessors
+    # --------------------------------------------------
+    def string(self, k):
+        start, end = self._offsets[k], self._offsets[k + 1]
+        return bytes(self._buffer[self._blob_start + start:self._blob_start + end]).decode('utf-8')
+
+    def country_name(self, i):
+        return self.string(i)
+
+    def country_names(self):
+        return [self.string(i) for i in range(self.n_countries)]
+
+    @property
+    def agencies(self):
+        if self._agencies is None:
+            self._agencies = [self.string(self.n_countries + j) for j in range(self.n_agencies)]
+        return self._agencies
+
+    def column(self, field):
+        """Zero-copy int32 view of one per-country column (ABSENT where missing)."""
+        k = COUNTRY_FIELDS.index(field)
+        return self._ints(HEADER_SIZE + 4 * k * self.n_countries, self.n_countries)
+
+    def influence_row(self, i):
+        """{agency: influence} for country i."""
+        offset = HEADER_SIZE + 4 * (len(COUNTRY_FIELDS) * self.n_countries + i * self.n_agencies)
+        row = self._ints(offset, self.n_agencies)
+        return {agency: row[j] for j, agency in enumerate(self.agencies) if row[j] != ABSENT}
+
+    def influence_matrix(self):
+        """Zero-copy flat int32 view of the whole influence matrix."""
+        offset = HEADER_SIZE + 4 * len(COUNTRY_FIELDS) * self.n_countries
+        return self._ints(offset, self.n_countries * self.n_agencies)
+
+    def meta(self):
+        if self._meta is None:
+            blob = bytes(self._buffer[self._meta_offset:self._meta_offset + self._meta_len])
+            self._meta = json.loads(blob)
+        return self._meta
+
+    # --------------------------------------------------
+    # Full load
+    # --------------------------------------------------
+    def to_state(self, array_world=False, compact=False):
+        """
+        Decodes everything into a regular game_state dict.
+        With array_world=True the countries come back as a world.ArrayWorld built
+        straight from the mapped columns (needs NumPy), skipping the per-country dicts;
+        compact=True does the same with a records.CompactCountries.
+        """
+        from records import agency_records
+        if array_world or compact:
+            state = dict(self.meta()['state'])
+            state['ai_resources'] = agency_records(state['ai_resources'])
+            state['countries'] = self.to_array_world() if array_world else self.to_compact_countries()
+            return state
+
+        meta = self.meta()
+        key_order = meta['key_order']
+        irregular = meta['irregular']
+        columns = {field: self.column(field).tolist() for field in COUNTRY_FIELDS}
+        matrix = self.influence_matrix().tolist()
+        agencies = self.agencies
+        n_agencies = self.n_agencies
+
+        countries = {}
+        for i, name in enumerate(self.country_names()):
+            keys, extra = irregular.get(name, (key_order, {}))
+            row = matrix[i * n_agencies:(i + 1) * n_agencies]
+            data = {}
+            for key in keys:
+                if key == 'influence':
+                    data['influence'] = {agency: value for agency, value in zip(agencies, row) if value != ABSENT}
+                elif key in columns:
+                    value = columns[key][i]
+                    if value != ABSENT:
+                        data[key] = value
+                else:
+                    data[key] = extra[key]
+            countries[name] = data
+
+        state = dict(meta['state'])
+        state['ai_resources'] = agency_records(state['ai_resources'])
+        state['countries'] = countries
+        return state
+
+    def to_array_world(self):
+        import numpy as np
+        import world
+
+        n, m = self.n_countries, self.n_agencies
+        ints = np.dtype('<i4')
+        columns = {}
+        field_present = {}
+        for k, field in enumerate(COUNTRY_FIELDS):
+            raw = np.frombuffer(self._mmap, dtype=ints, count=n, offset=HEADER_SIZE + 4 * k * n)
+            columns[field] = raw.astype(np.int64)
+            field_present[field] = raw != ABSENT
+        offset = HEADER_SIZE + 4 * len(COUNTRY_FIELDS) * n
+        raw = np.frombuffer(self._mmap, dtype=ints, count=n * m, offset=offset).reshape(n, m)
+        influence_present = raw != ABSENT
+        influence = np.where(influence_present, raw, 0).astype(np.int64)
+
+        meta = self.meta()
+        extras = {name: (tuple(keys), extra) for name, (keys, extra) in meta['irregular'].items()}
+        return world.ArrayWorld(self.country_names(), self.agencies, influence, columns,
+                                influence_present, field_present, tuple(meta['key_order']), extras)
+
+    def to_compact_countries(self):
+        from records import CompactCountries
+
+        columns = {field: array('i', self.column(field)) for field in COUNTRY_FIELDS}
+        meta = self.meta()
+        extras = {name: (tuple(keys), extra) for name, (keys, extra) in meta['irregular'].items()}
+        return CompactCountries(self.country_names(), self.agencies, array('i', self.influence_matrix()),
+                                columns, tuple(meta['key_order']), extras)
+
+def load_snapshot(path, array_world=False, compact=False):
+    with SnapshotView(path) as view:
+        return view.to_state(array_world=array_world, compact=compact)
+
+# --------------------------------------------------
+# Size / load-time report
+# --------------------------------------------------
+def _synthetic_state(n_countries):
+    import random
+    import main
+    rng = random.Random(n_countries)
+    state = main.initialize_game('CIA')
+    base = list(state['countries'].values())
+    state['countries'] = {
+        f"Country {i}": {
+            'stability': rng.randint(20, 100),
+            'influence': {agency: rng.randint(0, 100) for agency in base[i % len(base)]['influence']},
+            'populism_risk': rng.randint(0, 80),
+            'budget_reward': rng.randint(0, 25),
+            'capital_reward': rng.randint(0, 10),
+        } for i in range(n_countries)
+    }
+    return state
+
+def report(sizes=(10_000, 100_000)):
+    """Prints snapshot vs JSON size and load times for synthetic worlds of the given sizes.
+
+    The files are written to a temporary directory and removed afterwards.
+    """
+    import tempfile
+    import time
+    from records import json_default
+
+    def timed(func):
+        start = time.perf_counter()
+        result = func()
+        return result, (time.perf_counter() - start) * 1000
+
+    try:
+        import numpy  # noqa: F401
+        has_numpy = True
+    except ImportError:
+        has_numpy = False
+
+    print(f"{'Countries':>10}{'JSON MB':>10}{'Snap MB':>10}{'JSON load ms':>14}{'Snap load ms':>14}"
+          f"{'Snap->arrays ms':>17}{'mmap col ms':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            state = _synthetic_state(n)
+            json_path = os.path.join(tmp, 'save.json')
+            snap_path = os.path.join(tmp, 'save.snap')
+            with open(json_path, 'w') as file:
+                json.dump(state, file, indent=4, default=json_default)
+            save_snapshot(state, snap_path)
+
+            def load_json():
+                with open(json_path) as file:
+                    return json.load(file)
+            loaded_json, json_ms = timed(load_json)
+            loaded_snap, snap_ms = timed(lambda: load_snapshot(snap_path))
+            assert loaded_json == loaded_snap
+
+            def scan_column():
+                with SnapshotView(snap_path) as view:
+                    return sum(view.column('stability'))
+            _, column_ms = timed(scan_column)
+
+            arrays = "-"
+            if has_numpy:
+                _, arrays_ms = timed(lambda: load_snapshot(snap_path, array_world=True))
+                arrays = f"{arrays_ms:.1f}"
+
+            print(f"{n:>10}{os.path.getsize(json_path) / 1e6:>10.2f}{os.path.getsize(snap_path) / 1e6:>10.2f}"
+                  f"{json_ms:>14.1f}{snap_ms:>14.1f}{arrays:>17}{column_ms:>13.1f}")
+
+if __name__ == "__main__":
+    report()
@@ -0,0 +1,391 @@
+"""
+Balance sweeps.
+Plays simulated games for every configuration in a grid of balance parameters and
+prints the configurations ranked by win rate (or by closeness to a target win rate).
+
+A parameter is "<table>.<name>.<field>=<values>":
+    op.<operation>.<field>        operations.OPERATIONS (the player's operations)
+    ai_op.<operation>.<field>     operations.AI_OPERATIONS (the rivals')
+    agency.<agency>.<field>       data/agencies.json (main.get_starting_resources)
+    tech.<tech>.<field>           data/tech_tree.json
+<name> may be * for every entry of the table. <values> is a list ("0.4,0.5,0.6") or an
+inclusive range with a step ("20:60:10").
+
+Every configuration plays the same seeds (common random numbers), so differences between
+configurations come from the parameters rather than from luck. Games are played in
+rounds of --batch per configuration; after each round a configuration is dropped once it
+is decided:
+    without --target, when its paired win-rate difference to the current leader (same
+        seeds, so most of the noise cancels) is below zero;
+    with --target, when its win-rate interval lies wholly inside (accepted) or wholly
+        outside (rejected) target +- tolerance.
+The same games are checked again after every round, and the leader is picked after the
+fact, so each check uses a Bonferroni share of 1 - --confidence: split over the rounds that
+can be checked, and without --target also over the configurations the leader could be.
+That keeps the chance of dropping the best configuration (or of wrongly accepting or
+rejecting one) at most 1 - --confidence, up to the normal approximation of the intervals.
+
+Usage:
+    python sweep.py --param "op.Covert Ops.success_chance=0.5:0.8:0.1" \\
+                    --param "agency.*.budget=150,200,250" --games 2000 --workers 8
+"""
+import argparse
+import copy
+import itertools
+import json
+import math
+import os
+import shutil
+import statistics
+import tempfile
+
+import gamedata
+import operations
+import seeding
+import simulate
+
+TABLES = ('op', 'ai_op', 'agency', 'tech')
+# Data-file tables and the file each one edits
+DATA_FILES = {'agency': 'agencies.json', 'tech': 'tech_tree.json'}
+
+DEFAULT_BATCH = 100
+DEFAULT_CONFIDENCE = 0.99
+DEFAULT_TOLERANCE = 0.05
+# Rounds played by every configuration before any is dropped
+MIN_ROUNDS = 2
+
+# --------------------------------------------------
+# Parameters and configurations
+# --------------------------------------------------
+def parse_number(text):
+    value = float(text)
+    return int(value) if value.is_integer() and '.' not in text and 'e' not in text.lower() else value
+
+def parse_values(text):
+    """'a,b,c' -> [a, b, c]; 'low:high:step' -> low, low + step, ... up to high inclusive."""
+    if ':' in text:
+        low, high, step = (parse_number(part) for part in text.split(':'))
+        if step <= 0 or high < low:
+            raise ValueError(f"Bad range {text!r}")
+        count = int(math.floor((high - low) / step + 1e-9)) + 1
+        values = [low + i * step for i in range(count)]
+        if all(isinstance(value, int) for value in (low, step)):
+            return values
+        return [round(value, 10) for value in values]
+    return [parse_number(part) for part in text.split(',') if part.strip()]
+
+def table_fields(table, entries, name):
+    """The fields a parameter may set on entry `name` of a table (on every entry for *)."""
+    if table in ('op', 'ai_op'):
+        # Operations read every effect, with missing ones as 0 (operations.Operation)
+        return set(operations.Operation.__slots__) - {'name'}
+    chosen = entries.values() if name == '*' else (entries[name],)
+    return set.intersection(*(set(entry) for entry in chosen))
+
+def parse_param(text):
+    """
+    'op.Covert Ops.success_chance=0.5,0.6' -> (('op', 'Covert Ops', 'success_chance'), [0.5, 0.6])
+    Raises argparse.ArgumentTypeError for unknown tables, entries or fields and bad values.
+    """
+    path, _, values = text.partition('=')
+    parts = path.split('.')
+    if len(parts) != 3 or parts[0] not in TABLES or not values:
+        raise argparse.ArgumentTypeError(
+            f"Bad parameter {text!r} (expected <{'|'.join(TABLES)}>.<name>.<field>=<values>)")
+    table, name, field = parts
+    entries = base_table(table)
+    if name != '*' and name not in entries:
+        raise argparse.ArgumentTypeError(f"{table}: no entry named {name!r}")
+    fields = table_fields(table, entries, name)
+    if field not in fields:
+        raise argparse.ArgumentTypeError(f"{table}.{name}: no field named {field!r} "
+                                         f"(one of {', '.join(sorted(fields))})")
+    try:
+        return (table, name, field), parse_values(values)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+def base_table(table, data_dir=None):
+    """The unmodified entries of a table, as plain dicts."""
+    if table == 'op':
+        return _BASE_OPERATIONS
+    if table == 'ai_op':
+        return _BASE_AI_OPERATIONS
+    with open(os.path.join(data_dir or gamedata.DATA_DIR, DATA_FILES[table])) as file:
+        return json.load(file)
+
+def grid(params):
+    """Every combination of the parameters' values, as tuples of (key, value)."""
+    keys = [key for key, _ in params]
+    return [tuple(zip(keys, values)) for values in itertools.product(*(values for _, values in params))]
+
+def set_values(entries, name, field, value):
+    for entry_name in (entries if name == '*' else (name,)):
+        entries[entry_name][field] = value
+
+def describe(config):
+    return ", ".join(f"{table}.{name}.{field}={value}" for (table, name, field), value in config) or "(base)"
+
+def write_data_dirs(configs, root, data_dir=None):
+    """
+    One data directory per configuration that changes a data file: the base data files
+    with its overrides applied. Returns one directory per configuration (the base data
+    directory for those that don't change any data file).
+    """
+    data_dir = data_dir or gamedata.DATA_DIR
+    dirs = []
+    for i, config in enumerate(configs):
+        data_params = [(key, value) for key, value in config if key[0] in DATA_FILES]
+        if not data_params:
+            dirs.append(data_dir)
+            continue
+        target = os.path.join(root, f"config{i}")
+        shutil.copytree(data_dir, target)
+        tables = {}
+        for (table, name, field), value in data_params:
+            entries = tables.get(table)
+            if entries is None:
+                entries = tables[table] = base_table(table, data_dir)
+            set_values(entries, name, field, value)
+        for table, entries in tables.items():
+            with open(os.path.join(target, DATA_FILES[table]), 'w') as file:
+                json.dump(entries, file, indent=4)
+        dirs.append(target)
+    return dirs
+
+# --------------------------------------------------
+# Playing games (in worker processes)
+# --------------------------------------------------
+_BASE_OPERATIONS = copy.deepcopy(operations.OPERATIONS)
+_BASE_AI_OPERATIONS = copy.deepcopy(operations.AI_OPERATIONS)
+_BASE_DATA_DIR = gamedata.DATA_DIR
+_applied = None
+
+def _restore(table, base):
+    # In place: ai.AI_OPERATIONS and other modules hold references to these dicts
+    table.clear()
+    table.update(copy.deepcopy(base))
+
+def apply_config(config, data_dir):
+    """Sets this process's operation tables and data directory for one configuration."""
+    global _applied
+    if _applied == (config, data_dir):
+        return
+    _restore(operations.OPERATIONS, _BASE_OPERATIONS)
+    _restore(operations.AI_OPERATIONS, _BASE_AI_OPERATIONS)
+    for (table, name, field), value in config:
+        if table == 'op':
+            set_values(operations.OPERATIONS, name, field, value)
+        elif table == 'ai_op':
+            set_values(operations.AI_OPERATIONS, name, field, value)
+    operations.rebuild_catalog()
+    if gamedata.DATA_DIR != data_dir:
+        gamedata.use_data_dir(data_dir)
+    _applied = (config, data_dir)
+
+def reset():
+    """Puts the operation tables and data directory back the way they were."""
+    global _applied
+    if _applied is not None:
+        apply_config((), _BASE_DATA_DIR)
+        _applied = None
+
+def run_chunk(job):
+    """
+    Plays games [start, stop) of one configuration.
+    job is (config index, config, data_dir, start, stop, settings); returns (config index, start, results),
+    results being one (outcome, turns) pair per game.
+    """
+    index, config, data_dir, start, stop, settings = job
+    apply_config(config, data_dir)
+    agencies, policy, max_turns, seed, array_world = settings
+    results = []
+    for i in range(start, stop):
+        # Game i gets the same agency and seed in every configuration
+        result = simulate.run_game((agencies[i % len(agencies)], policy, max_turns,
+                                    seeding.derive_seed(seed, i), array_world))
+        results.append((result['outcome'], result['turns']))
+    return index, start, results
+
+# --------------------------------------------------
+# Statistics and stopping
+# --------------------------------------------------
+class ConfigStats:
+    __slots__ = ('config', 'wins', 'exposed', 'turns', 'status')
+
+    def __init__(self, config):
+        self.config = config
+        self.wins = bytearray()  # per game, in seed order
+        self.exposed = 0
+        self.turns = 0
+        self.status = 'active'
+
+    @property
+    def games(self):
+        return len(self.wins)
+
+    @property
+    def win_rate(self):
+        return sum(self.wins) / len(self.wins) if self.wins else 0.0
+
+    def add(self, results):
+        for outcome, turns in results:
+            self.wins.append(outcome == 'win')
+            self.exposed += outcome == 'exposed'
+            self.turns += turns
+
+def z_value(confidence):
+    return statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+
+def pruning_z(confidence, looks, comparisons=1):
+    """z for one pruning check out of looks * comparisons, so all of them together err with probability at most 1 - confidence."""
+    return z_value(1 - (1 - confidence) / max(1, looks * comparisons))
+
+def wilson(wins, games, z):
+    """Wilson score interval for a win rate."""
+    if not games:
+        return 0.0, 1.0
+    p = wins / games
+    denominator = 1 + z * z / games
+    centre = (p + z * z / (2 * games)) / denominator
+    half = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+def paired_upper(stats, leader, z):
+    """Upper confidence bound of stats' win rate minus the leader's, over the games both played."""
+    n = min(stats.games, leader.games)
+    if n < 2:
+        return math.inf
+    differences = [a - b for a, b in zip(stats.wins[:n], leader.wins[:n])]
+    mean = sum(differences) / n
+    deviation = statistics.stdev(differences, mean) if any(differences) else 0.0
+    return mean + z * deviation / math.sqrt(n)
+
+def prune(configs, z, target=None, tolerance=DEFAULT_TOLERANCE):
+    """Marks every active configuration that is already decided. Returns how many were."""
+    active = [stats for stats in configs if stats.status == 'active']
+    decided = 0
+    if target is None:
+        if len(active) < 2:
+            return 0
+        leader = max(active, key=lambda stats: stats.win_rate)
+        for stats in active:
+            if stats is not leader and paired_upper(stats, leader, z) < 0:
+                stats.status = 'dropped'
+                decided += 1
+        return decided
+
+    for stats in active:
+        low, high = wilson(sum(stats.wins), stats.games, z)
+        if target - tolerance <= low and high <= target + tolerance:
+            stats.status = 'accepted'
+        elif high < target - tolerance or low > target + tolerance:
+            stats.status = 'rejected'
+        else:
+            continue
+        decided += 1
+    return decided
+
+# --------------------------------------------------
+# Running a sweep
+# --------------------------------------------------
+def run_sweep(params, games=1000, batch=DEFAULT_BATCH, policy='greedy', agencies=None, max_turns=200,
+              workers=None, seed=0, array_world=False, confidence=DEFAULT_CONFIDENCE, target=None,
+              tolerance=DEFAULT_TOLERANCE, progress=None):
+    """
+    Sweeps the grid of `params` (a list of (key, values) pairs from parse_param) with at most
+    `games` games per configuration and returns every configuration's ConfigStats, ranked.
+    progress, if given, is called with (round, games per configuration, active configurations).
+    """
+    configs = grid(params)
+    stats = [ConfigStats(config) for config in configs]
+    settings = (list(agencies or gamedata.agency_names()), policy, max_turns, seed, array_world)
+    # Every round from MIN_ROUNDS on is checked; without a target a drop compares against any of the others
+    looks = math.ceil(games / batch) - MIN_ROUNDS + 1
+    z = pruning_z(confidence, looks, len(configs) - 1 if target is None else 1)
+    root = tempfile.mkdtemp(prefix='deep_state_sweep_')
+    pool = None
+    try:
+        data_dirs = write_data_dirs(configs, root)
+        if workers != 1:
+            # Imported here: concurrent.futures.process is slow to import and single-process runs never need it
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(max_workers=workers)
+        chunk = max(1, batch // 4) if workers != 1 else batch
+
+        played = 0
+        round_number = 0
+        while played < games:
+            active = [i for i, s in enumerate(stats) if s.status == 'active']
+            if not active or (target is None and len(active) < 2 and round_number >= MIN_ROUNDS):
+                break
+            stop = min(games, played + batch)
+            jobs = [(i, configs[i], data_dirs[i], start, min(stop, start + chunk), settings)
+                    for i in active for start in range(played, stop, chunk)]
+            results = pool.map(run_chunk, jobs) if pool else map(run_chunk, jobs)
+            # Chunks come back in submission order, so each configuration's games stay in seed order
+            for index, _, chunk_results in results:
+                stats[index].add(chunk_results)
+            played = stop
+            round_number += 1
+            if round_number >= MIN_ROUNDS:
+                prune(stats, z, target, tolerance)
+            if progress:
+                progress(round_number, played, sum(s.status == 'active' for s in stats))
+    finally:
+        if pool:
+            pool.shutdown()
+        reset()
+        shutil.rmtree(root, ignore_errors=True)
+    return rank(stats, target)
+
+def rank(stats, target=None):
+    if target is None:
+        return sorted(stats, key=lambda s: -s.win_rate)
+    return sorted(stats, key=lambda s: abs(s.win_rate - target))
+
+def format_results(ranked, confidence=DEFAULT_CONFIDENCE, limit=None):
+    """The ranked configurations as a printable table."""
+    z = z_value(confidence)
+    lines = [f"{'Rank':>4}  {'Games':>6}{'Win%':>7}{'Interval':>15}{'Exposed%':>10}{'Turns':>7}  {'Status':<9} Configuration"]
+    for position, stats in enumerate(ranked[:limit] if limit else ranked, 1):
+        low, high = wilson(sum(stats.wins), stats.games, z)
+        exposed = stats.exposed / stats.games * 100 if stats.games else 0.0
+        turns = stats.turns / stats.games if stats.games else 0.0
+        lines.append(f"{position:>4}  {stats.games:>6}{stats.win_rate * 100:>7.1f}"
+                     f"{f'{low * 100:.1f}-{high * 100:.1f}':>15}{exposed:>10.1f}{turns:>7.1f}"
+                     f"  {stats.status:<9} {describe(stats.config)}")
+    return "\n".join(lines)
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep Deep State balance parameters.")
+    parser.add_argument('--param', action='append', required=True, type=parse_param,
+                        help='"<table>.<name>.<field>=<values>" with table one of ' + ', '.join(TABLES) + " (repeatable).")
+    parser.add_argument('--games', type=int, default=1000, help="Most games per configuration.")
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH, help="Games per configuration per round.")
+    parser.add_argument('--policy', choices=sorted(simulate.POLICIES), default='greedy')
+    parser.add_argument('--agency', action='append',
+                        help="Agency to play (repeatable). Defaults to rotating through all of them.")
+    parser.add_argument('--max-turns', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--arrays', action='store_true', help="Use the NumPy array-backed world.")
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE,
+                        help="Chance of never wrongly dropping, accepting or rejecting a configuration over the whole sweep.")
+    parser.add_argument('--target', type=float, default=None,
+                        help="Rank by closeness to this win rate (0-1) instead of by highest win rate.")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--top', type=int, default=None, help="Only print the best N configurations.")
+    args = parser.parse_args(argv)
+
+    def progress(round_number, played, active):
+        print(f"Round {round_number}: {played} games per configuration, {active} still active", flush=True)
+
+    ranked = run_sweep(args.param, games=args.games, batch=args.batch, policy=args.policy, agencies=args.agency,
+                       max_turns=args.max_turns, workers=args.workers, seed=args.seed, array_world=args.arrays,
+                       confidence=args.confidence, target=args.target, tolerance=args.tolerance,
+                       progress=progress)
+    print(format_results(ranked, args.confidence, args.top))
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,62 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import advisor
+import engine
+import influence
+import main
+import operations
+import simulate
+
+def full_ranking(game_state):
+    """Every finite (operation, country, score), by score, then catalog and country order."""
+    countries, names, scores = advisor.score_operations(game_state)
+    moves = [(names[o], countries[c], float(scores[o, c]), o, c)
+             for o in range(len(names)) for c in range(len(countries)) if np.isfinite(scores[o, c])]
+    moves.sort(key=lambda move: (-move[2], move[3], move[4]))
+    return [move[:3] for move in moves]
+
+def test_advice_is_the_top_of_a_full_ranking():
+    game_state = main.initialize_game('CIA', seed=15)
+    for _ in range(3):
+        engine.play_turn(game_state, simulate.random_policy)
+    for top in (1, 5, 10, 1000):
+        assert advisor.advise(game_state, top) == full_ranking(game_state)[:top]
+    for operation, _, _ in advisor.advise(game_state, 1000):
+        assert operations.CATALOG.player.by_name[operation].affordable(game_state['budget'],
+                                                                        game_state['political_capital'])
+
+def test_ties_keep_catalog_and_country_order():
+    game_state = main.initialize_game('CIA', seed=16)
+    # Identical countries score identically for every operation
+    for name in game_state['countries']:
+        for agency in list(game_state['countries'][name]['influence']):
+            influence.set_influence(game_state, name, agency, 10)
+        for field, value in (('stability', 60), ('populism_risk', 20)):
+            influence.add_country_stat(game_state, name, field, value - game_state['countries'][name][field])
+        game_state['countries'][name]['budget_reward'] = 10
+        game_state['countries'][name]['capital_reward'] = 2
+    game_state.pop('_country_arrays', None)  # reward columns were set directly
+    names = list(game_state['countries'])
+    best = advisor.advise(game_state, 3)
+    assert [country for _, country, _ in best] == names[:3]
+    assert len({(operation, score) for operation, _, score in best}) == 1
+    assert best == full_ranking(game_state)[:3]
+
+def test_no_advice_without_a_free_agent():
+    game_state = main.initialize_game('CIA', seed=17)
+    assert advisor.advise(game_state)
+    game_state['agents_used'] = game_state['agents']
+    assert advisor.advise(game_state) == []
+
+def test_country_arrays_follow_the_game():
+    game_state = main.initialize_game('CIA', seed=18)
+    arrays = advisor.world_arrays(game_state)
+    for _ in range(10):
+        engine.play_turn(game_state, simulate.random_policy)
+    influence_now = arrays.current().influence.copy()
+    columns_now = {field: column.copy() for field, column in arrays.columns.items()}
+    arrays.rebuild()
+    assert (influence_now == arrays.influence).all()
+    assert all((columns_now[field] == arrays.columns[field]).all() for field in columns_now)
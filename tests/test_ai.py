@@ -0,0 +1,31 @@
+import random
+
+import ai
+import engine
+import gamedata
+import influence
+import main
+import simulate
+
+def baseline_pick(game_state, rival, rng):
+    """The old target pick: random.choice over every country repeated `weight` times."""
+    weighted = []
+    for name, data in game_state['countries'].items():
+        weighted.extend([name] * ai.target_weight(data['influence'], rival, game_state['agency']))
+    return rng.choice(weighted)
+
+def test_sampler_picks_match_the_weighted_list():
+    game_state = main.initialize_game('CIA', seed=11)
+    rivals = gamedata.rival_agencies('CIA')
+    names = list(game_state['countries'])
+    changes = random.Random(1)
+    for turn in range(15):
+        engine.play_turn(game_state, simulate.random_policy)
+        # Push some influence across the weight thresholds so samplers have to notice
+        for _ in range(3):
+            influence.set_influence(game_state, changes.choice(names), changes.choice(rivals + ('CIA',)),
+                                    changes.choice([0, ai.PLAYER_THREAT_INFLUENCE + 1, ai.RIVAL_FOCUS_INFLUENCE + 1]))
+        for rival in rivals:
+            ours, theirs = random.Random(turn), random.Random(turn)
+            for _ in range(20):
+                assert ai.pick_target_country(game_state, rival, ours) == baseline_pick(game_state, rival, theirs)
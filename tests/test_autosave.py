@@ -0,0 +1,53 @@
+import json
+
+import autosave
+import engine
+import main
+import records
+import simulate
+
+def plain(game_state):
+    state = {key: value for key, value in game_state.items() if not key.startswith('_')}
+    return json.loads(json.dumps(state, default=records.json_default))
+
+def play(tmp_path, turns):
+    """Plays and autosaves `turns` turns; returns the save path and the state after each turn."""
+    path = str(tmp_path / 'save1.json')
+    game_state = main.initialize_game('CIA', seed=10)
+    writer = autosave.AutosaveWriter(path, snapshot_every=5)
+    writer.start(game_state)
+    states = {game_state['turn']: plain(game_state)}
+    for _ in range(turns):
+        engine.play_turn(game_state, simulate.random_policy)
+        writer.submit(game_state)
+        states[game_state['turn']] = plain(game_state)
+    writer.close()
+    return path, states
+
+def journal_lines(path):
+    with open(autosave.journal_path(path), 'rb') as file:
+        return file.read().splitlines(keepends=True)
+
+def test_recover_gives_the_latest_turn(tmp_path):
+    path, states = play(tmp_path, 8)
+    assert len(journal_lines(path)) == 4  # turns 6-9; turn 5 was written as a snapshot
+    assert autosave.recover(path) == states[9]
+
+def test_torn_last_line_falls_back_to_the_last_complete_turn(tmp_path):
+    path, states = play(tmp_path, 8)
+    lines = journal_lines(path)
+    with open(autosave.journal_path(path), 'wb') as file:
+        file.write(b"".join(lines[:-1]) + lines[-1][:len(lines[-1]) // 2])
+    assert autosave.recover(path) == states[8]
+
+def test_journal_holds_only_new_replay_actions(tmp_path):
+    path, states = play(tmp_path, 8)
+    entries = [json.loads(line) for line in journal_lines(path)]
+    for entry in entries:
+        assert 'replay' not in entry['state'] and 'replay' not in entry
+        turn = entry['turn']
+        assert entry.get('actions', []) == states[turn]['replay']['actions'][len(states[turn - 1]['replay']['actions']):]
+    assert any(entry.get('actions') for entry in entries)
+
+def test_recover_without_a_save(tmp_path):
+    assert autosave.recover(str(tmp_path / 'missing.json')) is None
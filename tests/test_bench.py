@@ -0,0 +1,21 @@
+import bench
+
+def test_fresh_measure_gives_every_call_its_own_warmed_up_state():
+    states = []
+    calls = []
+    def setup():
+        states.append({'calls': 0})
+        return states[-1]
+    def func(state):
+        state['calls'] += 1
+        calls.append(state['calls'])
+
+    stats = bench.measure(func, setup, min_time=0, fresh=True)
+    assert stats['calls'] == bench.MIN_CALLS == len(states)
+    # Each state sees its warm-up call, then exactly one timed call
+    assert calls == [1, 2] * bench.MIN_CALLS
+
+    states.clear()
+    calls.clear()
+    bench.measure(func, setup, min_time=0)
+    assert len(states) == 1 and calls == list(range(1, bench.MIN_CALLS + 2))
@@ -0,0 +1,25 @@
+import json
+
+import changes
+import engine
+import main
+import records
+import simulate
+
+def plain(game_state):
+    """Everything a ChangeSet covers, as a client would hold it."""
+    state = {key: value for key, value in game_state.items() if not key.startswith('_') and key != 'replay'}
+    return json.loads(json.dumps(state, default=records.json_default))
+
+def test_change_sets_keep_a_mirror_equal_to_a_full_copy():
+    for compact in (False, True):
+        game_state = main.initialize_game('CIA', seed=13, compact=compact)
+        tracker = changes.track(game_state)
+        mirror = plain(game_state)
+        for _ in range(20):
+            engine.play_turn(game_state, simulate.greedy_policy)
+            change_set = tracker.take()
+            assert change_set
+            changes.apply_changes(mirror, json.loads(json.dumps(change_set.to_dict())))
+            assert mirror == plain(game_state)
+        assert not tracker.take()
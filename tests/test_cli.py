@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+import cli
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run(argv, capsys):
+    cli.main_cli(argv)
+    return capsys.readouterr().out.strip().splitlines()
+
+def test_new_play_and_load(tmp_path, capsys):
+    straight = run(['play', '--agency', 'MSS', '--seed', '7', '--turns', '4'], capsys)[-1]
+    assert straight.startswith("Turn 5 | MSS |")
+    for suffix in ('.json', '.snap'):
+        path = str(tmp_path / f"cli{suffix}")
+        assert run(['new', '--agency', 'MSS', '--seed', '7', '--save', path], capsys)[-1].startswith("Turn 1 | MSS |")
+        run(['play', '--load', path, '--turns', '4', '--save', path], capsys)
+        assert run(['play', '--load', path, '--turns', '0'], capsys)[-1] == straight
+        # A loaded game restarts its random stream (see seeding.game_rng), but plays on
+        assert run(['play', '--load', path, '--turns', '3'], capsys)[-1].startswith("Turn 8 | MSS |")
+
+def test_missing_save_exits(tmp_path, capsys):
+    try:
+        cli.main_cli(['play', '--load', str(tmp_path / 'none.json')])
+    except SystemExit as e:
+        assert "No save" in str(e.code)
+    else:
+        raise AssertionError("expected SystemExit")
+
+def test_import_stays_lazy():
+    # A fresh interpreter, since this process already imported everything
+    code = ("import sys, cli, gamedata; "
+            "print(sorted(m for m in ('tkinter', 'numpy', 'concurrent.futures.process', 'asyncio') if m in sys.modules), "
+            "len(gamedata._cache))")
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert out.split() == ['[]', '0']
@@ -0,0 +1,32 @@
+import ai
+import eventlog
+import main
+
+def test_sinks_filter_by_level_and_format_lazily(monkeypatch):
+    texts = []
+    memory = eventlog.MemorySink(level=eventlog.INFO)
+    log = eventlog.EventLog([eventlog.CallbackSink(texts.append, level=eventlog.WARNING), memory])
+    formatted = []
+    original = eventlog.Event.format
+    monkeypatch.setattr(eventlog.Event, 'format', lambda event: formatted.append(event.kind) or original(event))
+
+    log.emit('rival_skip', agency='MSS')                       # DEBUG: no sink takes it
+    log.emit('rival_recruit', agency='MSS')                    # INFO: memory only, never formatted
+    log.emit('global_event', name='Leak')                      # WARNING: both
+    assert [event.kind for event in memory.events] == ['rival_recruit', 'global_event']
+    assert memory.events[0].agency == 'MSS'
+    assert texts == ["Global Event: Leak"]
+    assert formatted == ['global_event']
+
+def test_null_log_builds_no_events(monkeypatch):
+    monkeypatch.setattr(eventlog, 'Event', None)  # any Event() would raise
+    eventlog.NULL_LOG.emit('global_event', name='Leak')
+    game_state = main.initialize_game('CIA', seed=9)
+    ai.rival_turn(game_state, log_callback=eventlog.NULL_LOG)
+
+def test_plain_callbacks_get_the_old_text(capsys):
+    lines = []
+    eventlog.emitter(lines.append)('visibility', agency='FSB', amount=3, new=40)
+    assert lines == ["FSB visibility +3, now 40%"]
+    eventlog.emitter(None)('message', text="hello")
+    assert capsys.readouterr().out == "hello\n"
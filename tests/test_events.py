@@ -0,0 +1,15 @@
+import events
+import main
+
+def saved(game_state):
+    return {key: value for key, value in game_state.items() if not key.startswith('_')}
+
+def test_batch_matches_one_game_at_a_time_and_logs_nothing(capsys):
+    batch = [main.initialize_game('CIA', seed=seed) for seed in range(8)]
+    single = [main.initialize_game('CIA', seed=seed) for seed in range(8)]
+    for _ in range(10):
+        events.global_events_batch(batch)
+        for game_state in single:
+            events.global_events(game_state, log_callback=lambda text: None)
+    assert [saved(game_state) for game_state in batch] == [saved(game_state) for game_state in single]
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,66 @@
+import copy
+
+import engine
+import forking
+import influence
+import main
+import records
+import simulate
+
+def saved(game_state):
+    state = {key: value for key, value in game_state.items() if not key.startswith('_')}
+    state['countries'] = records.json_default(state['countries']) if hasattr(state['countries'], 'to_countries') \
+        else state['countries']
+    return state
+
+def test_forked_parent_plays_on_like_an_unforked_game():
+    for compact in (False, True):
+        parent = main.initialize_game('CIA', seed=3, compact=compact)
+        twin = main.initialize_game('CIA', seed=3, compact=compact)
+        for game_state in (parent, twin):
+            engine.play_turn(game_state, simulate.greedy_policy)
+
+        child = forking.fork(parent)
+        for _ in range(5):
+            engine.play_turn(child, simulate.random_policy)
+        for _ in range(10):
+            for game_state in (parent, twin):
+                engine.play_turn(game_state, simulate.greedy_policy)
+
+        assert saved(parent) == saved(twin)
+        assert saved(child) != saved(parent)
+
+def test_fork_changes_do_not_leak():
+    parent = main.initialize_game('CIA', seed=4)
+    before = copy.deepcopy(saved(parent))
+    child = forking.fork(parent)
+    influence.add_influence(child, 'USA', 'CIA', 9)
+    child['ai_resources']['MSS']['budget'] += 100
+    child['replay']['actions'].append([1, 'buy_agent'])
+    assert saved(parent) == before
+
+    influence.add_influence(parent, 'China', 'MSS', 5)
+    assert child['countries']['China']['influence']['MSS'] == before['countries']['China']['influence']['MSS']
+
+def test_array_layouts_share_their_arrays_until_a_write():
+    layouts = [{'compact': True}]
+    try:
+        import numpy  # noqa: F401
+        layouts.append({'array_world': True})
+    except ImportError:
+        pass
+    for layout in layouts:
+        parent = main.initialize_game('CIA', seed=4, **layout)
+        before = copy.deepcopy(saved(parent))
+        child = forking.fork(parent)
+        assert child['countries'].influence is parent['countries'].influence
+
+        influence.add_influence(child, 'USA', 'CIA', 9)
+        child['countries']['USA']['stability'] -= 3
+        assert child['countries'].influence is not parent['countries'].influence
+        assert saved(parent) == before
+
+        influence.add_influence(parent, 'China', 'MSS', 5)
+        parent['countries']['China']['stability'] += 2
+        assert child['countries']['China']['influence']['MSS'] == before['countries']['China']['influence']['MSS']
+        assert child['countries']['China']['stability'] == before['countries']['China']['stability']
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+import gamedata
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def data_dir():
+    yield
+    gamedata.use_data_dir(gamedata._data_dir())
+
+def test_frozen_build_ships_every_data_file(data_dir):
+    frozen = os.path.join(ROOT, 'dist', 'data')
+    assert sorted(os.listdir(frozen)) == sorted(os.listdir(os.path.join(ROOT, 'data')))
+    for name in os.listdir(frozen):
+        with open(os.path.join(frozen, name), 'rb') as file:
+            assert b'\n' not in file.read().replace(b'\r\n', b''), f"{name} should use CRLF like the other data files"
+    gamedata.use_data_dir(frozen)
+    assert gamedata.global_events() and gamedata.countries() and gamedata.tech_tree()
+
+def copy_data(tmp_path):
+    source = os.path.join(ROOT, 'data')
+    for name in os.listdir(source):
+        with open(os.path.join(source, name), 'rb') as file:
+            (tmp_path / name).write_bytes(file.read())
+    return str(tmp_path)
+
+def test_files_are_parsed_once_until_they_change(tmp_path, data_dir, monkeypatch):
+    gamedata.use_data_dir(copy_data(tmp_path))
+    parsed = []
+    load = gamedata.json.load
+    monkeypatch.setattr(gamedata.json, 'load', lambda file: parsed.append(file.name) or load(file))
+
+    tree = gamedata.tech_tree()
+    assert gamedata.tech_tree() is tree and gamedata.techs_by_cost() and len(parsed) == 1
+
+    path = tmp_path / 'tech_tree.json'
+    raw = gamedata.json.loads(path.read_text())
+    raw['Test Tech'] = {'cost': 1, 'visibility_reduction': 1}
+    path.write_text(gamedata.json.dumps(raw))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))  # coarse mtime clocks
+    assert 'Test Tech' in gamedata.tech_tree()
+    assert gamedata.techs_by_cost()[0][0] == 'Test Tech'
+    assert len(parsed) == 2
+
+def test_views_are_read_only_and_new_countries_are_copies(data_dir):
+    with pytest.raises(TypeError):
+        gamedata.countries()['USA']['stability'] = 0
+    with pytest.raises(TypeError):
+        gamedata.agencies()['CIA'] = {}
+    countries = gamedata.new_countries()
+    countries['USA']['influence']['CIA'] = 99
+    assert gamedata.countries()['USA']['influence']['CIA'] != 99
+    assert gamedata.new_countries()['USA'] == {key: dict(value) if key == 'influence' else value
+                                                for key, value in gamedata.countries()['USA'].items()}
+
+def test_rival_agencies_follow_registry_order(data_dir):
+    names = gamedata.agency_names()
+    assert gamedata.rival_agencies(names[1]) == names[:1] + names[2:]
+    assert gamedata.rival_agencies(names[1]) is gamedata.rival_agencies(names[1])
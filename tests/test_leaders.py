@@ -0,0 +1,58 @@
+import pytest
+
+import ai
+import engine
+import eventlog
+import influence
+import leaders
+import main
+import records
+import simulate
+
+def reward_country(game_state):
+    return next(name for name, data in game_state['countries'].items() if leaders.pays_rewards(data))
+
+@pytest.mark.parametrize('array_world', [False, True])
+def test_award_creates_agency_records_for_unknown_agencies(array_world):
+    if array_world:
+        pytest.importorskip('numpy')
+    game_state = main.initialize_game('CIA', seed=5, array_world=array_world)
+    del game_state['ai_resources']['MSS']
+    influence.set_influence(game_state, reward_country(game_state), 'MSS', 100)
+
+    if array_world:
+        game_state['countries'].award_rewards(game_state)
+    else:
+        leaders.get_tracker(game_state).award()
+
+    ai_data = game_state['ai_resources']['MSS']
+    assert isinstance(ai_data, records.AgencyRecord)
+    assert ai_data['budget'] > 0
+    ai_data['research_points'] = 1000
+    ai.ai_research_tech(game_state, 'MSS', ai_data, eventlog.emitter(None))
+    assert ai_data.techs
+
+def reference_award(game_state):
+    """The old full per-country reward loop."""
+    rewards = {}
+    for data in game_state['countries'].values():
+        if leaders.pays_rewards(data):
+            totals = rewards.setdefault(leaders.leading_agency(data['influence']), [0, 0])
+            totals[0] += data['budget_reward']
+            totals[1] += data['capital_reward']
+    return rewards
+
+def test_tracker_matches_a_full_rescan():
+    game_state = main.initialize_game('CIA', seed=12)
+    tracker = leaders.get_tracker(game_state)
+    for _ in range(25):
+        engine.play_turn(game_state, simulate.random_policy)
+        tracker.verify()
+        rescan = object.__new__(leaders.LeaderTracker)  # a rescan that doesn't listen to the game
+        rescan.game_state = game_state
+        rescan.rebuild()
+        assert tracker.leaders == rescan.leaders
+        assert tracker.controlled == sum(data['influence'].get('CIA', 0) >= leaders.CONTROL_INFLUENCE
+                                         for data in game_state['countries'].values())
+        assert {agency: totals[1:] for agency, totals in tracker.rewards.items() if totals[0]} \
+            == reference_award(game_state)
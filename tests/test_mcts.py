@@ -0,0 +1,52 @@
+import json
+import random
+import time
+
+import engine
+import main
+import mcts
+import operations
+import records
+import simulate
+
+MCTS = {'name': 'mcts', 'iterations': 60}
+
+def plain(game_state):
+    state = {key: value for key, value in game_state.items() if not key.startswith('_')}
+    return json.loads(json.dumps(state, default=records.json_default))
+
+def test_planner_only_for_mcts_games():
+    assert mcts.planner(main.initialize_game('CIA', seed=1)) is None
+    assert callable(mcts.planner(main.initialize_game('CIA', seed=1, rival_ai=MCTS)))
+
+def test_fixed_iteration_games_are_reproducible():
+    games = []
+    for _ in range(2):
+        game_state = main.initialize_game('CIA', seed=4, rival_ai=MCTS)
+        engine.play_game(game_state, simulate.greedy_policy, max_turns=12)
+        games.append(plain(game_state))
+    assert games[0] == games[1]
+
+def test_choices_are_affordable_candidates():
+    game_state = main.initialize_game('CIA', seed=5, rival_ai=MCTS)
+    rival = 'MSS'
+    ai_data = game_state['ai_resources'][rival]
+    search = mcts.RivalSearch(game_state, rival)
+    for _ in range(5):
+        choice = search.choose(game_state, ai_data, iterations=60)
+        if choice == (mcts.HOLD, None):
+            continue
+        operation, country = choice
+        op = operations.CATALOG.rival.by_name[operation]
+        assert op.budget <= ai_data['budget'] and op.capital <= ai_data['political_capital']
+        assert country in game_state['countries']
+
+def test_search_stops_at_the_iteration_count_or_deadline():
+    game_state = main.initialize_game('CIA', seed=6)
+    problem = mcts.Problem(game_state, 'FSB', game_state['ai_resources']['FSB'], list(game_state['countries'])[:5])
+    root = mcts.Node()
+    assert mcts.search(root, problem, random.Random(1), iterations=40) == 40
+    assert root.visits == 40
+    started = time.perf_counter()
+    mcts.search(mcts.Node(), problem, random.Random(1), deadline=started + 0.02)
+    assert time.perf_counter() - started < 0.5
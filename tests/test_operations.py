@@ -0,0 +1,10 @@
+import random
+
+import operations
+
+def test_draw_rolls_matches_single_draws():
+    for n in (0, 1, 3, 64, 1001):
+        bulk, single = random.Random(n), random.Random(n)
+        assert operations.draw_rolls(bulk, n) == [single.random() for _ in range(n)]
+        # Both generators end up in the same place
+        assert bulk.getstate() == single.getstate()
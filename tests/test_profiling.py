@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+import ai
+import engine
+import main
+import profiling
+import simulate
+
+@pytest.fixture
+def profiler():
+    profiler = profiling.enable()
+    yield profiler
+    profiling.disable()
+
+def test_totals_for_played_turns(profiler):
+    game_state = main.initialize_game('CIA', seed=3)
+    for _ in range(5):
+        engine.play_turn(game_state, simulate.greedy_policy)
+    profiler.next_turn()
+
+    totals = profiler.by_name()
+    assert totals['turn'][0] == 5
+    assert all(totals[phase][0] == 5 for phase in ('rival_turn', 'global_events', 'rewards', 'win_checks'))
+    assert totals['pick_target_country'][0] > 0  # hot spots are wrapped
+    # A phase's inclusive time covers its children's
+    assert totals['turn'][1] >= sum(totals[phase][1] for phase in ('rival_turn', 'global_events', 'rewards'))
+    assert sum('turn' in turn for turn in profiler.turns) == 5
+    assert sum(turn.get('turn', 0.0) for turn in profiler.turns) == pytest.approx(totals['turn'][1])
+    assert f"{len(profiler.turns)} turns profiled" in profiler.summary()
+    assert "turn;rival_turn" in profiler.folded()
+
+def test_other_threads_do_not_count_towards_the_turn(profiler):
+    started = threading.Event()
+    stop = threading.Event()
+
+    def other_thread():
+        with profiling.phase('advisor'):
+            started.set()
+            stop.wait()
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    started.wait()
+    with profiling.phase('turn'):
+        time.sleep(0.01)
+    stop.set()
+    thread.join()
+    profiler.next_turn()
+
+    assert profiler.turns == [{'turn': profiler.turns[0]['turn']}]
+    assert profiler.by_name()['advisor'][0] == 1
+
+def test_disabled_profiling_is_a_shared_no_op():
+    assert not profiling.enabled()
+    assert profiling.phase('turn') is profiling.phase('rewards')
+    original = ai.pick_target_country
+    profiling.enable()
+    assert ai.pick_target_country is not original
+    profiling.disable()
+    assert ai.pick_target_country is original
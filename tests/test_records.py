@@ -0,0 +1,31 @@
+import json
+
+import engine
+import gamedata
+import main
+import records
+import simulate
+
+def plain(game_state):
+    state = {key: value for key, value in game_state.items() if not key.startswith('_')}
+    return json.loads(json.dumps(state, default=records.json_default))
+
+def test_json_save_round_trip(tmp_path):
+    path = str(tmp_path / 'save.json')
+    for compact in (False, True):
+        game_state = main.initialize_game('CIA', seed=14, compact=compact)
+        for _ in range(10):
+            engine.play_turn(game_state, simulate.greedy_policy)
+        main.save_game(game_state, path)
+        for layout in ({}, {'compact': True}):
+            loaded = main.load_game(path, **layout)
+            assert plain(loaded) == plain(game_state)
+            assert all(isinstance(ai_data, records.AgencyRecord) for ai_data in loaded['ai_resources'].values())
+
+def test_agency_record_round_trip():
+    data = {'budget': 120, 'political_capital': 7, 'research_points': 30, 'agents': 2,
+            'researched_techs': [name for name, _ in gamedata.techs_by_cost()[:2]]}
+    record = records.AgencyRecord.from_dict(data)
+    assert record.to_dict() == data
+    assert all(record.has_tech(name) for name in data['researched_techs'])
+    assert records.AgencyRecord.from_dict(json.loads(json.dumps(record, default=records.json_default))) == record
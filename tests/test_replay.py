@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+import autosave
+import engine
+import main
+import replay
+import simulate
+
+def saved(game_state):
+    return {key: value for key, value in game_state.items() if not key.startswith('_')}
+
+@pytest.mark.parametrize('policy', ['random', 'greedy'])
+def test_replay_reproduces_a_seeded_game(policy):
+    for seed in range(3):
+        game_state = main.initialize_game('Mossad', seed=seed)
+        outcome = None
+        while game_state['turn'] <= 40 and not outcome:
+            outcome, _ = engine.play_turn(game_state, simulate.POLICIES[policy])
+        until = game_state['turn'] + 1 if outcome else game_state['turn']
+        replayed, replayed_outcome = replay.replay(game_state['replay'], until)
+        assert replayed_outcome == outcome
+        assert saved(replayed) == saved(game_state)
+
+def test_same_seed_plays_the_same_game():
+    games = []
+    for _ in range(2):
+        game_state = main.initialize_game('CIA', seed=11)
+        engine.play_game(game_state, simulate.greedy_policy, max_turns=30)
+        games.append(saved(game_state))
+    assert games[0] == games[1]
+
+def test_old_replay_records_are_refused():
+    record = main.initialize_game('CIA', seed=1)['replay']
+    del record['version']
+    with pytest.raises(ValueError):
+        replay.replay(record)
+
+def test_cli_replays_journaled_and_snapshot_saves(tmp_path, capsys):
+    path = str(tmp_path / 'save1.json')
+    game_state = main.initialize_game('CIA', seed=6)
+    writer = autosave.AutosaveWriter(path)
+    writer.start(game_state)
+    for _ in range(13):
+        engine.play_turn(game_state, simulate.greedy_policy)
+        writer.submit(game_state)
+    writer.close()
+    snap = str(tmp_path / 'save1.snap')
+    main.save_snapshot(game_state, snap)
+
+    for save in (path, snap):
+        assert replay.load_record(save) == (game_state['replay'], 14)
+        replay.main_cli([save])
+        assert "Turn: 14," in capsys.readouterr().out
+    record_path = tmp_path / 'record.json'
+    record_path.write_text(json.dumps(game_state['replay']))
+    assert replay.load_record(str(record_path)) == (game_state['replay'], None)
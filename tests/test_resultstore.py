@@ -0,0 +1,38 @@
+import resultstore
+
+def turn_row(seed, turn, width):
+    return {'seed': seed, 'turn': turn, 'budget': 100 + turn, 'political_capital': 5, 'visibility': turn,
+            'agents': 1, 'influence': [turn * 1000 + i for i in range(width)]}
+
+def test_chunks_are_bounded_by_values(tmp_path):
+    path = str(tmp_path / 'shard.cols')
+    with resultstore.ResultsWriter(path, chunk_rows=4096, chunk_values=1000) as writer:
+        for turn in range(20):
+            writer._append('turns', turn_row(1, turn, 300))
+            assert writer.values['turns'] <= 1000
+            assert all(not isinstance(buffer, list) for buffer in writer.buffers['turns'].values())
+
+    reader = resultstore.ResultsReader(path)
+    assert reader.rows('turns') == 20
+    chunks = list(reader.chunks('turns', 'influence'))
+    # 300 influence values plus 6 scalars per row: 3 rows fit in 1000 values
+    assert [len(values) // width for values, width in chunks] == [3] * 6 + [2]
+    assert all(width == 300 for _, width in chunks)
+    assert list(reader.column('turns', 'influence')) == [turn * 1000 + i for turn in range(20) for i in range(300)]
+    assert list(reader.column('turns', 'turn')) == list(range(20))
+
+def test_width_change_starts_a_new_chunk(tmp_path):
+    path = str(tmp_path / 'shard.cols')
+    with resultstore.ResultsWriter(path) as writer:
+        for width in (4, 4, 7, 7, 7):
+            writer._append('turns', turn_row(2, width, width))
+    chunks = list(resultstore.ResultsReader(path).chunks('turns', 'influence'))
+    assert [(width, len(values)) for values, width in chunks] == [(4, 8), (7, 21)]
+
+def test_unclosed_shard_is_still_readable(tmp_path):
+    path = str(tmp_path / 'shard.cols')
+    writer = resultstore.ResultsWriter(path, chunk_rows=2)
+    for turn in range(5):
+        writer._append('turns', turn_row(3, turn, 3))
+    writer.file.close()  # crashed before close(): no index, last row never flushed
+    assert list(resultstore.ResultsReader(path).column('turns', 'turn')) == [0, 1, 2, 3]
@@ -0,0 +1,129 @@
+import asyncio
+
+import server
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+async def with_manager(tmp_path, body, **kwargs):
+    manager = server.SessionManager(str(tmp_path), **kwargs)
+    try:
+        return await body(manager)
+    finally:
+        manager.shutdown()
+
+def test_bad_action_is_refused_before_charging_or_recording(tmp_path):
+    async def body(manager):
+        session = await manager.new('CIA', seed=1)
+        before = await manager.state(session)
+        results = []
+        for action in (['operation', 'Propaganda', 'Atlantis'], ['operation', 'Nope', 'USA'],
+                       ['operation'], ['fly'], [], 'operation', [['operation']]):
+            results.append(await manager.action(session, action))
+        after = await manager.state(session)
+        return before, after, results, manager.live[session]['replay']['actions']
+
+    before, after, results, actions = run(with_manager(tmp_path, body))
+    assert [ok for ok, _, _ in results] == [False] * len(results)
+    assert all(not changed['fields'] for _, _, changed in results)
+    assert after == before
+    assert actions == []
+
+def test_bad_requests_get_error_replies_on_a_live_connection(tmp_path):
+    async def body(manager):
+        listener = await server.start_server(manager, port=0)
+        port = listener.sockets[0].getsockname()[1]
+        client = await server.Client.connect(port=port)
+        try:
+            session = (await client.request(op='new', agency='CIA', seed=1))['session']
+            replies = [await client.request(op='action', session=session, action=['operation']),
+                       await client.request(op='action', session=session),
+                       await client.request(op='state', session='missing'),
+                       await client.request(op='new', rival_ai={'name': 'mcts', 'workers': 64}),
+                       await client.request(op='new', rival_ai={'name': 'mcts', 'budget_ms': 10**6}),
+                       await client.request(op='new', rival_ai='mcts')]
+            client.writer.write(b'[1, 2]\n{not json\n')
+            for _ in range(2):
+                replies.append(server.json.loads(await client.reader.readline()))
+            # The connection is still usable afterwards
+            state = await client.request(op='state', session=session)
+        finally:
+            await client.close()
+            listener.close()
+            await listener.wait_closed()
+        return replies, state
+
+    replies, state = run(with_manager(tmp_path, body))
+    assert [reply['ok'] for reply in replies] == [False] * len(replies)
+    # A refused action is an ordinary reply; the others are protocol errors
+    assert replies[0]['message'] == "operation takes 2 argument(s)."
+    assert all(reply['error'] for reply in replies[1:])
+    assert state['ok'] and state['state']['turn'] == 1
+
+def test_rival_ai_limits():
+    assert server.check_rival_ai({'name': 'mcts', 'budget_ms': 20}) == {'name': 'mcts', 'budget_ms': 20}
+    for rival_ai in ({'name': 'mcts', 'workers': 2}, {'name': 'mcts', 'iterations': 10**9},
+                     {'name': 'mcts', 'budget_ms': 0}, {'name': 'mcts', 'budget_ms': True},
+                     {'name': 'mcts', 'depth': 3}, {'name': 'alphazero'}):
+        try:
+            server.check_rival_ai(rival_ai)
+        except server.SessionError:
+            continue
+        raise AssertionError(f"{rival_ai} was accepted")
+
+def play(tmp_path, max_live, rival_ai, turns=6):
+    """Plays one scripted game next to a second session, so max_live=0 evicts it after every request."""
+    async def body(manager):
+        session = await manager.new('CIA', seed=7, rival_ai=rival_ai)
+        other = await manager.new('MSS', seed=8)
+        for _ in range(turns):
+            for country in ('USA', 'China'):
+                await manager.action(session, ['operation', 'Propaganda', country])
+            await manager.end_turn(session)
+            await manager.end_turn(other)
+        game_state = await manager._game(session)
+        return {key: value for key, value in game_state.items() if not key.startswith('_')}, manager.loads
+
+    return run(with_manager(tmp_path, body, max_live=max_live))
+
+def test_eviction_does_not_change_the_game(tmp_path):
+    for rival_ai in (None, {'name': 'mcts', 'iterations': 40}):
+        kept, kept_loads = play(tmp_path / 'kept', 10, rival_ai)
+        evicted, loads = play(tmp_path / 'evicted', 0, rival_ai)
+        assert kept_loads == 0 and loads > 0
+        assert evicted == kept, rival_ai
+
+def test_closing_twice_or_an_unknown_session_is_an_error_reply(tmp_path):
+    async def body(manager):
+        listener = await server.start_server(manager, port=0)
+        port = listener.sockets[0].getsockname()[1]
+        client = await server.Client.connect(port=port)
+        try:
+            session = (await client.request(op='new', agency='CIA', seed=1))['session']
+            replies = [await client.request(op='close', session=session),
+                       await client.request(op='close', session=session),
+                       await client.request(op='close', session='missing'),
+                       await client.request(op='state', session=session)]
+        finally:
+            await client.close()
+            listener.close()
+            await listener.wait_closed()
+        return replies, dict(manager.locks), dict(manager.live)
+
+    replies, locks, live = run(with_manager(tmp_path, body))
+    assert replies[0]['ok']
+    assert [reply['ok'] for reply in replies[1:]] == [False] * 3
+    assert all(reply['error'].startswith("Unknown session") for reply in replies[1:])
+    assert locks == {} and live == {}
+
+def test_concurrent_closes_close_once(tmp_path):
+    async def body(manager):
+        session = await manager.new('CIA', seed=1)
+        results = await asyncio.gather(manager.close(session), manager.close(session),
+                                       return_exceptions=True)
+        return results, manager.locks, manager.live
+
+    results, locks, live = run(with_manager(tmp_path, body))
+    assert results[0] is None
+    assert isinstance(results[1], server.SessionError)
+    assert locks == {} and live == {}
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+import engine
+import main
+import records
+import simulate
+import snapshot
+
+def plain(game_state):
+    """The game as a save file holds it."""
+    state = {key: value for key, value in game_state.items() if not key.startswith('_')}
+    return json.loads(json.dumps(state, default=records.json_default))
+
+@pytest.fixture
+def game_state():
+    game_state = main.initialize_game('CIA', seed=7)
+    for _ in range(5):
+        engine.play_turn(game_state, simulate.greedy_policy)
+    name = next(iter(game_state['countries']))
+    del game_state['countries'][name]['populism_risk']
+    return game_state
+
+@pytest.mark.parametrize('layout', [{}, {'compact': True}, {'array_world': True}])
+def test_snapshot_round_trip(tmp_path, game_state, layout):
+    if layout.get('array_world'):
+        pytest.importorskip('numpy')
+    path = str(tmp_path / 'save.snap')
+    snapshot.save_snapshot(game_state, path)
+    assert plain(snapshot.load_snapshot(path, **layout)) == plain(game_state)
+
+def test_snapshot_refuses_the_absent_marker_as_a_value(tmp_path, game_state):
+    path = str(tmp_path / 'save.snap')
+    name = next(iter(game_state['countries']))
+    game_state['countries'][name]['stability'] = snapshot.ABSENT
+    with pytest.raises(ValueError):
+        snapshot.save_snapshot(game_state, path)
+    game_state['countries'][name]['stability'] = 50
+    game_state['countries'][name]['influence']['CIA'] = snapshot.ABSENT
+    with pytest.raises(ValueError):
+        snapshot.save_snapshot(game_state, path)
@@ -0,0 +1,44 @@
+import argparse
+import random
+
+import pytest
+
+import sweep
+
+def dropped_share(z, trials=300, configs=5, rounds=10, batch=50):
+    """How often config 0 gets dropped when every configuration wins half its games."""
+    rng = random.Random(21)
+    dropped = 0
+    for _ in range(trials):
+        stats = [sweep.ConfigStats({'index': i}) for i in range(configs)]
+        for round_number in range(1, rounds + 1):
+            for s in stats:
+                if s.status == 'active':
+                    s.add(('win' if rng.random() < 0.5 else 'lost', 1) for _ in range(batch))
+            if round_number >= sweep.MIN_ROUNDS:
+                sweep.prune(stats, z)
+        dropped += stats[0].status == 'dropped'
+    return dropped / trials
+
+def test_pruning_z_bounds_the_error_over_rounds_and_leaders():
+    confidence, configs, rounds = 0.9, 5, 10
+    z = sweep.pruning_z(confidence, rounds - sweep.MIN_ROUNDS + 1, configs - 1)
+    assert z > sweep.z_value(confidence)
+    assert dropped_share(z, configs=configs, rounds=rounds) <= 1 - confidence
+    # Checking every round at the nominal level drops an equally good configuration far more often
+    assert dropped_share(sweep.z_value(confidence), configs=configs, rounds=rounds) > 1 - confidence
+
+def test_parse_param():
+    assert sweep.parse_param("op.Covert Ops.success_chance=0.5:0.7:0.1") == \
+        (('op', 'Covert Ops', 'success_chance'), [0.5, 0.6, 0.7])
+    assert sweep.parse_param("agency.*.budget=150,200") == (('agency', '*', 'budget'), [150, 200])
+    assert sweep.parse_param("ai_op.Propaganda.rival_influence_loss=1")[1] == [1]
+    for text in ("agency.CIA.resistence=1:5", "tech.*.costs=10", "op.Covert Ops.succes_chance=0.5",
+                 "op.Nope.budget=1", "country.USA.stability=1", "agency.CIA.budget=x", "agency.CIA.budget=5:1:1"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            sweep.parse_param(text)
+
+def test_cli_rejects_unknown_fields(capsys):
+    with pytest.raises(SystemExit):
+        sweep.main_cli(['--param', 'agency.*.resistence=1:5', '--games', '1'])
+    assert "no field named 'resistence'" in capsys.readouterr().err
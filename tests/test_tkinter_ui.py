@@ -0,0 +1,160 @@
+import queue
+import threading
+
+import pytest
+
+tkinter_ui = pytest.importorskip('tkinter_ui')
+
+import autosave
+import changes
+import eventlog
+import main
+
+def drain(q):
+    items = []
+    while not q.empty():
+        items.append(q.get_nowait())
+    return items
+
+def test_turn_after_closing_influence_report(tmp_path):
+    # The turn worker and the game state don't need a display, so drive them directly
+    app = object.__new__(tkinter_ui.DeepStateApp)
+    app.game_state = main.initialize_game('CIA', seed=1)
+    app.changes = changes.track(app.game_state)
+    app.autosave = autosave.AutosaveWriter(str(tmp_path / 'save1.json'))
+    app.autosave.start(app.game_state)
+    app.log_sink = eventlog.MemorySink()
+    app.turn_queue = queue.Queue()
+    app.cancel_turns = threading.Event()
+    app.influence_window = object()
+
+    app.influence_closed()
+    app._turn_worker(1)
+    app.autosave.close()
+
+    items = drain(app.turn_queue)
+    assert [item for item in items if item[0] == 'error'] == []
+    turns = [item for item in items if item[0] == 'turn']
+    assert len(turns) == 1
+    assert isinstance(turns[0][5], changes.ChangeSet)
+    assert app.game_state['turn'] == 2
+    # The turn was autosaved
+    assert autosave.recover(str(tmp_path / 'save1.json'))['turn'] == 2
+    # Later refreshes keep working too
+    app.refresh_influence(app.changes.take())
+
+class FakeText:
+    """Just enough of a tk.Text for TkLogSink."""
+    def __init__(self):
+        self.lines = []
+        self.inserts = 0
+
+    def insert(self, index, text):
+        self.inserts += 1
+        self.lines.extend(text.splitlines())
+
+    def index(self, index):
+        return f"{len(self.lines) + 1}.0"
+
+    def delete(self, start, end):
+        del self.lines[:int(end.split('.')[0]) - 1]
+
+    def see(self, index):
+        pass
+
+def test_log_sink_writes_a_turn_in_one_insert():
+    text = FakeText()
+    sink = tkinter_ui.TkLogSink(text, max_lines=3)
+    log = eventlog.EventLog([sink])
+    for amount in range(5):
+        log.emit('visibility', agency='FSB', amount=amount, new=10 + amount)
+    assert text.inserts == 0
+    sink.flush()
+    sink.flush()
+    assert text.inserts == 1
+    # Tk counts the empty line after the last newline too
+    assert text.lines == [f"FSB visibility +{amount}, now {10 + amount}%" for amount in (3, 4)]
+
+@pytest.fixture
+def big_world(tmp_path):
+    import gamedata
+    import worldgen
+    gamedata.use_data_dir(worldgen.write_world(str(tmp_path / 'world'), 400, 10))
+    yield
+    gamedata.use_data_dir(gamedata._data_dir())
+
+def fresh_order(game_state, table):
+    full = tkinter_ui.InfluenceTable(game_state)
+    full.sort_by(table.sort_column)
+    if full.descending != table.descending:
+        full.sort_by(table.sort_column)
+    full.set_filters(table.name_filter, table.threshold)
+    return full.order
+
+@pytest.mark.parametrize('descending', [False, True])
+def test_influence_table_updates_match_a_full_sort(big_world, descending):
+    import random
+
+    import engine
+    import influence
+    import simulate
+
+    game_state = main.initialize_game('CIA', seed=19)
+    tracker = changes.track(game_state)
+    table = tkinter_ui.InfluenceTable(game_state)
+    table.sort_by('MSS')
+    if table.descending != descending:
+        table.sort_by('MSS')
+    table.set_filters('', ('CIA', 5))
+    names = list(game_state['countries'])
+    rng = random.Random(3)
+
+    for turn in range(6):
+        # A few changes take the incremental path (bisect moves)
+        for _ in range(3):
+            country = rng.choice(names)
+            influence.set_influence(game_state, country, rng.choice(['MSS', 'CIA']), rng.randrange(0, 100))
+            influence.add_country_stat(game_state, country, 'stability', rng.randrange(-3, 4))
+            few = tracker.take()
+            assert len(few.countries) * tkinter_ui.INCREMENTAL_SORT_SHARE <= len(names)
+            table.update(few)
+            assert table.order == fresh_order(game_state, table)
+        engine.play_turn(game_state, simulate.random_policy)
+        table.update(tracker.take())
+        assert table.order == fresh_order(game_state, table)
+        # Many changes take the full re-sort
+        for country in rng.sample(names, 40):
+            influence.set_influence(game_state, country, 'MSS', rng.randrange(0, 100))
+        many = tracker.take()
+        assert len(many.countries) * tkinter_ui.INCREMENTAL_SORT_SHARE > len(names)
+        table.update(many)
+        assert table.order == fresh_order(game_state, table)
+    table.sort_by('Stability')
+    influence.add_country_stat(game_state, names[0], 'stability', 7)
+    table.update(tracker.take())
+    assert table.order == fresh_order(game_state, table)
+
+class Untouchable(dict):
+    def __getitem__(self, key):
+        raise AssertionError("the influence table read the game while a turn might be running")
+
+def test_influence_table_only_reads_the_game_when_built():
+    import engine
+    import simulate
+
+    game_state = main.initialize_game('CIA', seed=20)
+    tracker = changes.track(game_state)
+    table = tkinter_ui.InfluenceTable(game_state)
+    table.sort_by('Stability')
+    for _ in range(5):
+        engine.play_turn(game_state, simulate.random_policy)
+    change_set = tracker.take()
+    expected = [tkinter_ui.InfluenceTable(game_state).row(name) for name in table.names]
+
+    countries, game_state['countries'] = game_state['countries'], Untouchable()
+    table.update(change_set)
+    table.sort_by('MSS')
+    table.set_filters('a', ('Pop Risk', 20))
+    assert [table.row(name) for name in table.names] == expected
+    game_state['countries'] = countries
+    assert table.order == fresh_order(game_state, table)
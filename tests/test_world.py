@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import engine
+import gamedata
+import main
+import records
+import simulate
+import world
+
+def plain(game_state):
+    state = {key: value for key, value in game_state.items() if not key.startswith('_')}
+    return json.loads(json.dumps(state, default=records.json_default))
+
+@pytest.mark.parametrize('policy', ['random', 'greedy'])
+def test_array_world_plays_like_the_dict_world(policy):
+    games = []
+    for array_world in (False, True):
+        game_state = main.initialize_game('FSB', seed=8, array_world=array_world)
+        engine.play_game(game_state, simulate.POLICIES[policy], max_turns=40)
+        games.append(plain(game_state))
+    assert games[0] == games[1]
+
+def test_round_trip_and_views():
+    countries = gamedata.new_countries()
+    name = next(iter(countries))
+    del countries[name]['populism_risk']
+    arrays = world.ArrayWorld.from_countries(countries)
+    assert arrays.to_countries() == countries
+    assert list(arrays) == list(countries)
+
+    view = arrays[name]
+    view['influence']['CIA'] = 77
+    view['stability'] = 12
+    assert arrays.to_countries()[name]['influence']['CIA'] == 77
+    assert dict(arrays[name])['stability'] == 12
+    assert 'populism_risk' not in arrays[name]
+
+def test_vectorized_queries_match_the_dicts():
+    game_state = main.initialize_game('CIA', seed=3, array_world=True)
+    engine.play_game(game_state, simulate.greedy_policy, max_turns=15)
+    countries = game_state['countries'].to_countries()
+    for agency in gamedata.agency_names():
+        assert game_state['countries'].controlled_count(agency) == \
+            sum(data['influence'].get(agency, 0) >= world.CONTROL_INFLUENCE for data in countries.values())
@@ -0,0 +1,26 @@
+import pytest
+
+import engine
+import gamedata
+import main
+import simulate
+import worldgen
+
+@pytest.mark.parametrize('n_agencies', [2, 4, 5, 6, 9])
+def test_generated_countries_list_at_most_the_active_agencies(n_agencies):
+    agencies = worldgen.generate_agencies(n_agencies, seed=1)
+    countries = worldgen.generate_countries(50, agencies, seed=1)
+    assert len(countries) == 50
+    for data in countries.values():
+        assert set(data['influence']) <= set(agencies)
+        assert len(data['influence']) == min(len(agencies), worldgen.ACTIVE_AGENCIES_PER_COUNTRY)
+
+def test_generated_world_is_playable(tmp_path):
+    try:
+        gamedata.use_data_dir(worldgen.write_world(str(tmp_path), 30, 8, n_agencies=5, n_events=6))
+        game_state = main.initialize_game('CIA', seed=2)
+        for _ in range(5):
+            engine.play_turn(game_state, simulate.greedy_policy)
+        assert game_state['turn'] == 6
+    finally:
+        gamedata.use_data_dir(gamedata._data_dir())
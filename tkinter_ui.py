@@ -1,13 +1,342 @@
+import queue
+import threading
+from bisect import bisect_left
 import tkinter as tk
 from tkinter import messagebox, ttk
-import random
-import json
-import tkinter.font as tkFont
 
+import advisor
+import autosave
 import main
+import engine
+import eventlog
+import gamedata
 import operations
+import profiling
 import ai
 import events
+import changes
+
+# Oldest lines are dropped once the log widget holds more than this
+MAX_LOG_LINES = 2000
+
+# How often (ms) the UI checks for results from the turn worker thread (~60 fps)
+TURN_POLL_MS = 16
+MAX_FAST_FORWARD = 100
+
+# Suggestions listed in the Perform Operation dialog
+ADVISOR_TOP = 10
+
+# Influence report: rows on screen, rows per mouse-wheel step, and how long typing must
+# pause (ms) before the filters are re-applied
+INFLUENCE_ROWS = 25
+WHEEL_ROWS = 3
+FILTER_DELAY_MS = 250
+# After a turn, the report re-sorts fully only if more than 1/INCREMENTAL_SORT_SHARE of the
+# countries changed; fewer are moved one by one
+INCREMENTAL_SORT_SHARE = 64
+COUNTRY_COLUMN = "Country"
+# Country stat -> report column (influence.py reports stat changes by field name)
+STAT_COLUMNS = {'populism_risk': "Pop Risk", 'stability': "Stability"}
+
+class TkLogSink:
+    """
+    Event-log sink for the log Text widget. Events are buffered and only formatted
+    when flush() writes them all with a single insert, so a whole turn costs one redraw.
+    """
+    def __init__(self, text_widget, level=eventlog.DEBUG, max_lines=MAX_LOG_LINES):
+        self.text = text_widget
+        self.level = level
+        self.max_lines = max_lines
+        self.pending = []
+
+    def handle(self, event):
+        self.pending.append(event)
+
+    def flush(self):
+        if not self.pending:
+            return
+        lines = "".join(event.format() + "\n" for event in self.pending)
+        self.pending = []
+        self.text.insert(tk.END, lines)
+
+        line_count = int(self.text.index('end-1c').split('.')[0])
+        if line_count > self.max_lines:
+            self.text.delete('1.0', f"{line_count - self.max_lines + 1}.0")
+        self.text.see(tk.END)
+
+class InfluenceTable:
+    """
+    The rows of the influence report (one per country) in their current sort and filter order.
+    update() takes a changes.ChangeSet and recomputes just the changed countries' sort keys
+    and filter results. Re-sorting a list that is already almost in order is close to linear.
+
+    The table copies the numbers it shows when it is built (between turns) and afterwards
+    only learns about changes from the change sets _poll_turns hands over, so scrolling,
+    sorting and filtering never read the game_state while the turn worker is changing it.
+    """
+    def __init__(self, game_state):
+        self.agencies = tuple(gamedata.agency_names())
+        self.columns = (COUNTRY_COLUMN,) + self.agencies + tuple(STAT_COLUMNS.values())
+        # number column -> position in a country's values
+        self.column_index = {column: j for j, column in enumerate(self.columns[1:])}
+        self.values = {name: [data['influence'].get(agency, 0) for agency in self.agencies]
+                             + [data[field] for field in STAT_COLUMNS]
+                       for name, data in game_state['countries'].items()}
+        self.names = list(self.values)
+        self.sorted_names = self.names
+        self.order = self.names
+        self.sort_column = None
+        self.descending = False
+        self.sort_keys = None   # country -> sort_key(), while sorted by a number column
+        self.sorted_keys = None # sort_keys of sorted_names, in order
+        self.positions = None   # country -> place in map order
+        self.name_filter = ''
+        self.threshold = None   # (column, minimum)
+        self.keep = None        # country -> passes the filters, while filtering
+
+    def value(self, name, column):
+        if column == COUNTRY_COLUMN:
+            return name
+        return self.values[name][self.column_index[column]]
+
+    def column_values(self, column):
+        """One number column for every country, in map order."""
+        j = self.column_index[column]
+        return [values[j] for values in self.values.values()]
+
+    def row(self, name):
+        return (name,) + tuple(self.values[name])
+
+    def sort_by(self, column):
+        """Sorts by column, flipping the direction if it already was the sort column."""
+        self.descending = not self.descending if column == self.sort_column else column != COUNTRY_COLUMN
+        self.sort_column = column
+        if column == COUNTRY_COLUMN:
+            # Names never change, so there are no keys to keep up to date
+            self.sort_keys = None
+            self.sorted_names = sorted(self.names, reverse=self.descending)
+        else:
+            if self.positions is None:
+                self.positions = {name: i for i, name in enumerate(self.names)}
+            sign = -1 if self.descending else 1
+            self.sort_keys = {name: (sign * value, i)
+                              for i, (name, value) in enumerate(zip(self.names, self.column_values(column)))}
+            self.sorted_names = sorted(self.names, key=self.sort_keys.__getitem__)
+            self.sorted_keys = [self.sort_keys[name] for name in self.sorted_names]
+        self._apply_filters()
+
+    def sort_key(self, name):
+        # Unique keys (ties broken by map order), so a country can be found again by bisection
+        value = self.value(name, self.sort_column)
+        return (-value if self.descending else value, self.positions[name])
+
+    def set_filters(self, name_filter='', threshold=None):
+        """name_filter: case-insensitive part of the country name; threshold: (column, minimum) or None."""
+        self.name_filter = name_filter.casefold()
+        self.threshold = threshold
+        if self.name_filter or self.threshold:
+            passes = [True] * len(self.names)
+            if self.name_filter:
+                passes = [self.name_filter in name.casefold() for name in self.names]
+            if self.threshold:
+                column, minimum = self.threshold
+                passes = [ok and value >= minimum for ok, value in zip(passes, self.column_values(column))]
+            self.keep = dict(zip(self.names, passes))
+        else:
+            self.keep = None
+        self._apply_filters()
+
+    def passes(self, name):
+        if self.name_filter and self.name_filter not in name.casefold():
+            return False
+        if self.threshold:
+            column, minimum = self.threshold
+            return self.value(name, column) >= minimum
+        return True
+
+    def _apply_filters(self):
+        if self.keep is None:
+            self.order = self.sorted_names
+        else:
+            keep = self.keep
+            self.order = [name for name in self.sorted_names if keep[name]]
+
+    def update(self, change_set):
+        """Takes in a changes.ChangeSet and returns the countries that changed."""
+        countries = change_set.countries
+        if not countries:
+            return countries
+        columns = set()
+        column_index = self.column_index
+        for country, record in countries.items():
+            values = self.values[country]
+            for agency, (_, new) in record.get('influence', {}).items():
+                if agency in column_index:
+                    values[column_index[agency]] = new
+            for field, column in STAT_COLUMNS.items():
+                if field in record:
+                    values[column_index[column]] = record[field][1]
+            columns.update(record.get('influence', ()))
+            columns.update(STAT_COLUMNS[field] for field in record if field in STAT_COLUMNS)
+
+        reorder = False
+        if self.sort_keys is not None and self.sort_column in columns:
+            self._resort(countries)
+            reorder = True
+        if self.threshold and self.threshold[0] in columns:
+            for country in countries:
+                self.keep[country] = self.passes(country)
+            reorder = True
+        if reorder:
+            self._apply_filters()
+        return countries
+
+    def _resort(self, countries):
+        keys, names, sorted_keys = self.sort_keys, self.sorted_names, self.sorted_keys
+        if len(countries) * INCREMENTAL_SORT_SHARE > len(names):
+            for country in countries:
+                keys[country] = self.sort_key(country)
+            names.sort(key=keys.__getitem__)
+            sorted_keys[:] = [keys[name] for name in names]
+            return
+        # A few changes: move each country from its old place to its new one
+        for country in countries:
+            old, new = keys[country], self.sort_key(country)
+            if old == new:
+                continue
+            i = bisect_left(sorted_keys, old)
+            del sorted_keys[i], names[i]
+            i = bisect_left(sorted_keys, new)
+            sorted_keys.insert(i, new)
+            names.insert(i, country)
+            keys[country] = new
+
+class InfluenceWindow:
+    """
+    The influence report: a ttk.Treeview holding only INFLUENCE_ROWS items, whatever the
+    number of countries. Scrolling, sorting and filtering change which countries those
+    items show, and refresh() (after every turn or action) rewrites only rows whose
+    country changed or moved, so opening and updating cost the same on any map size.
+    """
+    def __init__(self, root, game_state, on_close=None):
+        self.table = InfluenceTable(game_state)
+        self.on_close = on_close
+        self.top = 0
+        self.filter_job = None
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Global Influence")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        filter_frame = tk.Frame(self.window)
+        filter_frame.pack(fill="x", padx=10, pady=(10, 0))
+        tk.Label(filter_frame, text="Country:").pack(side="left")
+        self.name_var = tk.StringVar()
+        name_entry = tk.Entry(filter_frame, textvariable=self.name_var, width=20)
+        name_entry.pack(side="left", padx=(2, 10))
+        tk.Label(filter_frame, text="Min").pack(side="left")
+        self.threshold_column = tk.StringVar(value=self.table.columns[1])
+        ttk.Combobox(filter_frame, textvariable=self.threshold_column, values=self.table.columns[1:],
+                     state="readonly", width=12).pack(side="left", padx=2)
+        self.threshold_var = tk.StringVar()
+        threshold_entry = tk.Entry(filter_frame, textvariable=self.threshold_var, width=6)
+        threshold_entry.pack(side="left", padx=2)
+        for entry in (name_entry, threshold_entry):
+            entry.bind("<KeyRelease>", self.schedule_filter)
+        self.threshold_column.trace_add("write", self.schedule_filter)
+
+        body = tk.Frame(self.window)
+        body.pack(fill="both", expand=True, padx=10, pady=5)
+        self.tree = ttk.Treeview(body, columns=self.table.columns, show="headings",
+                                 height=INFLUENCE_ROWS, selectmode="none")
+        for column in self.table.columns:
+            self.tree.heading(column, text=column, command=lambda column=column: self.sort_by(column))
+            if column == COUNTRY_COLUMN:
+                self.tree.column(column, width=160, anchor="w")
+            else:
+                self.tree.column(column, width=max(60, 9 * len(column)), anchor="e")
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self.on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.items = [self.tree.insert('', 'end', values=()) for _ in range(INFLUENCE_ROWS)]
+        self.shown = [None] * INFLUENCE_ROWS
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_wheel)
+
+        self.status = tk.Label(self.window, text="", anchor="w")
+        self.status.pack(fill="x", padx=10, pady=(0, 10))
+        self.redraw()
+
+    def lift(self):
+        self.window.deiconify()
+        self.window.lift()
+
+    def close(self):
+        self.window.destroy()
+        if self.on_close:
+            self.on_close()
+
+    def refresh(self, change_set):
+        changed = self.table.update(change_set)
+        if changed:
+            self.redraw(changed)
+
+    def redraw(self, changed=()):
+        order = self.table.order
+        self.top = max(0, min(self.top, len(order) - INFLUENCE_ROWS))
+        for i, item in enumerate(self.items):
+            index = self.top + i
+            name = order[index] if index < len(order) else None
+            if name != self.shown[i] or name in changed:
+                self.tree.item(item, values=self.table.row(name) if name is not None else ())
+                self.shown[i] = name
+
+        if order:
+            self.scrollbar.set(self.top / len(order), min(1.0, (self.top + INFLUENCE_ROWS) / len(order)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self.status.config(text=f"{len(order)} of {len(self.table.names)} countries")
+
+    def on_scroll(self, action, amount, units=None):
+        if action == "moveto":
+            self.top = int(float(amount) * len(self.table.order))
+        elif units == "pages":
+            self.top += int(amount) * (INFLUENCE_ROWS - 1)
+        else:
+            self.top += int(amount)
+        self.redraw()
+
+    def on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.on_scroll("scroll", -WHEEL_ROWS)
+        else:
+            self.on_scroll("scroll", WHEEL_ROWS)
+        return "break"
+
+    def sort_by(self, column):
+        self.table.sort_by(column)
+        arrow = " ▼" if self.table.descending else " ▲"
+        for name in self.table.columns:
+            self.tree.heading(name, text=name + (arrow if name == column else ""))
+        self.top = 0
+        self.redraw()
+
+    def schedule_filter(self, *args):
+        # Typing re-filters once the keys stop, not on every key press
+        if self.filter_job:
+            self.window.after_cancel(self.filter_job)
+        self.filter_job = self.window.after(FILTER_DELAY_MS, self.apply_filters)
+
+    def apply_filters(self):
+        self.filter_job = None
+        try:
+            threshold = (self.threshold_column.get(), int(self.threshold_var.get()))
+        except ValueError:
+            threshold = None
+        self.table.set_filters(self.name_var.get().strip(), threshold)
+        self.top = 0
+        self.redraw()
 
 class DeepStateApp:
     def __init__(self, root):
@@ -16,14 +345,25 @@ class DeepStateApp:
 
         self.selected_agency = None
         self.game_state = None
+        self.autosave = None
+        self.influence_window = None
+        self.changes = None
+
+        # Turn processing runs on a worker thread and reports back through this queue
+        self.turn_thread = None
+        self.turn_queue = queue.Queue()
+        self.cancel_turns = threading.Event()
+        self.turn_outcome = None
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
 
         # 1) Agency selection
         self.agency_frame = tk.Frame(self.root)
         self.agency_frame.pack(pady=10)
 
         tk.Label(self.agency_frame, text="Select Your Agency:").pack()
-        self.agency_var = tk.StringVar(value="CIA")
-        for ag in ["CIA", "Mossad", "MSS", "FSB"]:
+        agency_names = gamedata.agency_names()
+        self.agency_var = tk.StringVar(value=agency_names[0])
+        for ag in agency_names:
             rb = tk.Radiobutton(self.agency_frame, text=ag, variable=self.agency_var, value=ag)
             rb.pack(anchor="w")
 
@@ -40,32 +380,28 @@ class DeepStateApp:
         self.agency_frame.destroy()
 
         # Build initial game state
-        countries_data = main.load_countries()
-        resources = main.get_starting_resources(self.selected_agency)
-        self.game_state = {
-            'turn': 1,
-            'agency': self.selected_agency,
-            'countries': countries_data,
-            'budget': resources['budget'],
-            'political_capital': resources['political_capital'],
-            'research_points': 0,
-            'visibility': 5,
-            'agents': 1,
-            'agents_used': 0,
-            'visibility_tracker': {
-                'CIA': 20,
-                'Mossad': 10,
-                'MSS': 5,
-                'FSB': 10
-            },
-            'ai_resources': main.initialize_ai_resources(self.selected_agency),
-            'researched_techs': []
-        }
+        self.game_state = main.initialize_game(self.selected_agency)
+        # What each turn or action changed, for refreshing views without rescanning the world
+        self.changes = changes.track(self.game_state)
+
+        # Per-turn saves are journaled on a background thread
+        self.autosave = autosave.AutosaveWriter()
+        self.autosave.start(self.game_state)
 
         self.main_frame.pack(padx=10, pady=10)
         self.update_labels()
         self.log(f"Game started as {self.selected_agency}.")
 
+    def quit(self):
+        """Stops any running turns, flushes pending autosaves, then closes the window."""
+        if self.turn_thread:
+            self.cancel_turns.set()
+            self.turn_thread.join()
+            self.turn_thread = None
+        if self.autosave:
+            self.autosave.close()
+        self.root.destroy()
+
     def create_main_ui(self):
         """
         Sets up all widgets in the main UI, but doesn't show them
@@ -102,37 +438,66 @@ class DeepStateApp:
         button_frame = tk.Frame(self.main_frame)
         button_frame.pack(pady=5)
 
-        tk.Button(button_frame, text="Perform Operation", command=self.perform_operation_dialog).grid(row=0, column=0, padx=5, pady=2)
-        tk.Button(button_frame, text="Research Tech", command=self.research_tech_dialog).grid(row=0, column=1, padx=5, pady=2)
-        tk.Button(button_frame, text="Buy Agent", command=self.buy_agent).grid(row=1, column=0, padx=5, pady=2)
-        tk.Button(button_frame, text="View Visibility", command=self.view_visibility).grid(row=1, column=1, padx=5, pady=2)
-        tk.Button(button_frame, text="View Influence", command=self.view_influence).grid(row=2, column=0, padx=5, pady=2)
-        tk.Button(button_frame, text="End Turn", command=self.end_turn).grid(row=2, column=1, padx=5, pady=2)
+        # Buttons that touch the game state are disabled while turns are processed
+        self.action_buttons = []
+        for text, command, row, column in [
+            ("Perform Operation", self.perform_operation_dialog, 0, 0),
+            ("Research Tech", self.research_tech_dialog, 0, 1),
+            ("Buy Agent", self.buy_agent, 1, 0),
+            ("View Visibility", self.view_visibility, 1, 1),
+            ("View Influence", self.view_influence, 2, 0),
+            ("End Turn", self.end_turn, 2, 1),
+        ]:
+            btn = tk.Button(button_frame, text=text, command=command)
+            btn.grid(row=row, column=column, padx=5, pady=2)
+            self.action_buttons.append(btn)
         tk.Button(button_frame, text="Victory Conditions", command=self.show_victory_conditions).grid(row=3, column=0, columnspan=2, pady=2)
 
+        # Fast-forward: end several turns in a row without acting
+        ff_frame = tk.Frame(self.main_frame)
+        ff_frame.pack(pady=2)
+        self.ff_var = tk.StringVar(value="5")
+        self.ff_spinbox = tk.Spinbox(ff_frame, from_=1, to=MAX_FAST_FORWARD, width=4, textvariable=self.ff_var)
+        self.ff_spinbox.pack(side="left")
+        ff_btn = tk.Button(ff_frame, text="Fast-Forward Turns", command=self.fast_forward)
+        ff_btn.pack(side="left", padx=5)
+        self.action_buttons.extend([self.ff_spinbox, ff_btn])
+
+        # Turn progress
+        self.progress = ttk.Progressbar(self.main_frame, length=300)
+        self.progress.pack(pady=2)
+        self.progress_label = tk.Label(self.main_frame, text="")
+        self.progress_label.pack()
+
         # Log text area
         self.log_text = tk.Text(self.main_frame, width=110, height=10, wrap="none")
         self.log_text.pack(pady=5)
+        self.log_sink = TkLogSink(self.log_text)
+        self.events = eventlog.EventLog([self.log_sink])
 
     def update_labels(self):
         """Refresh resource/turn/agent labels from game_state."""
         if not self.game_state:
             return
-        gs = self.game_state
-        self.budget_label.config(text=f"Budget: {gs['budget']}")
-        self.capital_label.config(text=f"Political Capital: {gs['political_capital']}")
-        self.research_label.config(text=f"Research Points: {gs['research_points']}")
-        self.visibility_label.config(text=f"Visibility: {gs['visibility']}%")
-        self.turn_label.config(text=f"Turn: {gs['turn']}")
-
-        total_agents = gs['agents']
-        available_agents = total_agents - gs['agents_used']
+        self.show_labels(label_values(self.game_state))
+        self.refresh_influence(self.changes.take())
+
+    def show_labels(self, values):
+        """Refresh the labels from a label_values() snapshot (safe while a turn is running)."""
+        self.budget_label.config(text=f"Budget: {values['budget']}")
+        self.capital_label.config(text=f"Political Capital: {values['political_capital']}")
+        self.research_label.config(text=f"Research Points: {values['research_points']}")
+        self.visibility_label.config(text=f"Visibility: {values['visibility']}%")
+        self.turn_label.config(text=f"Turn: {values['turn']}")
+
+        total_agents = values['agents']
+        available_agents = total_agents - values['agents_used']
         self.total_agents_label.config(text=f"Total Agents: {total_agents}")
         self.available_agents_label.config(text=f"Available Agents: {available_agents}")
 
     def log(self, msg):
-        self.log_text.insert(tk.END, msg + "\n")
-        self.log_text.see(tk.END)
+        self.events.emit('message', text=msg)
+        self.log_sink.flush()
 
     # --------------------------------------------------
     # Show Victory Conditions
@@ -195,47 +560,37 @@ class DeepStateApp:
 
         tk.Button(dialog, text="Confirm", command=on_confirm).grid(row=3, column=0, columnspan=2, pady=10)
 
-    def perform_operation(self, op_name, country_name):
-        gs = self.game_state
-        if gs['agents_used'] >= gs['agents']:
-            self.log("All agents used this turn.")
+        # Advisor: the best-scoring (operation, country) pairs; picking one fills in the boxes above
+        if not advisor.available():
             return
+        suggestions = advisor.advise(self.game_state, ADVISOR_TOP)
+        if not suggestions:
+            return  # nothing affordable, or no agent left this turn
+        tk.Label(dialog, text="Advisor (best moves):").grid(row=4, column=0, columnspan=2, padx=5, sticky="w")
+        advice_box = tk.Listbox(dialog, width=60, height=len(suggestions))
+        advice_box.grid(row=5, column=0, columnspan=2, padx=5, pady=5)
+        for op_name, country_name, score in suggestions:
+            advice_box.insert(tk.END, f"{op_name} in {country_name}  (score {score:+.0f})")
+
+        def on_advice_select(event):
+            selection = advice_box.curselection()
+            if not selection:
+                return
+            op_name, country_name, _ = suggestions[selection[0]]
+            op_var.set(op_name)
+            country_var.set(country_name)
+            on_op_select(None)
+
+        advice_box.bind("<<ListboxSelect>>", on_advice_select)
 
-        op_data = operations.OPERATIONS[op_name]
-        if gs['budget'] < op_data['budget'] or gs['political_capital'] < op_data['capital']:
-            self.log("Not enough budget or political capital.")
+    def perform_operation(self, op_name, country_name):
+        if self.turn_thread:
+            self.log("Wait for the turn to finish.")
             return
-
-        gs['budget'] -= op_data['budget']
-        gs['political_capital'] -= op_data['capital']
-
-        msg = f"Performing {op_name} in {country_name}... "
-        success = (random.random() < op_data['success_chance'])
-
-        if success:
-            msg += "Success! "
-            gs['countries'][country_name]['influence'][gs['agency']] += op_data['influence_gain']
-            gs['countries'][country_name]['populism_risk'] += op_data.get('populism_change', 0)
-            gs['countries'][country_name]['stability'] += op_data.get('stability_change', 0)
-            self._reduce_rival_influence(country_name, op_data['rival_influence_loss'])
-            vis_increase = op_data.get('visibility_increase', 2)
-        else:
-            msg += "Failed! Extra attention drawn. "
-            vis_increase = op_data.get('visibility_increase', 2) * 2
-
-        gs['visibility'] += vis_increase
-        gs['agents_used'] += 1
-        msg += f"Visibility +{vis_increase}, now {gs['visibility']}%."
-
+        performed, msg = engine.apply_action(self.game_state, ("operation", op_name, country_name))
         self.log(msg)
         self.update_labels()
 
-    def _reduce_rival_influence(self, country_name, amt):
-        for rival in ["CIA", "Mossad", "MSS", "FSB"]:
-            if rival != self.game_state['agency']:
-                current = self.game_state['countries'][country_name]['influence'][rival]
-                self.game_state['countries'][country_name]['influence'][rival] = max(0, current - amt)
-
     # --------------------------------------------------
     # RESEARCH TECH
     # --------------------------------------------------
@@ -247,11 +602,7 @@ class DeepStateApp:
         dialog.title("Research Tech")
         dialog.geometry("400x200")
 
-        with open('data/tech_tree.json','r') as f:
-            tech_tree = json.load(f)
-
-        available_techs = {name: data for name, data in tech_tree.items()
-                           if name not in self.game_state['researched_techs']}
+        available_techs = main.research_technology(self.game_state)
 
         if not available_techs:
             messagebox.showinfo("Research", "All technologies have been researched.")
@@ -282,19 +633,15 @@ class DeepStateApp:
 
         def on_confirm():
             chosen_tech = tech_var.get()
-            cost = available_techs[chosen_tech]['cost']
-            reduction = available_techs[chosen_tech]['visibility_reduction']
-
-            if self.game_state['research_points'] < cost:
-                self.log("Not enough research points.")
-            else:
-                old_vis = self.game_state['visibility']
-                new_vis = max(0, old_vis - reduction)
-                self.game_state['visibility'] = new_vis
-                self.game_state['research_points'] -= cost
-                self.game_state['researched_techs'].append(chosen_tech)
-                msg = f"{chosen_tech} researched! Visibility -{reduction}, from {old_vis}% to {new_vis}%."
-                self.log(msg)
+            if self.turn_thread:
+                self.log("Wait for the turn to finish.")
+                dialog.destroy()
+                return
+            old_vis = self.game_state['visibility']
+            researched, msg = engine.apply_action(self.game_state, ("research", chosen_tech))
+            if researched:
+                msg += f" (from {old_vis}% to {self.game_state['visibility']}%)"
+            self.log(msg)
 
             self.update_labels()
             dialog.destroy()
@@ -307,7 +654,7 @@ class DeepStateApp:
     def buy_agent(self):
         if not self.game_state:
             return
-        can_buy, msg = main.buy_agent(self.game_state)
+        can_buy, msg = engine.apply_action(self.game_state, ("buy_agent",))
         self.log(msg)
         self.update_labels()
 
@@ -328,97 +675,139 @@ class DeepStateApp:
         messagebox.showinfo("Visibility", "\n".join(lines))
 
     # --------------------------------------------------
-    # VIEW INFLUENCE - Use a Toplevel with monospaced font
+    # VIEW INFLUENCE - stays open and is refreshed after every turn and action
     # --------------------------------------------------
     def view_influence(self):
         if not self.game_state:
             return
+        if self.influence_window:
+            self.influence_window.lift()
+            return
+        self.influence_window = InfluenceWindow(self.root, self.game_state, on_close=self.influence_closed)
 
-        # We'll create a new Toplevel with a Text widget, using monospaced font
-        inf_win = tk.Toplevel(self.root)
-        inf_win.title("Global Influence")
-
-        text_area = tk.Text(inf_win, width=80, height=10)
-        text_area.pack(padx=10, pady=10)
-
-        # Configure a monospaced font (Courier)
-        font_mono = tkFont.Font(family="Courier", size=10)
-        text_area.configure(font=font_mono)
-
-        # Build our lines with careful spacing
-        lines = []
-        lines.append("--- Global Influence Report ---\n")
-
-        # Let's do right-aligned for numeric columns
-        # We'll do: Country(12, left) CIA(4, right) Mossad(5, right) MSS(4) FSB(4) PopRisk(6) Stability(6)
-        # We'll try to keep them within 80 columns total
-        header = f"{'Country':<12}{'CIA':>4}{'Mossad':>6}{'MSS':>5}{'FSB':>5}{'PopR':>6}{'Stab':>6}"
-        lines.append(header)
+    def influence_closed(self):
+        # The change tracker belongs to the game; turns and saves still use it
+        self.influence_window = None
 
-        gs = self.game_state
-        for country, data in gs['countries'].items():
-            inf = data['influence']
-            pop_risk = data['populism_risk']
-            stab = data['stability']
-            # Right align for numbers with :>4, etc.
-            line = (f"{country:<12}"
-                    f"{inf['CIA']:>4}"
-                    f"{inf['Mossad']:>6}"
-                    f"{inf['MSS']:>5}"
-                    f"{inf['FSB']:>5}"
-                    f"{pop_risk:>6}"
-                    f"{stab:>6}")
-            lines.append(line)
-
-        # Insert lines into the text widget
-        for ln in lines:
-            text_area.insert(tk.END, ln + "\n")
-
-        text_area.config(state=tk.DISABLED)  # make read-only
+    def refresh_influence(self, change_set):
+        if self.influence_window:
+            self.influence_window.refresh(change_set)
 
     # --------------------------------------------------
-    # END TURN
+    # END TURN / FAST-FORWARD
+    # Turns run on a worker thread; root.after polls for results so the window stays responsive.
     # --------------------------------------------------
     def end_turn(self):
-        if not self.game_state:
-            return
-
-        # Rival turn w/ log callback
-        ai.rival_turn(self.game_state, log_callback=self.log)
+        self.run_turns(1)
 
-        # Global events w/ log callback
-        events.global_events(self.game_state, log_callback=self.log)
-
-        # Award country rewards
-        main.award_country_rewards(self.game_state)
-
-        # Check win conditions
-        won, msg = main.check_win_conditions(self.game_state)
-        if won:
-            messagebox.showinfo("Victory!", msg)
-            self.root.destroy()
+    def fast_forward(self):
+        try:
+            count = int(self.ff_var.get())
+        except ValueError:
             return
+        self.run_turns(max(1, min(count, MAX_FAST_FORWARD)))
 
-        # Increase resources
-        self.game_state['turn'] += 1
-        self.game_state['budget'] += 50
-        self.game_state['political_capital'] += 5
-        self.game_state['research_points'] += 3
-        self.game_state['visibility'] += 1
-
-        # Check for exposure
-        if self.game_state['visibility'] >= 100:
-            messagebox.showinfo("Game Over", "Your agency has been exposed!")
-            self.root.destroy()
+    def run_turns(self, count):
+        if not self.game_state or self.turn_thread:
             return
 
-        # Reset agents
-        self.game_state['agents_used'] = 0
+        self.set_input_locked(True)
+        if count == 1:
+            self.progress.config(mode="indeterminate")
+            self.progress.start(10)
+        else:
+            self.progress.config(mode="determinate", maximum=count, value=0)
+        self.progress_label.config(text=f"Processing turn 1/{count}...")
+
+        self.cancel_turns.clear()
+        self.turn_outcome = None
+        self.turn_thread = threading.Thread(target=self._turn_worker, args=(count,), daemon=True)
+        self.turn_thread.start()
+        self.root.after(TURN_POLL_MS, self._poll_turns)
+
+    def _turn_worker(self, count):
+        """Worker thread: runs the turns and posts events and label snapshots to turn_queue."""
+        sink = eventlog.MemorySink(self.log_sink.level)
+        turn_log = eventlog.EventLog([sink])
+        try:
+            for done in range(1, count + 1):
+                outcome, msg = engine.end_turn(self.game_state, log_callback=turn_log)
+                change_set = self.changes.take()
+                if outcome:
+                    self.turn_queue.put(('turn', done, count, sink.events, label_values(self.game_state), change_set))
+                    self.turn_queue.put(('outcome', outcome, msg))
+                    return
+
+                with profiling.phase('save'):
+                    self.autosave.submit(self.game_state)
+                turn_log.emit('message', text=msg)
+                self.turn_queue.put(('turn', done, count, sink.events, label_values(self.game_state), change_set))
+                sink.events = []
+                if self.cancel_turns.is_set():
+                    return
+        except Exception as e:
+            self.turn_queue.put(('error', f"Turn processing failed: {e}"))
+        finally:
+            self.turn_queue.put(('done',))
+
+    def _poll_turns(self):
+        finished = False
+        try:
+            while True:
+                item = self.turn_queue.get_nowait()
+                if item[0] == 'turn':
+                    _, done, count, turn_events, values, change_set = item
+                    for event in turn_events:
+                        self.log_sink.handle(event)
+                    self.show_labels(values)
+                    self.refresh_influence(change_set)
+                    if count > 1:
+                        self.progress.config(value=done)
+                        self.progress_label.config(text=f"Processing turn {min(done + 1, count)}/{count}...")
+                elif item[0] == 'outcome':
+                    self.turn_outcome = item[1:]
+                elif item[0] == 'error':
+                    self.events.emit('message', text=item[1])
+                elif item[0] == 'done':
+                    finished = True
+                    break
+        except queue.Empty:
+            pass
+        self.log_sink.flush()
+
+        if finished:
+            self._finish_turns()
+        else:
+            self.root.after(TURN_POLL_MS, self._poll_turns)
+
+    def _finish_turns(self):
+        self.turn_thread.join()
+        self.turn_thread = None
+        self.progress.stop()
+        self.progress.config(mode="determinate", value=0)
+        self.progress_label.config(text="")
+
+        if self.turn_outcome:
+            outcome, msg = self.turn_outcome
+            if outcome == 'win':
+                messagebox.showinfo("Victory!", msg)
+            else:
+                messagebox.showinfo("Game Over", msg)
+            self.quit()
+            return
 
-        # Save & update
-        main.save_game(self.game_state)
+        self.set_input_locked(False)
         self.update_labels()
-        self.log(f"End of Turn {self.game_state['turn'] - 1}. Starting Turn {self.game_state['turn']}.")
+
+    def set_input_locked(self, locked):
+        state = tk.DISABLED if locked else tk.NORMAL
+        for widget in self.action_buttons:
+            widget.config(state=state)
+
+def label_values(game_state):
+    """The handful of numbers the main labels show, copied out of game_state."""
+    return {key: game_state[key] for key in
+            ('budget', 'political_capital', 'research_points', 'visibility', 'turn', 'agents', 'agents_used')}
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,270 @@
+"""
+Optional NumPy struct-of-arrays world.
+Holds every country's influence as one (countries x agencies) matrix plus stability,
+populism_risk and reward vectors, so rewards, leaders and domination checks run as
+vectorized masks instead of per-country dict walks.
+
+ArrayWorld behaves like the usual game_state['countries'] dict (country -> record with
+an 'influence' dict), so the rest of the game keeps working unchanged, and it converts
+losslessly back to the plain dict layout for saving.
+"""
+from collections.abc import MutableMapping
+
+from records import AgencyRecord
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; plain dict worlds don't need it
+    np = None
+
+# Numeric per-country columns, in the order they appear in data/countries.json
+COUNTRY_FIELDS = ('stability', 'populism_risk', 'budget_reward', 'capital_reward')
+
+# Thresholds shared with main.award_country_rewards / main.check_global_domination
+MAX_POPULISM_FOR_REWARD = 50
+MIN_STABILITY_FOR_REWARD = 50
+CONTROL_INFLUENCE = 80
+
+class ArrayWorld(MutableMapping):
+    _shared = False  # True while the arrays may still be shared with a fork
+
+    def __init__(self, names, agencies, influence, columns, influence_present=None,
+                 field_present=None, key_order=None, extras=None):
+        if np is None:
+            raise ImportError("ArrayWorld requires NumPy (pip install numpy).")
+        self.names = list(names)
+        self.agencies = list(agencies)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.agency_index = {agency: j for j, agency in enumerate(self.agencies)}
+        self.influence = influence
+        self.columns = columns
+        # Masks remembering which keys each country really had, so conversion back is exact
+        self.influence_present = influence_present
+        self.field_present = field_present or {}
+        self.key_order = key_order or ('stability', 'influence') + COUNTRY_FIELDS[1:]
+        self.extras = extras or {}
+
+    # --------------------------------------------------
+    # Conversion to/from the dict layout
+    # --------------------------------------------------
+    @classmethod
+    def from_countries(cls, countries, agencies=None):
+        """Builds an ArrayWorld from a game_state['countries'] style dict."""
+        if np is None:
+            raise ImportError("ArrayWorld requires NumPy (pip install numpy).")
+        names = list(countries)
+        if agencies is None:
+            agencies = []
+            for data in countries.values():
+                for agency in data['influence']:
+                    if agency not in agencies:
+                        agencies.append(agency)
+        agency_index = {agency: j for j, agency in enumerate(agencies)}
+
+        influence = np.zeros((len(names), len(agencies)), dtype=np.int64)
+        influence_present = np.zeros(influence.shape, dtype=bool)
+        columns = {field: np.zeros(len(names), dtype=np.int64) for field in COUNTRY_FIELDS}
+        field_present = {field: np.ones(len(names), dtype=bool) for field in COUNTRY_FIELDS}
+        key_order = tuple(next(iter(countries.values()))) if countries else None
+        extras = {}
+
+        for i, data in enumerate(countries.values()):
+            row = influence[i]
+            present = influence_present[i]
+            for agency, value in data['influence'].items():
+                j = agency_index[agency]
+                row[j] = value
+                present[j] = True
+            for field in COUNTRY_FIELDS:
+                if field in data:
+                    columns[field][i] = data[field]
+                else:
+                    field_present[field][i] = False
+            extra = {key: value for key, value in data.items()
+                     if key != 'influence' and key not in COUNTRY_FIELDS}
+            if extra or tuple(data) != key_order:
+                extras[names[i]] = (tuple(data), extra)
+
+        return cls(names, agencies, influence, columns, influence_present,
+                   field_present, key_order, extras)
+
+    def country_dict(self, i):
+        """Returns country i in the plain dict layout."""
+        name = self.names[i]
+        key_order, extra = self.extras.get(name, (self.key_order, {}))
+        present = self.influence_present[i]
+        values = self.influence[i].tolist()
+        data = {}
+        for key in key_order:
+            if key == 'influence':
+                data['influence'] = {agency: values[j] for j, agency in enumerate(self.agencies) if present[j]}
+            elif key in self.columns:
+                if self.field_present[key][i]:
+                    data[key] = self.columns[key][i].item()
+            else:
+                data[key] = extra[key]
+        return data
+
+    def to_countries(self):
+        """Converts back to the game_state['countries'] dict layout (what save files hold)."""
+        return {name: self.country_dict(i) for i, name in enumerate(self.names)}
+
+    def fork(self):
+        """
+        Copy for a forked game (see forking.py). Names and indexes are shared for good, the
+        arrays until either game first changes a country: that game then copies all of them
+        (see _writable), so copy-on-write here is per world, not per country as in CowCountries.
+        """
+        self._shared = True
+        child = object.__new__(ArrayWorld)
+        child.__dict__.update(self.__dict__)
+        return child
+
+    def _writable(self):
+        """Returns self after giving it its own arrays if they are still shared with a fork."""
+        if self._shared:
+            self.influence = self.influence.copy()
+            if self.influence_present is not None:
+                self.influence_present = self.influence_present.copy()
+            self.columns = {field: column.copy() for field, column in self.columns.items()}
+            self.field_present = {field: mask.copy() for field, mask in self.field_present.items()}
+            self._shared = False
+        return self
+
+    # --------------------------------------------------
+    # Dict-compatible access
+    # --------------------------------------------------
+    def __getitem__(self, name):
+        return CountryView(self, self.index[name])
+
+    def __setitem__(self, name, data):
+        i = self.index[name]  # the set of countries is fixed once the world is built
+        view = CountryView(self, i)
+        for key, value in data.items():
+            view[key] = value
+
+    def __delitem__(self, name):
+        raise TypeError("Countries cannot be removed from an ArrayWorld.")
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    # --------------------------------------------------
+    # Vectorized game rules
+    # --------------------------------------------------
+    def leader_indices(self):
+        """Column index of each country's leading agency (ties go to the earliest agency, like max())."""
+        masked = np.where(self.influence_present, self.influence, np.iinfo(np.int64).min)
+        return masked.argmax(axis=1)
+
+    def reward_mask(self):
+        """Countries stable and non-populist enough to pay rewards."""
+        return ((self.columns['populism_risk'] <= MAX_POPULISM_FOR_REWARD)
+                & (self.columns['stability'] >= MIN_STABILITY_FOR_REWARD))
+
+    def award_rewards(self, game_state):
+        """Vectorized main.award_country_rewards."""
+        eligible = self.reward_mask()
+        leaders = self.leader_indices()[eligible]
+        n = len(self.agencies)
+        led = np.bincount(leaders, minlength=n)
+        budget = np.bincount(leaders, weights=self.columns['budget_reward'][eligible], minlength=n)
+        capital = np.bincount(leaders, weights=self.columns['capital_reward'][eligible], minlength=n)
+
+        for j in np.flatnonzero(led).tolist():
+            agency = self.agencies[j]
+            budget_gain, capital_gain = int(budget[j]), int(capital[j])
+            if agency == game_state['agency']:
+                game_state['budget'] += budget_gain
+                game_state['political_capital'] += capital_gain
+            else:
+                if agency not in game_state['ai_resources']:
+                    game_state['ai_resources'][agency] = AgencyRecord()
+                game_state['ai_resources'][agency]['budget'] += budget_gain
+                game_state['ai_resources'][agency]['political_capital'] += capital_gain
+
+    def controlled_count(self, agency, threshold=CONTROL_INFLUENCE):
+        """Number of countries where `agency` has at least `threshold` influence."""
+        j = self.agency_index.get(agency)
+        if j is None:
+            return 0
+        return int(np.count_nonzero((self.influence[:, j] >= threshold) & self.influence_present[:, j]))
+
+class CountryView(MutableMapping):
+    """Dict-like view of one ArrayWorld row, e.g. world['USA']['stability'] += 5."""
+    __slots__ = ('_world', '_i')
+
+    def __init__(self, world, i):
+        self._world = world
+        self._i = i
+
+    def _keys(self):
+        name = self._world.names[self._i]
+        key_order = self._world.extras.get(name, (self._world.key_order, {}))[0]
+        return [key for key in key_order
+                if key not in self._world.columns or self._world.field_present[key][self._i]]
+
+    def __getitem__(self, key):
+        world = self._world
+        if key == 'influence':
+            return InfluenceView(world, self._i)
+        if key in world.columns:
+            if not world.field_present[key][self._i]:
+                raise KeyError(key)
+            return world.columns[key][self._i].item()
+        return world.extras.get(world.names[self._i], ((), {}))[1][key]
+
+    def __setitem__(self, key, value):
+        world = self._world
+        if key == 'influence':
+            view = InfluenceView(world, self._i)
+            for agency, amount in value.items():
+                view[agency] = amount
+        elif key in world.columns:
+            world._writable()
+            world.columns[key][self._i] = value
+            world.field_present[key][self._i] = True
+        else:
+            raise KeyError(f"ArrayWorld countries have no '{key}' field.")
+
+    def __delitem__(self, key):
+        raise TypeError("Fields cannot be removed from an ArrayWorld country.")
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+class InfluenceView(MutableMapping):
+    """Dict-like view of one country's influence row (agency -> influence)."""
+    __slots__ = ('_world', '_i')
+
+    def __init__(self, world, i):
+        self._world = world
+        self._i = i
+
+    def __getitem__(self, agency):
+        j = self._world.agency_index.get(agency)
+        if j is None or not self._world.influence_present[self._i, j]:
+            raise KeyError(agency)
+        return self._world.influence[self._i, j].item()
+
+    def __setitem__(self, agency, value):
+        j = self._world.agency_index[agency]
+        world = self._world._writable()
+        world.influence[self._i, j] = value
+        world.influence_present[self._i, j] = True
+
+    def __delitem__(self, agency):
+        self._world._writable().influence_present[self._i, self._world.agency_index[agency]] = False
+
+    def __iter__(self):
+        present = self._world.influence_present[self._i]
+        return (agency for j, agency in enumerate(self._world.agencies) if present[j])
+
+    def __len__(self):
+        return int(self._world.influence_present[self._i].sum())
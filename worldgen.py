@@ -0,0 +1,125 @@
+"""
+Synthetic world generator.
+Writes countries.json / tech_tree.json / agencies.json / events.json files in the same layout as data/,
+at any scale, for benchmarks and balance runs on maps far bigger than the hand-written one.
+With more agencies than the four built-in ones, each country only lists the few agencies
+active there (missing agencies count as 0 influence).
+
+Usage: python worldgen.py --countries 100000 --techs 1000 --agencies 200 --events 500 --out worlds/100k
+Play on it with gamedata.use_data_dir('worlds/100k').
+"""
+import argparse
+import json
+import os
+import random
+
+BASE_AGENCIES = {
+    "CIA": {"country": "USA", "budget": 200, "political_capital": 50, "visibility": 20},
+    "Mossad": {"country": "Israel", "budget": 150, "political_capital": 40, "visibility": 10},
+    "MSS": {"country": "China", "budget": 250, "political_capital": 60, "visibility": 5},
+    "FSB": {"country": "Russia", "budget": 180, "political_capital": 45, "visibility": 10},
+}
+# Countries list at most this many agencies once there are more than the base four
+ACTIVE_AGENCIES_PER_COUNTRY = 6
+
+TECH_WORDS = ["Covert", "Quantum", "Neural", "Shadow", "Deepfake", "Encrypted", "Satellite",
+              "Biometric", "Ghost", "Signal", "Predictive", "Autonomous", "Stealth", "Mirror"]
+TECH_NOUNS = ["Protocols", "Networks", "Systems", "Relays", "Identities", "Archives",
+              "Drones", "Ciphers", "Channels", "Profiles", "Grids", "Proxies"]
+
+def generate_agencies(n_agencies, seed=0):
+    """The four built-in agencies followed by synthetic ones, in the data/agencies.json layout."""
+    rng = random.Random(seed)
+    agencies = dict(list(BASE_AGENCIES.items())[:n_agencies])
+    for i in range(len(agencies), n_agencies):
+        agencies[f"Agency {i:03d}"] = {
+            "country": f"Country {i}",
+            "budget": rng.randint(100, 250),
+            "political_capital": rng.randint(30, 60),
+            "visibility": rng.randint(5, 20),
+        }
+    return agencies
+
+def generate_countries(n_countries, agencies=tuple(BASE_AGENCIES), seed=0):
+    """Countries with one dominant agency each, using the same value ranges as data/countries.json."""
+    rng = random.Random(seed)
+    agencies = list(agencies)
+    countries = {}
+    width = len(str(n_countries))
+    for i in range(n_countries):
+        if len(agencies) <= len(BASE_AGENCIES):
+            active = agencies
+        else:
+            active = rng.sample(agencies, min(ACTIVE_AGENCIES_PER_COUNTRY, len(agencies)))
+        dominant = rng.randrange(len(active))
+        influence = {}
+        for j, agency in enumerate(active):
+            influence[agency] = rng.randint(40, 90) if j == dominant else rng.randint(0, 15)
+        countries[f"Country {i:0{width}d}"] = {
+            'stability': rng.randint(40, 95),
+            'influence': influence,
+            'populism_risk': rng.randint(10, 60),
+            'budget_reward': rng.randint(5, 25),
+            'capital_reward': rng.randint(1, 10),
+        }
+    return countries
+
+def generate_tech_tree(n_techs, seed=0):
+    """Techs whose cost and visibility reduction grow together, like data/tech_tree.json."""
+    rng = random.Random(seed)
+    techs = {}
+    for i in range(n_techs):
+        name = f"{rng.choice(TECH_WORDS)} {rng.choice(TECH_NOUNS)} Mk{i + 1}"
+        cost = 20 + 10 * (i % 15) + rng.randint(0, 9)
+        techs[name] = {'cost': cost, 'visibility_reduction': max(1, cost // 5 + rng.randint(-2, 2))}
+    return techs
+
+def base_events():
+    """The hand-written events from the game's own data/events.json."""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'events.json'), 'r') as file:
+        return json.load(file)
+
+def generate_events(n_events, seed=0):
+    """The built-in events followed by synthetic ones with random weights, targets and effects."""
+    rng = random.Random(seed)
+    events = base_events()[:n_events]
+    for i in range(len(events), n_events):
+        effects = [{'type': 'visibility', 'amount': rng.randint(1, 10)}]
+        if rng.random() < 0.3:
+            low = rng.randint(5, 30)
+            effects.append({'type': 'budget_loss', 'min': low, 'max': low + rng.randint(0, 30)})
+        if rng.random() < 0.3:
+            effects.append({'type': 'capital', 'amount': rng.randint(1, 8)})
+        events.append({'name': f"{rng.choice(TECH_WORDS)} Incident {i:04d}", 'weight': rng.randint(1, 5),
+                       'target': rng.choice(('random', 'random', 'global', 'rivals')), 'effects': effects})
+    return events
+
+def write_world(directory, n_countries, n_techs, n_agencies=len(BASE_AGENCIES), seed=0, n_events=None):
+    """
+    Writes countries.json, tech_tree.json, agencies.json and events.json into directory
+    (created if needed). n_events=None keeps just the built-in events.
+    """
+    os.makedirs(directory, exist_ok=True)
+    agencies = generate_agencies(n_agencies, seed=seed)
+    with open(os.path.join(directory, 'agencies.json'), 'w') as file:
+        json.dump(agencies, file, indent=4)
+    with open(os.path.join(directory, 'countries.json'), 'w') as file:
+        json.dump(generate_countries(n_countries, agencies, seed=seed), file)
+    with open(os.path.join(directory, 'tech_tree.json'), 'w') as file:
+        json.dump(generate_tech_tree(n_techs, seed=seed), file, indent=4)
+    events = base_events() if n_events is None else generate_events(n_events, seed=seed)
+    with open(os.path.join(directory, 'events.json'), 'w') as file:
+        json.dump(events, file, indent=4)
+    return directory
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Deep State world.")
+    parser.add_argument('--countries', type=int, default=1000)
+    parser.add_argument('--techs', type=int, default=15)
+    parser.add_argument('--agencies', type=int, default=len(BASE_AGENCIES))
+    parser.add_argument('--events', type=int, default=None, help="Events to write (default: the built-in ones).")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True, help="Directory to write the data files into.")
+    args = parser.parse_args()
+    write_world(args.out, args.countries, args.techs, args.agencies, args.seed, args.events)
+    print(f"Wrote {args.countries} countries, {args.techs} techs and {args.agencies} agencies to {args.out}")